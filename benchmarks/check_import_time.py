@@ -0,0 +1,60 @@
+"""Import-time budget for the calculation package.
+
+Runs a few cold interpreters, reads `-X importtime` and fails (exit code 1) if
+importing crystal_validator exceeds the budget or drags in tkinter/NumPy.
+
+    python benchmarks/check_import_time.py [--budget-ms 25]
+
+tests/test_import_time.py enforces the default budget in the pytest run.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORBIDDEN_MODULES = ("tkinter", "numpy")
+DEFAULT_BUDGET_MS = 25.0
+
+
+def measure_import_ms(module, runs=5):
+    """Best cumulative import time of `module` over several fresh interpreters."""
+    best = float("inf")
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=ROOT, capture_output=True, text=True, check=True)
+        for line in proc.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                best = min(best, int(fields[1]) / 1000.0)
+    return best
+
+
+def loaded_forbidden_modules(module):
+    code = (f"import sys, {module}; "
+            f"print(' '.join(m for m in {FORBIDDEN_MODULES!r} if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return proc.stdout.split()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="crystal_validator")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    elapsed = measure_import_ms(args.module)
+    forbidden = loaded_forbidden_modules(args.module)
+    print(f"import {args.module}: {elapsed:.2f} ms (budget {args.budget_ms:.1f} ms)")
+    if forbidden:
+        print(f"FAIL: {args.module} imports {', '.join(forbidden)}")
+        return 1
+    if elapsed > args.budget_ms:
+        print("FAIL: import time over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""Benchmark suite for the model, input parsing, library I/O and GUI refresh paths.
+
+Each case is timed with timeit (best of several repeats) and reported as seconds
+per operation. Results are compared against a stored JSON baseline; the script
+exits with code 1 if any case got slower than the tolerance allows.
+
+    python benchmarks/run_benchmarks.py                   # compare with baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline   # record a new baseline
+    python benchmarks/run_benchmarks.py -k library --sizes 1000
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from crystal_validator import AppConfig, CrystalCircuitModel, Param
+from crystal_validator.bulk import parse_work_file
+from crystal_validator.cli import BatchValidator
+from crystal_validator.library import XtalLibrary
+from crystal_validator.sweep import DesignSweep
+from crystal_validator.units import PARAM_NAMES, read_work_fields
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Reference design, as typed in the GUI
+DESIGN_FIELDS = {
+    Param.FREQ: ("25", "MHz"), Param.C0: ("5", "pF"), Param.ESR_MAX: ("60", "Ohm"),
+    Param.DL_MAX: ("100", "uW"), Param.GM_MCU: ("18", "mA/V"), Param.CL_SEL: ("12", "pF"),
+    Param.REXT_SEL: ("0", "Ohm"), Param.CS_PIN: ("2", "pF"), Param.CS_PCB: ("1.5", "pF"),
+    Param.VPP_MEASURED: ("1.2", "V"), Param.C_PROBE: ("0.9", "pF"),
+}
+DESIGN = {key: float(value) * AppConfig.UNIT_MULTIPLIERS[unit] for key, (value, unit) in DESIGN_FIELDS.items()}
+
+
+def _design_model():
+    model = CrystalCircuitModel()
+    for key, value in DESIGN.items():
+        model.set_param(key, value)
+    model.calculate()
+    return model
+
+
+def _synthetic_presets(count, seed=0):
+    rng = np.random.default_rng(seed)
+    freqs = rng.uniform(4, 48, count)
+    c0s = rng.uniform(1, 7, count)
+    esrs = rng.uniform(20, 150, count)
+    dls = rng.uniform(10, 500, count)
+    return {f"XTAL-{i:06d}": {"FREQ": (f"{freqs[i]:.4f}", "MHz"), "C0": (f"{c0s[i]:.2f}", "pF"),
+                              "ESR_MAX": (f"{esrs[i]:.1f}", "Ohm"), "DL_MAX": (f"{dls[i]:.0f}", "uW")}
+            for i in range(count)}
+
+
+class _StubLabel:
+    """Stands in for a ttk.Label: keeps the options so cget/config behave."""
+
+    def __init__(self):
+        self.options = {"text": ""}
+
+    def config(self, **kwargs):
+        self.options.update(kwargs)
+
+    configure = config
+
+    def cget(self, option):
+        return self.options.get(option, "")
+
+
+class _StubVar:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def _stub_controller():
+    """AppController wired to stub widgets, so refresh paths run without a display."""
+    from main import AppController
+
+    controller = AppController.__new__(AppController)
+    controller.model = _design_model()
+    controller._rules = controller._rules_thresholds = None
+    labels = list(AppController.OUTPUT_SCALES) + list(AppController.STATUS_DEPENDENCIES) + ["final_status"]
+    controller.view = SimpleNamespace(
+        output_labels={key: _StubLabel() for key in labels},
+        vars={key: _StubVar(value) for key, (value, _) in DESIGN_FIELDS.items()},
+        unit_combos={key: _StubVar(unit) for key, (_, unit) in DESIGN_FIELDS.items()},
+    )
+    return controller
+
+
+# --- BENCHMARK CASES ---
+# Each case returns (callable, operations per call); sized cases take the size as argument.
+
+def bench_calculate_scalar():
+    model = _design_model()
+    return model.calculate, 1
+
+
+def bench_calculate_partial():
+    model = _design_model()
+    keys = model.affected_results([Param.GM_MCU])
+    return lambda: model.calculate(keys), 1
+
+
+def bench_calculate_batch(size):
+    rng = np.random.default_rng(0)
+    columns = {key: value * rng.uniform(0.5, 1.5, size) for key, value in DESIGN.items()}
+
+    def run():
+        results = CrystalCircuitModel.calculate_batch(columns)
+        CrystalCircuitModel.verdict_batch(columns[Param.GM_MCU], results)
+    return run, size
+
+
+def bench_sweep(size):
+    side = int(round(size ** 0.5))
+    axes = {Param.CL_SEL: np.linspace(4e-12, 30e-12, side), Param.REXT_SEL: np.linspace(0, 2e3, side)}
+    return lambda: DesignSweep(DESIGN, axes).run(), side * side
+
+
+def bench_parse_batch_rows(size):
+    fields = [DESIGN_FIELDS[key] for key in Param]
+    row = [0.0] * len(PARAM_NAMES)
+
+    def run():
+        for _ in range(size):
+            BatchValidator._parse_fields(fields, row)
+    return run, size
+
+
+def bench_gui_parse_fields():
+    controller = _stub_controller()
+
+    def run():
+        for key in Param:
+            controller._read_param(key)
+    return run, 1
+
+
+def bench_gui_update_output_view():
+    controller = _stub_controller()
+    return controller._update_output_view, 1
+
+
+def bench_gui_update_output_view_partial():
+    controller = _stub_controller()
+    keys = controller.model.affected_results([Param.GM_MCU])
+    return lambda: controller._update_output_view(keys), 1
+
+
+def bench_library_import(size, workdir):
+    path = os.path.join(workdir, f"presets_{size}.json")
+    if not os.path.exists(path):
+        with open(path, "w") as f:
+            json.dump(_synthetic_presets(size), f)
+
+    def run():
+        library = XtalLibrary(":memory:")
+        library.import_json(path)
+        library.close()
+    return run, size
+
+
+def _filled_library(size, workdir):
+    db_path = os.path.join(workdir, f"library_{size}.db")
+    library = XtalLibrary(db_path)
+    if len(library) != size:
+        library.import_json(os.path.join(workdir, f"presets_{size}.json"))
+    return library
+
+
+def bench_library_open(size, workdir):
+    bench_library_import(size, workdir)
+    _filled_library(size, workdir).close()
+    db_path = os.path.join(workdir, f"library_{size}.db")
+
+    def run():
+        library = XtalLibrary(db_path)
+        library.names(limit=AppConfig.LIBRARY_PAGE_SIZE)
+        library.close()
+    return run, 1
+
+
+def bench_library_save(size, workdir):
+    bench_library_import(size, workdir)
+    library = _filled_library(size, workdir)
+    preset = {key.name: DESIGN_FIELDS[key] for key in XtalLibrary.PRESET_PARAMS}
+    return lambda: library.save("BENCH-PRESET", preset), 1
+
+
+def bench_library_columns(size, workdir):
+    bench_library_import(size, workdir)
+    library = _filled_library(size, workdir)
+    return library.columns, size
+
+
+def bench_work_file_roundtrip(workdir):
+    path = os.path.join(workdir, "design.xtal")
+    data = {key.name: {"value": value, "unit": unit} for key, (value, unit) in DESIGN_FIELDS.items()}
+    data["__presets__"] = {"xtal": AppConfig.DEFAULT_XTAL_NAME, "probe": AppConfig.DEFAULT_PROBE_NAME}
+
+    def run():
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
+        read_work_fields(path)
+        parse_work_file(path)
+    return run, 1
+
+
+def build_cases(sizes, workdir):
+    """(name, factory) for every case; factories are called lazily, so -k skips their setup."""
+    cases = [
+        ("model.calculate", bench_calculate_scalar),
+        ("model.calculate_partial", bench_calculate_partial),
+        ("gui.parse_fields", bench_gui_parse_fields),
+        ("gui.update_output_view", bench_gui_update_output_view),
+        ("gui.update_output_view_partial", bench_gui_update_output_view_partial),
+        ("xtal.roundtrip", lambda: bench_work_file_roundtrip(workdir)),
+    ]
+    for size in sizes:
+        cases += [
+            (f"model.calculate_batch[{size}]", lambda n=size: bench_calculate_batch(n)),
+            (f"sweep.run[{size}]", lambda n=size: bench_sweep(n)),
+            (f"cli.parse_rows[{size}]", lambda n=size: bench_parse_batch_rows(n)),
+            (f"library.import[{size}]", lambda n=size: bench_library_import(n, workdir)),
+            (f"library.open[{size}]", lambda n=size: bench_library_open(n, workdir)),
+            (f"library.save[{size}]", lambda n=size: bench_library_save(n, workdir)),
+            (f"library.columns[{size}]", lambda n=size: bench_library_columns(n, workdir)),
+        ]
+    return cases
+
+
+def time_case(func, ops, repeat):
+    """Best time per operation over `repeat` timeit runs."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number / ops
+
+
+def compare(results, baseline, tolerance):
+    """Yields (name, current, baseline value or None, regressed) for every result."""
+    for name, value in results.items():
+        reference = baseline.get(name)
+        yield name, value, reference, reference is not None and value > reference * (1 + tolerance)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = +25%%)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated library/batch sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", dest="filter", default="", help="only run cases whose name contains this text")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, factory in build_cases(sizes, workdir):
+            if args.filter not in name:
+                continue
+            func, ops = factory()
+            results[name] = time_case(func, ops, args.repeat)
+
+    regressions = 0
+    for name, value, reference, regressed in compare(results, baseline, args.tolerance):
+        line = f"{name:<36} {value * 1e6:12.3f} us/op"
+        if reference is not None:
+            line += f"   baseline {reference * 1e6:12.3f} us/op  ({value / reference:5.2f}x)"
+        if regressed:
+            line += "  REGRESSION"
+            regressions += 1
+        print(line)
+
+    report = {"python": platform.python_version(), "machine": platform.machine(),
+              "numpy": np.__version__, "results": results}
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Results written to {path}")
+
+    if regressions:
+        print(f"FAIL: {regressions} case(s) slower than baseline by more than {args.tolerance:.0%}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
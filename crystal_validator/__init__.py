@@ -0,0 +1,9 @@
+"""Crystal Oscillator Validator - calculation library.
+
+Importing the package pulls in neither tkinter nor NumPy; the vectorized modules
+(sweep, optimize, montecarlo, cli) import NumPy themselves.
+"""
+from .config import AppConfig
+from .model import CrystalCircuitModel, Param
+
+__all__ = ["AppConfig", "CrystalCircuitModel", "Param"]
@@ -0,0 +1,8 @@
+import multiprocessing
+import sys
+
+from .cli import headless_main
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(headless_main())
@@ -0,0 +1,220 @@
+"""Bulk re-validation of a directory tree of .xtal work files."""
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from .config import AppConfig
+from .model import Param
+from .units import PARAM_NAMES
+
+WORK_FILE_EXTENSION = ".xtal"
+_PROBE_INDEX = Param.C_PROBE.value
+
+
+def iter_work_files(root):
+    """Yields every .xtal file below `root`, in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(WORK_FILE_EXTENSION):
+                yield os.path.join(dirpath, filename)
+
+
+def parse_work_file(path):
+    """Process-pool worker: reads one .xtal file into (path, fields, xtal preset, probe preset).
+
+    `fields` is a list of (value, unit) in Param order, as saved by AppController.save_work;
+    on failure it is the error message instead.
+    """
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        fields = []
+        for name in PARAM_NAMES:
+            entry = data.get(name) or {}
+            fields.append((entry.get("value", ""), entry.get("unit")))
+        presets = data.get("__presets__") or {}
+        return (path, fields, presets.get("xtal", AppConfig.DEFAULT_XTAL_NAME),
+                presets.get("probe", AppConfig.DEFAULT_PROBE_NAME))
+    except (OSError, ValueError, AttributeError) as e:
+        return path, f"File non leggibile: {e}", None, None
+
+
+class PresetResolver:
+    """Applies the library/probe presets referenced by a work file, like AppController.load_work.
+
+    Library lookups are memoized: archived sessions tend to share a handful of presets.
+    """
+
+    def __init__(self, library):
+        self.library = library
+        self._presets = {}
+
+    def preset(self, name):
+        if name not in self._presets:
+            self._presets[name] = self.library.get(name)
+        return self._presets[name]
+
+    def resolve(self, fields, xtal_name, probe_name):
+        """Returns the resolved field list; raises ValueError if the crystal preset is unknown."""
+        fields = list(fields)
+        if xtal_name != AppConfig.DEFAULT_XTAL_NAME:
+            preset = self.preset(xtal_name)
+            if preset is None:
+                raise ValueError(f"Preset quarzo '{xtal_name}' non presente in libreria.")
+            for key_str, (value, unit) in preset.items():
+                fields[Param[key_str].value] = (value, unit)
+        if probe_name != AppConfig.DEFAULT_PROBE_NAME and probe_name in AppConfig.PROBE_MODELS:
+            fields[_PROBE_INDEX] = (str(AppConfig.PROBE_MODELS[probe_name]), "pF")
+        return fields
+
+
+def iter_work_designs(root, library, workers=None, chunksize=64):
+    """Yields (path, fields) for every work file under `root`, parsed on a process pool.
+
+    Files are read and decoded in worker processes. Preset resolution runs in this
+    process, since it needs the library connection. Unreadable files and unknown
+    presets are yielded with a ValueError in place of the fields.
+    """
+    resolver = PresetResolver(library)
+    paths = iter_work_files(root)
+    workers = workers or os.cpu_count() or 1
+
+    def resolved(parsed):
+        for path, fields, xtal_name, probe_name in parsed:
+            if isinstance(fields, str):
+                yield path, ValueError(fields)
+                continue
+            try:
+                yield path, resolver.resolve(fields, xtal_name, probe_name)
+            except ValueError as e:
+                yield path, e
+
+    if workers == 1:
+        yield from resolved(map(parse_work_file, paths))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from resolved(pool.map(parse_work_file, paths, chunksize=chunksize))
+
+
+def iter_work_file_stats(root):
+    """Yields (path, absolute path, (mtime_ns, size)) for every work file under `root`."""
+    # Both prefixes end with a separator, whether or not `root` does
+    prefix, abs_prefix = len(os.path.join(root, "")), os.path.join(os.path.abspath(root), "")
+    for path in iter_work_files(root):
+        try:
+            stat = os.stat(path)
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stat_key = (-1, -1)
+        yield path, abs_prefix + path[prefix:], stat_key
+
+
+def parse_work_files(paths, workers=None, chunksize=64):
+    """{path: (fields, xtal preset, probe preset)} as returned by parse_work_file, on a process pool."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < chunksize:
+        return {path: tuple(rest) for path, *rest in map(parse_work_file, paths)}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return {path: tuple(rest) for path, *rest in pool.map(parse_work_file, paths, chunksize=chunksize)}
+
+
+def design_context(preset, probe_name, thresholds):
+    """Hash of what a work file's design depends on besides its own fields: the content of
+    its crystal preset (None if missing), the probe capacitance and the thresholds."""
+    probe = AppConfig.PROBE_MODELS.get(probe_name) if probe_name != AppConfig.DEFAULT_PROBE_NAME else None
+    text = json.dumps([preset, probe, list(thresholds)], sort_keys=True)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def design_fingerprint(values, thresholds):
+    """Content hash of one resolved design: its base-unit values in Param order (or the error
+    that prevented parsing them) and the validation thresholds."""
+    digest = hashlib.blake2b(repr(tuple(thresholds)).encode(), digest_size=16)
+    if isinstance(values, str):
+        digest.update(b"error:" + values.encode())
+    else:
+        digest.update(struct.pack(f"<{len(values)}d", *values))
+    return digest.hexdigest()
+
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path        TEXT PRIMARY KEY,
+    mtime_ns    INTEGER NOT NULL,
+    size        INTEGER NOT NULL,
+    xtal        TEXT,
+    probe       TEXT,
+    context     TEXT NOT NULL,
+    parsed      TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    fingerprint TEXT PRIMARY KEY,
+    outcome     TEXT NOT NULL
+);
+"""
+
+
+class ValidationIndex:
+    """Persistent state of incremental bulk re-validation, in SQLite.
+
+    files:    path -> file stat, preset names, design_context() and parsed content at the
+              last run, and the fingerprint of the design it resolved to.
+    outcomes: fingerprint -> evaluate_chunk() outcome (results, verdict, failed checks, error).
+    """
+
+    _BATCH = 500    # Host parameters per IN (...) query, below SQLite's limit
+
+    def __init__(self, path=AppConfig.VALIDATION_INDEX_FILENAME):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_INDEX_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def files(self, root):
+        """{path: (mtime_ns, size, xtal, probe, context, fingerprint)} of the indexed files below `root`."""
+        prefix = os.path.join(os.path.abspath(root), "")
+        rows = self._conn.execute("SELECT path, mtime_ns, size, xtal, probe, context, fingerprint FROM files "
+                                  "WHERE path >= ? AND path < ?", (prefix, prefix + "\U0010ffff"))
+        return {row[0]: row[1:] for row in rows}
+
+    def _select(self, sql, keys):
+        keys = list(keys)
+        for start in range(0, len(keys), self._BATCH):
+            batch = keys[start:start + self._BATCH]
+            yield from self._conn.execute(sql.format(",".join("?" * len(batch))), batch)
+
+    def parsed(self, paths):
+        """{path: (fields, xtal preset, probe preset)} stored for `paths`."""
+        return {path: tuple(json.loads(parsed))
+                for path, parsed in self._select("SELECT path, parsed FROM files WHERE path IN ({})", paths)}
+
+    def outcomes(self, fingerprints):
+        """{fingerprint: outcome} of those fingerprints that are in the index."""
+        found = {}
+        for fingerprint, outcome in self._select("SELECT fingerprint, outcome FROM outcomes "
+                                                 "WHERE fingerprint IN ({})", fingerprints):
+            results, verdict, failed_checks, error = json.loads(outcome)
+            found[fingerprint] = (tuple(results), verdict, failed_checks, error)
+        return found
+
+    def update(self, files, outcomes, removed=()):
+        """Stores changed files [(path, mtime_ns, size, context, parsed, fingerprint)] and new
+        outcomes {fingerprint: outcome}; forgets `removed` paths and the outcomes no file
+        refers to any more."""
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                   [(path, mtime_ns, size, parsed[1], parsed[2], context, json.dumps(parsed),
+                                     fingerprint) for path, mtime_ns, size, context, parsed, fingerprint in files])
+            self._conn.executemany("INSERT OR REPLACE INTO outcomes VALUES (?, ?)",
+                                   [(fingerprint, json.dumps(outcome)) for fingerprint, outcome in outcomes.items()])
+            self._conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+            if files or removed:
+                self._conn.execute("DELETE FROM outcomes WHERE fingerprint NOT IN (SELECT fingerprint FROM files)")
@@ -0,0 +1,59 @@
+"""Bounded LRU cache of validation results keyed on base-unit Param tuples."""
+from collections import OrderedDict
+
+from .config import AppConfig
+
+
+class ResultCache:
+    """LRU mapping from a design's base-unit values (in Param order) to its results.
+
+    Keys are plain float tuples, so values parsed from different unit spellings
+    ('25MHz', '25000kHz') share an entry. `version` is an optional callable (e.g.
+    CrystalCircuitModel.thresholds); when its value changes every entry is dropped,
+    so cached verdicts never outlive the thresholds they were computed with.
+    """
+
+    def __init__(self, maxsize=AppConfig.RESULT_CACHE_SIZE, version=None):
+        self.maxsize = maxsize
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._version_value = version() if version is not None else None
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+    def check_version(self):
+        """Drops every entry if the version value changed since the last check."""
+        if self.version is not None:
+            value = self.version()
+            if value != self._version_value:
+                self._version_value = value
+                self._data.clear()
+
+    def get(self, key):
+        """Cached value for `key` (marking it recently used), or None."""
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,1013 @@
+"""Headless command-line modes (no tkinter, suitable for display-less CI workers)."""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+
+from .bulk import (PresetResolver, ValidationIndex, design_context, design_fingerprint, iter_work_designs,
+                   iter_work_file_stats, parse_work_files)
+from .cache import ResultCache
+from .config import AppConfig
+from .finder import CrystalFinder
+from .compat import BOARD_PARAMS, CompatibilityMatrix
+from .library import McuLibrary, XtalLibrary
+from .model import CrystalCircuitModel, Param
+from .montecarlo import MonteCarloAnalysis, ParamDistribution
+from .optimize import LoadOptimizer, series_values
+from .profiling import instrumented, profiler
+from .rules import ValidationThresholds
+from .sensitivity import SENSITIVITY_KEYS, sensitivity_batch
+from .sweep import DesignSweep
+from .units import (PARAM_NAMES, UNIT_TABLES, DEFAULT_UNITS, parse_design_value, parse_quantity, preset_columns,
+                    read_work_fields, split_unit)
+
+_PARAM_ORDER = tuple(Param)
+
+
+def _iter_csv_designs(stream):
+    """Yields (name, [(value, unit), ...]) in Param order from CSV rows with PARAM and PARAM_unit columns."""
+    unit_columns = tuple(f"{name}_unit" for name in PARAM_NAMES)
+    for row in csv.DictReader(stream):
+        get = row.get
+        yield get("name", ""), [(get(name) or "", get(unit_col)) for name, unit_col in zip(PARAM_NAMES, unit_columns)]
+
+
+def _iter_jsonl_designs(stream):
+    """Yields (name, [(value, unit), ...]) in Param order from JSON lines using the .xtal value/unit schema."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield "", ValueError(f"JSON non valido: {e}")
+            continue
+        yield data.get("name", ""), design_fields(data)
+
+
+def design_fields(data):
+    """[(value, unit), ...] in Param order from a dict using the .xtal value/unit schema.
+
+    Each entry may also be a [value, unit] pair or a bare value in the default unit.
+    """
+    fields = []
+    for name in PARAM_NAMES:
+        entry = data.get(name, "")
+        if isinstance(entry, dict):
+            fields.append((entry.get("value", ""), entry.get("unit")))
+        elif isinstance(entry, (list, tuple)):
+            fields.append((entry[0], entry[1] if len(entry) > 1 else None))
+        else:
+            fields.append((entry, None))
+    return fields
+
+
+class BatchValidator:
+    """Streams designs through CrystalCircuitModel.calculate_batch in fixed-size chunks."""
+
+    OUTPUT_FIELDS = ("row", "name") + CrystalCircuitModel.RESULT_KEYS + ("verdict", "failed_checks", "error")
+
+    def __init__(self, output, output_format="csv", chunk_size=4096, cache=None):
+        self.output = output
+        self.output_format = output_format
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.total = 0
+        self.failed = 0
+        self._csv_writer = None
+        if output_format == "csv":
+            self._csv_writer = csv.writer(output)
+            self._csv_writer.writerow(self.OUTPUT_FIELDS)
+
+    def run(self, designs):
+        """Validates every design from the iterator; returns True if all of them passed."""
+        designs = iter(designs)
+        while True:
+            chunk = list(itertools.islice(designs, self.chunk_size))
+            if not chunk:
+                break
+            self._process_chunk(chunk)
+            self.output.flush()
+        return self.failed == 0
+
+    @staticmethod
+    def _parse_fields(fields, out_row):
+        """Fills one row of base-unit values; raises ValueError with the GUI wording."""
+        for j, (value, unit) in enumerate(fields):
+            multiplier = UNIT_TABLES[j].get(unit or DEFAULT_UNITS[PARAM_NAMES[j]])
+            try:
+                out_row[j] = float(value) * multiplier
+            except (TypeError, ValueError):
+                # Slow path only for bad rows, to get the exact error message
+                parse_design_value(_PARAM_ORDER[j], value, unit)
+                raise
+
+    def _process_chunk(self, chunk):
+        for name, row_results, verdict, failed_checks, error in self.evaluate_chunk(chunk, self.cache):
+            self.total += 1
+            if verdict != "PASS":
+                self.failed += 1
+            self._write(self.total, name, row_results, verdict, failed_checks, error)
+
+    @classmethod
+    @instrumented("cli.evaluate_chunk")
+    def evaluate_chunk(cls, chunk, cache=None):
+        """Validates a list of (name, fields) in one vectorized pass.
+
+        Returns (name, result tuple in RESULT_KEYS order, verdict, failed checks, error)
+        per design; `fields` may be an exception, reported as an ERROR row. With a
+        cache.ResultCache, designs seen before skip the model entirely.
+        """
+        values = np.empty((len(chunk), len(_PARAM_ORDER)))
+        names, outcomes, pending, keys = [], [], [], []
+        # Repeats inside the chunk point at the row evaluated first
+        first_seen, repeats = {}, []
+        row = [0.0] * len(_PARAM_ORDER)
+        if cache is not None:
+            cache.check_version()
+        for name, fields in chunk:
+            names.append(name)
+            if isinstance(fields, Exception):
+                outcomes.append(cls._error_outcome(str(fields)))
+                continue
+            try:
+                cls._parse_fields(fields, row)
+            except (TypeError, ValueError) as e:
+                outcomes.append(cls._error_outcome(str(e)))
+                continue
+            if cache is not None:
+                key = tuple(row)
+                if key in first_seen:
+                    repeats.append((len(outcomes), first_seen[key]))
+                    outcomes.append(None)
+                    continue
+                cached = cache.get(key)
+                if cached is not None:
+                    outcomes.append(cached)
+                    continue
+                first_seen[key] = len(outcomes)
+                keys.append(key)
+            values[len(pending)] = row
+            pending.append(len(outcomes))
+            outcomes.append(None)
+
+        if pending:
+            block = values[:len(pending)]
+            columns = {key: block[:, key.value] for key in _PARAM_ORDER}
+            with np.errstate(invalid='ignore'):
+                results = CrystalCircuitModel.calculate_batch(columns)
+                checks = CrystalCircuitModel.check_batch(columns[Param.GM_MCU], results)
+                invalid = CrystalCircuitModel.invalid_mask_batch(columns)
+
+            failed_masks = [(check, (codes == CrystalCircuitModel.VERDICT_FAIL).tolist())
+                            for check, codes in checks.items()]
+            result_rows = zip(*(results[k].tolist() for k in CrystalCircuitModel.RESULT_KEYS))
+            for j, (row_results, is_invalid) in enumerate(zip(result_rows, invalid.tolist())):
+                if is_invalid:
+                    outcome = cls._error_outcome("Valori negativi o nulli non ammessi.")
+                else:
+                    failed_checks = [check for check, mask in failed_masks if mask[j]]
+                    outcome = (row_results, "FAIL" if failed_checks else "PASS", failed_checks, None)
+                outcomes[pending[j]] = outcome
+                if cache is not None:
+                    cache.put(keys[j], outcome)
+        for i, first in repeats:
+            outcomes[i] = outcomes[first]
+        return [(name, *outcome) for name, outcome in zip(names, outcomes)]
+
+    @staticmethod
+    def _error_outcome(error):
+        return (None,) * len(CrystalCircuitModel.RESULT_KEYS), "ERROR", [], error
+
+    def _write(self, row, name, row_results, verdict, failed_checks, error):
+        if self._csv_writer is not None:
+            self._csv_writer.writerow((row, name, *("" if v is None else repr(v) for v in row_results),
+                                       verdict, ";".join(failed_checks), error or ""))
+        else:
+            record = {"row": row, **self.record(name, row_results, verdict, failed_checks, error)}
+            self.output.write(json.dumps(record) + "\n")
+
+    @staticmethod
+    def record(name, row_results, verdict, failed_checks, error):
+        """JSON-ready dict of one evaluate_chunk() row."""
+        return {"name": name, "results": dict(zip(CrystalCircuitModel.RESULT_KEYS, row_results)),
+                "verdict": verdict, "failed_checks": failed_checks, "error": error}
+
+
+class IncrementalValidator(BatchValidator):
+    """BatchValidator for a tree of .xtal files that only evaluates what changed since the last run.
+
+    Each design is fingerprinted by its base-unit values after the library and probe presets
+    are applied, plus the validation thresholds, and a ValidationIndex keeps fingerprint ->
+    outcome. A file is only read and resolved again if its mtime/size changed or the
+    content of the presets it references (or the thresholds) did, so editing one preset
+    touches exactly the designs that use it. Every file is still written to the output.
+    """
+
+    def __init__(self, output, index, output_format="csv", chunk_size=4096):
+        super().__init__(output, output_format, chunk_size)
+        self.index = index
+        self.recomputed = 0
+        self.reresolved = 0
+        self.removed = 0
+        # (path, previous verdict, new verdict) of the designs whose verdict changed
+        self.flips = []
+
+    @instrumented("cli.revalidate")
+    def revalidate(self, root, library, workers=None):
+        """Re-validates every work file under `root`; returns True if all of them passed."""
+        thresholds = ValidationThresholds().as_tuple()
+        known = self.index.files(root)
+        resolver = PresetResolver(library)
+        contexts = {}
+
+        def context(xtal_name, probe_name):
+            if (xtal_name, probe_name) not in contexts:
+                preset = resolver.preset(xtal_name) if xtal_name != AppConfig.DEFAULT_XTAL_NAME else {}
+                contexts[xtal_name, probe_name] = design_context(preset, probe_name, thresholds)
+            return contexts[xtal_name, probe_name]
+
+        # (path, key, stat, fingerprint or None while it must be recomputed, previous fingerprint)
+        entries, stale, unread = [], [], []
+        for path, key, stat_key in iter_work_file_stats(root):
+            previous = known.pop(key, None)
+            fingerprint = None
+            if previous is not None and tuple(previous[:2]) == stat_key:
+                if context(previous[2], previous[3]) == previous[4]:
+                    fingerprint = previous[5]
+                else:
+                    stale.append(key)
+            else:
+                unread.append(path)
+            entries.append([path, key, stat_key, fingerprint, previous[5] if previous is not None else None])
+
+        parsed = self.index.parsed(stale)
+        fresh = parse_work_files(unread, workers)
+        designs, changed_files = {}, []
+        row = [0.0] * len(_PARAM_ORDER)
+        for entry in entries:
+            path, key, stat_key, fingerprint, _ = entry
+            if fingerprint is not None:
+                continue
+            fields, xtal_name, probe_name = content = parsed[key] if key in parsed else fresh[path]
+            try:
+                if isinstance(fields, str):
+                    raise ValueError(fields)
+                design = resolver.resolve(fields, xtal_name, probe_name)
+                self._parse_fields(design, row)
+                values = tuple(row)
+            except (TypeError, ValueError) as e:
+                design = e if isinstance(e, ValueError) else ValueError(str(e))
+                values = str(e)
+            entry[3] = fingerprint = design_fingerprint(values, thresholds)
+            designs.setdefault(fingerprint, (path, design))
+            changed_files.append((key, *stat_key, context(xtal_name, probe_name), content, fingerprint))
+        self.reresolved = len(changed_files)
+
+        outcomes = self.index.outcomes({e[3] for e in entries} | {e[4] for e in entries if e[4] is not None})
+        pending = [(fingerprint, named) for fingerprint, named in designs.items() if fingerprint not in outcomes]
+        new_outcomes = {}
+        for start in range(0, len(pending), self.chunk_size):
+            block = pending[start:start + self.chunk_size]
+            rows = self.evaluate_chunk([named for _, named in block])
+            for (fingerprint, _), (_, *outcome) in zip(block, rows):
+                new_outcomes[fingerprint] = tuple(outcome)
+        self.recomputed = len(new_outcomes)
+        outcomes.update(new_outcomes)
+
+        for path, _, _, fingerprint, previous in entries:
+            row_results, verdict, failed_checks, error = outcomes[fingerprint]
+            self.total += 1
+            if verdict != "PASS":
+                self.failed += 1
+            self._write(self.total, path, row_results, verdict, failed_checks, error)
+            if previous is not None and previous != fingerprint and previous in outcomes:
+                old_verdict = outcomes[previous][1]
+                if old_verdict != verdict:
+                    self.flips.append((path, old_verdict, verdict))
+        self.output.flush()
+
+        self.removed = len(known)
+        self.index.update(changed_files, new_outcomes, removed=list(known))
+        return self.failed == 0
+
+
+def _parse_assignment(text):
+    """Splits 'PARAM=SPEC' into (Param, SPEC)."""
+    name, sep, spec = text.partition("=")
+    if not sep or name.strip().upper() not in Param.__members__:
+        raise argparse.ArgumentTypeError(f"Atteso PARAM=VALORE, ricevuto '{text}'.")
+    return Param[name.strip().upper()], spec
+
+
+def _parse_sweep_axis(text):
+    """Parses 'PARAM=START:STOP:NUM[UNIT]' or 'PARAM=V1,V2,...[UNIT]' into (Param, values)."""
+    key, spec = _parse_assignment(text)
+    numbers, unit = split_unit(spec)
+    try:
+        if ":" in numbers:
+            start, stop, num = numbers.split(":")
+            values = np.linspace(parse_design_value(key, start, unit), parse_design_value(key, stop, unit), int(num))
+        else:
+            values = np.array([parse_design_value(key, v, unit) for v in numbers.split(",")])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return key, values
+
+
+def _cmd_sweep(args):
+    base = read_work_fields(args.base) if args.base else {}
+    for key, spec in args.set:
+        base[key] = parse_quantity(key, spec)
+
+    axes = dict(args.axis)
+    if args.probes:
+        axes[Param.C_PROBE] = DesignSweep.probe_axis()
+    if not axes:
+        print("Errore: specificare almeno un --axis o --probes.", file=sys.stderr)
+        return 2
+
+    sweep = DesignSweep(base, axes, args.chunk_size)
+    keep = ('gm_crit', 'gain_margin', 'drive_level', 'dl_ratio') if args.store else ()
+    result = sweep.run(keep, store=sweep.create_store(args.store, keep) if args.store else None)
+    shape = " x ".join(f"{key.name}[{len(values)}]" for key, values in result.axes)
+    print(f"Griglia: {shape} = {result.verdict.size} punti")
+    for name, count in result.counts().items():
+        print(f"  {name}: {count} ({100.0 * count / result.verdict.size:.2f}%)")
+
+    if args.save:
+        np.savez(args.save, verdict=result.verdict,
+                 **{f"axis_{i}_{key.name}": values for i, (key, values) in enumerate(result.axes)})
+        print(f"Mappa salvata in: {args.save}")
+    if args.store:
+        print(f"Risultati salvati in: {args.store}")
+    return 0 if result.counts()['FAIL'] == 0 else 1
+
+
+def _parse_range(key, text):
+    """Parses 'LOW:HIGH[UNIT]' into base-unit bounds (HIGH may be omitted)."""
+    numbers, unit = split_unit(text)
+    low, _, high = numbers.partition(":")
+    return (parse_design_value(key, low, unit),
+            parse_design_value(key, high, unit) if high.strip() else np.inf)
+
+
+def open_library(path=AppConfig.LIBRARY_DB_FILENAME):
+    """Opens the crystal library database, importing the legacy JSON file the first time."""
+    library = XtalLibrary(path)
+    library.import_json(AppConfig.LIBRARY_FILENAME)
+    return library
+
+
+def _cmd_optimize(args):
+    columns = read_work_fields(args.base) if args.base else {}
+    for key, spec in args.set:
+        columns[key] = parse_quantity(key, spec)
+
+    if args.library:
+        library = open_library(args.library_db)
+        names, library_columns = preset_columns(dict(library.items()))
+        library.close()
+        columns.update(library_columns)
+    else:
+        names = [args.base or "design"]
+
+    optimizer = LoadOptimizer(_parse_range(Param.CL_SEL, args.cl_range),
+                              _parse_range(Param.REXT_SEL, args.rext_range), args.series)
+    solution = optimizer.solve(columns)
+    feasible = np.broadcast_to(solution['feasible'], (len(names),))
+
+    print(f"{'Design':<36}{'CL_sel [pF]':>12}{'Rext [Ohm]':>12}{'Margin':>10}{'DL/DL_max':>11}{'Rext max':>11}")
+    for i, name in enumerate(names):
+        if not feasible[i]:
+            print(f"{name:<36}{'nessuna soluzione con DL/DL_max <= 1':>56}")
+            continue
+        value = {key: np.broadcast_to(solution[key], (len(names),))[i] for key in LoadOptimizer.SOLUTION_KEYS}
+        print(f"{name:<36}{value['cl_sel'] * 1e12:>12.2f}{value['rext_sel']:>12.1f}{value['gain_margin']:>10.2f}"
+              f"{value['dl_ratio']:>11.3f}{value['rext_max']:>11.1f}")
+    return 0 if feasible.all() else 1
+
+
+def _cmd_sensitivity(args):
+    columns = read_work_fields(args.base) if args.base else {}
+    for key, spec in args.set:
+        columns[key] = parse_quantity(key, spec)
+
+    if args.library:
+        library = open_library(args.library_db)
+        names, library_columns = preset_columns(dict(library.items()))
+        library.close()
+        columns.update(library_columns)
+    else:
+        names = [args.base or "design"]
+
+    result = sensitivity_batch(columns)
+    table = result.jacobian if args.absolute else result.normalized
+    values = {key: {param: np.broadcast_to(table[key][param], (len(names),)) for param in _PARAM_ORDER}
+              for key in SENSITIVITY_KEYS}
+
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["name"] + [f"{key}.{param.name}" for key in SENSITIVITY_KEYS for param in _PARAM_ORDER])
+            for i, name in enumerate(names):
+                writer.writerow([name] + [float(values[key][param][i])
+                                          for key in SENSITIVITY_KEYS for param in _PARAM_ORDER])
+        print(f"Sensibilità di {len(names)} design salvate in: {args.output}")
+        return 0
+
+    kind = "dr/dp [unità base]" if args.absolute else "(dr/r)/(dp/p)"
+    for i, name in enumerate(names):
+        print(f"{name} - {kind}")
+        print(f"{'Parametro':<14}" + "".join(f"{key:>14}" for key in SENSITIVITY_KEYS))
+        for param in _PARAM_ORDER:
+            row = [values[key][param][i] for key in SENSITIVITY_KEYS]
+            if not any(row):
+                continue
+            print(f"{param.name:<14}" + "".join(f"{value:>14.4g}" for value in row))
+        print()
+    return 0
+
+
+def _cmd_find(args):
+    board = read_work_fields(args.base) if args.base else {}
+    for key, spec in args.set:
+        board[key] = parse_quantity(key, spec)
+
+    freq_range = None
+    if args.freq:
+        freq = parse_quantity(Param.FREQ, args.freq)
+        freq_range = (freq * (1 - args.tolerance), freq * (1 + args.tolerance))
+
+    library = open_library(args.library_db)
+    result = CrystalFinder(library).find(board, freq_range, args.pass_only)
+    library.close()
+
+    print(f"{len(result)} quarzi compatibili.")
+    print(f"{'Quarzo':<36}{'F [MHz]':>12}{'Margin':>10}{'DL/DL_max':>11}{'Esito':>7}")
+    for name, freq, margin, ratio, verdict in result.rows(args.limit):
+        print(f"{name:<36}{freq / 1e6:>12.6f}{margin:>10.2f}{ratio:>11.3f}{verdict:>7}")
+    return 0 if len(result) else 1
+
+
+def open_mcu_library(path=AppConfig.LIBRARY_DB_FILENAME):
+    """Opens the MCU library (same database as the crystals), importing the JSON file the first time."""
+    library = McuLibrary(path)
+    library.import_json(AppConfig.MCU_LIBRARY_FILENAME)
+    return library
+
+
+def _parse_labelled_value(text):
+    """Parses 'LABEL=VALUE[UNIT]' into (label, (value, unit))."""
+    label, sep, spec = text.partition("=")
+    if not sep or not label.strip():
+        raise argparse.ArgumentTypeError(f"Formato atteso ETICHETTA=VALORE[UNITÀ]: {text}")
+    return label.strip(), split_unit(spec)
+
+
+def _cmd_mcu(args):
+    library = open_mcu_library(args.library_db)
+    try:
+        if args.action in ("add", "delete") and not args.name:
+            print(f"Specificare il nome dell'MCU per '{args.action}'.", file=sys.stderr)
+            return 2
+        if args.action == "add":
+            entry = {group: {label: (value, unit or DEFAULT_UNITS[key.name]) for label, (value, unit) in values}
+                     for group, key, values in (("drive", Param.GM_MCU, args.drive),
+                                                ("package", Param.CS_PIN, args.package))}
+            library.save(args.name, entry)
+            print(f"MCU salvato: {args.name}")
+        elif args.action == "delete":
+            if args.name not in library:
+                print(f"MCU non trovato: {args.name}", file=sys.stderr)
+                return 1
+            library.delete(args.name)
+            print(f"MCU eliminato: {args.name}")
+        else:
+            print(f"{'MCU':<24}{'Drive':<12}{'Package':<12}{'gm [mA/V]':>11}{'Cs_pin [pF]':>13}")
+            for mcu, drive, package, gm, cs_pin in library.variants():
+                print(f"{mcu:<24}{drive:<12}{package:<12}{gm * 1e3:>11.3f}{cs_pin * 1e12:>13.2f}")
+    finally:
+        library.close()
+    return 0
+
+
+def _cmd_compat(args):
+    board = read_work_fields(args.base) if args.base else {}
+    for key, spec in args.set:
+        board[key] = parse_quantity(key, spec)
+    board = {key: value for key, value in board.items() if key in BOARD_PARAMS}
+
+    low, high = _parse_range(Param.CL_SEL, args.cl_range)
+    cl_values = series_values(args.cl_series, low, high)
+    crystals = open_library(args.library_db)
+    names, crystal_columns = crystals.columns()
+    crystals.close()
+    mcus = open_mcu_library(args.library_db)
+    labels, mcu_columns = mcus.columns()
+    mcus.close()
+    if not len(names) or not len(labels):
+        print(f"Libreria vuota: {len(names)} quarzi, {len(labels)} varianti MCU.", file=sys.stderr)
+        return 1
+
+    matrix = CompatibilityMatrix(cl_values, board, cache_path=args.cache or None)
+    result = matrix.compute(names, crystal_columns, labels, mcu_columns)
+    print(f"{len(names)} quarzi x {len(labels)} varianti MCU x {len(cl_values)} valori di CL_sel "
+          f"({result.computed_pairs} coppie ricalcolate).")
+
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["crystal", "mcu", "gain_margin", "dl_ratio", "cl_sel_max", "passing"])
+            for row in result.rows(compatible_only=False):
+                writer.writerow(row)
+        print(f"Matrice salvata in: {args.output}")
+
+    print(f"{'Variante MCU':<40}{'Quarzi compatibili':>20}")
+    for label, count in result.compatible_counts().items():
+        print(f"{label:<40}{count:>20}")
+    print()
+    print(f"{'Quarzo':<30}{'Variante MCU':<36}{'Margin':>10}{'DL/DL_max':>11}{'CL_sel [pF]':>16}")
+    for crystal, mcu, margin, ratio, cl_max, _ in result.rows(args.limit):
+        window = f"{result.cl_sel * 1e12:.1f}-{cl_max * 1e12:.1f}"
+        print(f"{crystal:<30}{mcu:<36}{margin:>10.2f}{ratio:>11.3f}{window:>16}")
+    return 0 if (result.passing > 0).any() else 1
+
+
+def _make_cache(size):
+    return ResultCache(size, version=CrystalCircuitModel.thresholds) if size > 0 else None
+
+
+def _print_cache_stats(cache):
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Cache risultati: {stats['hits']} hit, {stats['misses']} miss ({stats['hit_rate']:.1%}).",
+              file=sys.stderr)
+
+
+def _cmd_bulk(args):
+    if not os.path.isdir(args.root):
+        print(f"Errore: directory non trovata: {args.root}", file=sys.stderr)
+        return 2
+
+    library = open_library(args.library_db)
+    index = ValidationIndex(args.index) if args.index else None
+    out_stream = sys.stdout if args.output in (None, "-") else open(args.output, 'w', newline='')
+    output_format = args.output_format or _detect_format(args.output)
+    try:
+        if index is not None:
+            validator = IncrementalValidator(out_stream, index, output_format, args.chunk_size)
+            all_passed = validator.revalidate(args.root, library, args.workers)
+        else:
+            validator = BatchValidator(out_stream, output_format, args.chunk_size, _make_cache(args.cache_size))
+            all_passed = validator.run(iter_work_designs(args.root, library, args.workers))
+    finally:
+        library.close()
+        if index is not None:
+            index.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+
+    print(f"{validator.total} file .xtal validati, {validator.failed} non superati.", file=sys.stderr)
+    if index is not None:
+        print(f"File aggiornati: {validator.reresolved}, design ricalcolati: {validator.recomputed} "
+              f"(gli altri dall'indice {args.index}); file rimossi: {validator.removed}.", file=sys.stderr)
+        if validator.flips:
+            print(f"Esiti cambiati: {len(validator.flips)}", file=sys.stderr)
+            for path, old, new in validator.flips:
+                print(f"  {path}: {old} -> {new}", file=sys.stderr)
+    else:
+        _print_cache_stats(validator.cache)
+    return 0 if all_passed else 1
+
+
+def _parse_distribution(text):
+    """Parses 'PARAM=uniform:5%', 'PARAM=uniform:LOW:HIGH[UNIT]', 'PARAM=normal:3%',
+    'PARAM=corners:10%' or 'PARAM=corners:V1,V2,...[UNIT]' into (Param, kind, spec)."""
+    key, spec = _parse_assignment(text)
+    kind, _, spec = spec.partition(":")
+    kind = kind.strip().lower()
+    if kind not in ParamDistribution.KINDS or not spec.strip():
+        raise argparse.ArgumentTypeError(f"Distribuzione non valida per {key.name}: '{text}'.")
+    return key, kind, spec.strip()
+
+
+def _build_distribution(key, kind, spec, nominal):
+    if spec.endswith("%"):
+        if nominal is None:
+            raise ValueError(f"Valore nominale mancante per {key.name} (usare --set o --base).")
+        return ParamDistribution.tolerance(nominal, float(spec[:-1]) / 100.0, kind)
+    numbers, unit = split_unit(spec)
+    if kind == 'corners':
+        return ParamDistribution.corners([parse_design_value(key, v, unit) for v in numbers.split(",")])
+    first, _, second = numbers.partition(":")
+    first, second = parse_design_value(key, first, unit), parse_design_value(key, second, unit)
+    return ParamDistribution.uniform(first, second) if kind == 'uniform' else ParamDistribution.normal(first, second)
+
+
+def _cmd_montecarlo(args):
+    nominal = read_work_fields(args.base) if args.base else {}
+    for key, spec in args.set:
+        nominal[key] = parse_quantity(key, spec)
+    try:
+        distributions = {key: _build_distribution(key, kind, spec, nominal.get(key))
+                         for key, kind, spec in args.dist}
+    except ValueError as e:
+        print(f"Errore: {e}", file=sys.stderr)
+        return 2
+
+    analysis = MonteCarloAnalysis(nominal, distributions, args.samples, args.chunk_size, args.workers, args.seed)
+    result = analysis.run(store=analysis.create_store(args.store) if args.store else None)
+
+    print(f"Campioni: {result.n_samples}")
+    print(f"{'Risultato':<14}{'media':>13}{'dev. std':>13}{'p1':>13}{'p50':>13}{'p99':>13}")
+    for key, row in result.summary().items():
+        print(f"{key:<14}" + "".join(f"{row[col]:>13.4e}" for col in ('mean', 'std', 'p1', 'p50', 'p99')))
+    for name, count in result.verdict_counts.items():
+        print(f"  {name}: {count} ({100.0 * count / max(result.n_samples, 1):.4f}%)")
+    if args.store:
+        print(f"Campioni salvati in: {args.store}")
+    return 0 if result.fail_yield <= args.max_fail_rate else 1
+
+
+def _cmd_query(args):
+    from .store import ResultStore
+
+    try:
+        store = ResultStore(args.store)
+        rows = store.query(args.where, limit=args.limit) if args.where else np.arange(min(len(store), args.limit))
+        names = args.columns.split(",") if args.columns else store.names
+        values = store.take(rows, names)
+    except ValueError as e:
+        print(f"Errore: {e}", file=sys.stderr)
+        return 2
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["row"] + list(names))
+    for i, row in enumerate(rows.tolist()):
+        writer.writerow([row] + [values[name][i].item() for name in names])
+    print(f"{rows.size} righe su {len(store)}.", file=sys.stderr)
+    return 0 if rows.size else 1
+
+
+def _parse_objective(text):
+    """Parses 'NAME[:min|max]' (default min) into (name, sense)."""
+    name, _, sense = text.partition(":")
+    sense = sense.strip().lower() or "min"
+    if not name.strip() or sense not in ('min', 'max'):
+        raise argparse.ArgumentTypeError(f"Atteso NOME:min o NOME:max, ricevuto '{text}'.")
+    return name.strip(), sense
+
+
+def _cmd_pareto(args):
+    from .pareto import DEFAULT_OBJECTIVES, pareto_from_store
+
+    objectives = args.objective or DEFAULT_OBJECTIVES
+    try:
+        front = pareto_from_store(args.store, objectives, args.chunk_size)
+    except ValueError as e:
+        print(f"Errore: {e}", file=sys.stderr)
+        return 2
+    if not len(front):
+        print("Archivio vuoto.", file=sys.stderr)
+        return 1
+
+    name, sense = front.active[0]
+    columns = front.sorted_by(name, descending=sense == 'max')
+    names = ["row"] + [key for key in columns if key != "row"]
+    count = len(front) if args.limit is None else min(len(front), args.limit)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(names)
+    for i in range(count):
+        writer.writerow([columns[key][i].item() for key in names])
+    active = ", ".join(f"{key} ({sense})" for key, sense in front.active)
+    print(f"{len(front)} design non dominati su {active}.", file=sys.stderr)
+    return 0
+
+
+def _parse_spurious(text):
+    """Parses 'FREQ,R,C' (e.g. '75.1MHz,80,0.5fF') into a spurious mode in base units."""
+    from .motional import parse_motional
+
+    try:
+        freq, r, c = text.split(",")
+        return parse_quantity(Param.FREQ, freq), parse_motional('R1', r), parse_motional('C1', c)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Atteso FREQ,R,C, ricevuto '{text}' ({e}).")
+
+
+def _cmd_motional(args):
+    from .motional import NegativeResistanceAnalysis, motional_modes, parse_motional, read_motional_fields
+
+    base = read_work_fields(args.base) if args.base else {}
+    for key, spec in args.set:
+        base[key] = parse_quantity(key, spec)
+    try:
+        motional = read_motional_fields(args.base) if args.base else {}
+        for name in ('r1', 'l1', 'c1'):
+            if getattr(args, name):
+                motional[name.upper()] = parse_motional(name.upper(), getattr(args, name))
+        keep = [key for key in args.keep.split(",") if key] if args.keep else []
+        # Designs: every combination of the axes, as in sweep
+        columns = dict(base)
+        axes = dict(args.axis)
+        if axes:
+            mesh = np.meshgrid(*axes.values(), indexing='ij')
+            columns.update({key: values.ravel() for key, values in zip(axes, mesh)})
+        modes = motional_modes(columns, motional.get('R1'), motional.get('L1'), motional.get('C1'), args.spurious)
+        freq = np.asarray(columns.get(Param.FREQ, 0.0), dtype=np.float64)
+        span = args.span * 1e-6
+        grid = np.linspace(freq.min() * (1 - span), freq.max() * (1 + span), args.points)
+        result = NegativeResistanceAnalysis(columns, modes, grid, args.chunk_size).run(keep)
+    except (OSError, ValueError) as e:
+        print(f"Errore: {e}", file=sys.stderr)
+        return 2
+
+    n = len(result)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gain_margin = np.broadcast_to(CrystalCircuitModel.calculate_batch(columns)['gain_margin'], (n,))
+    checks = result.checks()
+    spur = result.mode_margin[:, 1:].max(axis=1, initial=0.0)
+    axis_names = [key.name for key in axes]
+    axis_values = [np.broadcast_to(columns[key], (n,)) for key in axes]
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["design"] + axis_names + ["fs", "f_load", "f_osc", "pulling_ppm", "gain_margin",
+                                               "motional_margin", "spurious_margin", "verdict"])
+    count = n if args.limit is None else min(n, args.limit)
+    for i in range(count):
+        writer.writerow([i] + [values[i].item() for values in axis_values] +
+                        [result.mode_freq[i, 0].item(), result.f_load[i].item(), result.f_osc[i].item(),
+                         result.pulling_ppm[i].item(), gain_margin[i].item(), result.mode_margin[i, 0].item(),
+                         spur[i].item(), CrystalCircuitModel.VERDICT_NAMES[checks['verdict'][i]]])
+    print(f"{n} design x {grid.size} frequenze, {result.mode_freq.shape[1]} modi.", file=sys.stderr)
+
+    if args.output:
+        np.savez(args.output, freq=result.freq, mode_freq=result.mode_freq, mode_margin=result.mode_margin,
+                 f_load=result.f_load, f_osc=result.f_osc, verdict=checks['verdict'], **result.grids,
+                 **{f"axis_{key.name}": values for key, values in zip(axes, axis_values)})
+        print(f"Risultati salvati in: {args.output}", file=sys.stderr)
+    return 0 if not (checks['verdict'] == CrystalCircuitModel.VERDICT_FAIL).any() else 1
+
+
+def _cmd_waveform(args):
+    from .waveform import WaveformAnalysis, WaveformCapture
+
+    nominal = read_work_fields(args.base).get(Param.FREQ) if args.base else None
+    if args.freq:
+        nominal = parse_quantity(Param.FREQ, args.freq)
+    try:
+        capture = WaveformCapture(args.capture, args.sample_rate and parse_quantity(Param.FREQ, args.sample_rate),
+                                  args.dtype, args.scale, args.offset,
+                                  None if args.time_column < 0 else args.time_column, args.column)
+        result = WaveformAnalysis(capture, nominal).run()
+    except (OSError, ValueError) as e:
+        print(f"Errore: {e}", file=sys.stderr)
+        return 2
+
+    print(f"Campioni: {result.n_samples}")
+    print(f"Vpp: {result.vpp * 1e3:.1f} mV")
+    if result.frequency is None:
+        print("Frequenza: non misurabile (meno di due fronti o tempi assenti).")
+        return 1
+    print(f"Frequenza: {result.frequency:.3f} Hz ({result.cycles} periodi)")
+    if result.ppm_error is not None:
+        print(f"Scostamento da FREQ: {result.ppm_error:+.2f} ppm")
+    return 0
+
+
+def _cmd_serve(args):
+    import asyncio
+    from .service import MicroBatcher, ValidationService
+
+    service = ValidationService(MicroBatcher(args.max_batch, args.max_delay_ms / 1000.0, _make_cache(args.cache_size)))
+    where = args.unix or f"http://{args.host}:{args.port}"
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix,
+                                  ready=lambda server: print(f"Servizio di validazione in ascolto su {where}",
+                                                             file=sys.stderr)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _detect_format(path, default="csv"):
+    if path and path != "-":
+        ext = os.path.splitext(path)[1].lower()
+        if ext in (".jsonl", ".ndjson", ".json"):
+            return "jsonl"
+        if ext == ".csv":
+            return "csv"
+    return default
+
+
+def _cmd_validate(args):
+    input_format = args.format or _detect_format(args.input)
+    output_format = args.output_format or _detect_format(args.output, default=input_format)
+
+    in_stream = sys.stdin if args.input in (None, "-") else open(args.input, 'r', newline='')
+    out_stream = sys.stdout if args.output in (None, "-") else open(args.output, 'w', newline='')
+    try:
+        designs = _iter_csv_designs(in_stream) if input_format == "csv" else _iter_jsonl_designs(in_stream)
+        validator = BatchValidator(out_stream, output_format, args.chunk_size, _make_cache(args.cache_size))
+        all_passed = validator.run(designs)
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+
+    print(f"{validator.total} design validati, {validator.failed} non superati.", file=sys.stderr)
+    _print_cache_stats(validator.cache)
+    return 0 if all_passed else 1
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="CrystalValidator",
+                                     description="Crystal Oscillator Validator - modalità headless.")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Registra tempi e numero di chiamate delle sezioni critiche e li salva in FILE (JSON).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    validate = subparsers.add_parser("validate", help="Valida un flusso di design da CSV/JSONL.")
+    validate.add_argument("input", nargs="?", default="-", help="File CSV/JSONL di input ('-' per stdin).")
+    validate.add_argument("-o", "--output", default="-", help="File di output ('-' per stdout).")
+    validate.add_argument("--format", choices=("csv", "jsonl"), help="Formato di input (default: da estensione).")
+    validate.add_argument("--output-format", choices=("csv", "jsonl"), help="Formato di output.")
+    validate.add_argument("--chunk-size", type=int, default=4096, help="Design per blocco di calcolo.")
+    validate.add_argument("--cache-size", type=int, default=0,
+                          help="Design ripetuti da tenere in cache (0 = disattivata).")
+    validate.set_defaults(func=_cmd_validate)
+
+    sweep = subparsers.add_parser("sweep", help="Esplora la griglia di valori di uno o più parametri.")
+    sweep.add_argument("--base", help="File .xtal con il design di partenza.")
+    sweep.add_argument("--set", action="append", default=[], type=_parse_assignment, metavar="PARAM=VALORE",
+                       help="Imposta un parametro fisso, es. GM_MCU=25mA/V.")
+    sweep.add_argument("--axis", action="append", default=[], type=_parse_sweep_axis, metavar="PARAM=SPEC",
+                       help="Asse da variare: START:STOP:NUM[UNIT] oppure V1,V2,...[UNIT], es. CL_SEL=4:30:27pF.")
+    sweep.add_argument("--probes", action="store_true", help="Aggiunge un asse con tutte le sonde predefinite.")
+    sweep.add_argument("--chunk-size", type=int, default=1 << 20, help="Punti massimi per blocco di calcolo.")
+    sweep.add_argument("--save", help="Salva mappa PASS/WARN/FAIL e assi in un file .npz.")
+    sweep.add_argument("--store", help="Salva assi, risultati ed esito di ogni punto in un archivio a colonne.")
+    sweep.set_defaults(func=_cmd_sweep)
+
+    optimize = subparsers.add_parser("optimize", help="Sceglie CL_sel/Rext che massimizzano il margine di guadagno.")
+    optimize.add_argument("--base", help="File .xtal con il design di partenza.")
+    optimize.add_argument("--set", action="append", default=[], type=_parse_assignment, metavar="PARAM=VALORE",
+                          help="Imposta un parametro fisso, es. GM_MCU=25mA/V.")
+    optimize.add_argument("--cl-range", default="1:100pF", help="Intervallo ammesso per CL_sel, es. 4:30pF.")
+    optimize.add_argument("--rext-range", default="0:", help="Intervallo ammesso per Rext, es. 0:2kOhm.")
+    optimize.add_argument("--series", choices=sorted(AppConfig.STANDARD_SERIES), help="Arrotonda a valori standard.")
+    optimize.add_argument("--library", action="store_true", help="Risolve per ogni quarzo della libreria.")
+    optimize.add_argument("--library-db", default=AppConfig.LIBRARY_DB_FILENAME, help="Database della libreria quarzi.")
+    optimize.set_defaults(func=_cmd_optimize)
+
+    sensitivity = subparsers.add_parser("sensitivity", help="Sensibilità analitica dei risultati a ogni parametro.")
+    sensitivity.add_argument("--base", help="File .xtal con il design da analizzare.")
+    sensitivity.add_argument("--set", action="append", default=[], type=_parse_assignment, metavar="PARAM=VALORE",
+                             help="Imposta un parametro fisso, es. GM_MCU=25mA/V.")
+    sensitivity.add_argument("--absolute", action="store_true",
+                             help="Stampa le derivate dr/dp invece delle sensibilità normalizzate.")
+    sensitivity.add_argument("--library", action="store_true", help="Analizza ogni quarzo della libreria.")
+    sensitivity.add_argument("--library-db", default=AppConfig.LIBRARY_DB_FILENAME, help="Database della libreria quarzi.")
+    sensitivity.add_argument("-o", "--output", help="Salva una riga per design in un file CSV.")
+    sensitivity.set_defaults(func=_cmd_sensitivity)
+
+    bulk = subparsers.add_parser("bulk", help="Rivalida tutti i file .xtal di una directory.")
+    bulk.add_argument("root", help="Directory da esplorare ricorsivamente.")
+    bulk.add_argument("-o", "--output", default="-", help="File di riepilogo ('-' per stdout).")
+    bulk.add_argument("--output-format", choices=("csv", "jsonl"), help="Formato del riepilogo.")
+    bulk.add_argument("--workers", type=int, help="Processi per la lettura dei file (default: numero di core).")
+    bulk.add_argument("--chunk-size", type=int, default=4096, help="Design per blocco di calcolo.")
+    bulk.add_argument("--cache-size", type=int, default=AppConfig.RESULT_CACHE_SIZE,
+                      help="Design ripetuti da tenere in cache (0 = disattivata).")
+    bulk.add_argument("--library-db", default=AppConfig.LIBRARY_DB_FILENAME, help="Database della libreria quarzi.")
+    bulk.add_argument("--index", nargs="?", const=AppConfig.VALIDATION_INDEX_FILENAME,
+                      help="Modalità incrementale: ricalcola solo i design cambiati rispetto all'indice "
+                           f"(default: {AppConfig.VALIDATION_INDEX_FILENAME}) e riporta gli esiti cambiati.")
+    bulk.set_defaults(func=_cmd_bulk)
+
+    find = subparsers.add_parser("find", help="Trova i quarzi della libreria compatibili con MCU e scheda.")
+    find.add_argument("--base", help="File .xtal da cui leggere MCU e scheda.")
+    find.add_argument("--set", action="append", default=[], type=_parse_assignment, metavar="PARAM=VALORE",
+                      help="Parametro di MCU/scheda, es. GM_MCU=25mA/V, CL_SEL=10pF.")
+    find.add_argument("--freq", help="Filtra per frequenza, es. 25MHz.")
+    find.add_argument("--tolerance", type=float, default=AppConfig.FINDER_FREQ_TOLERANCE,
+                      help="Tolleranza relativa sulla frequenza.")
+    find.add_argument("--pass-only", action="store_true", help="Esclude i quarzi con esito WARN.")
+    find.add_argument("--limit", type=int, default=50, help="Righe massime stampate.")
+    find.add_argument("--library-db", default=AppConfig.LIBRARY_DB_FILENAME, help="Database della libreria quarzi.")
+    find.set_defaults(func=_cmd_find)
+
+    montecarlo = subparsers.add_parser("montecarlo", help="Analisi Monte Carlo di tolleranze e resa.")
+    montecarlo.add_argument("--base", help="File .xtal con il design nominale.")
+    montecarlo.add_argument("--set", action="append", default=[], type=_parse_assignment, metavar="PARAM=VALORE",
+                            help="Imposta un valore nominale, es. CL_SEL=15pF.")
+    montecarlo.add_argument("--dist", action="append", default=[], type=_parse_distribution, metavar="PARAM=LEGGE",
+                            help="Distribuzione: uniform:5%%, uniform:LOW:HIGH[UNIT], normal:3%%, "
+                                 "normal:MEAN:SIGMA[UNIT], corners:10%%, corners:V1,V2,...[UNIT].")
+    montecarlo.add_argument("--samples", type=lambda v: int(float(v)), default=1_000_000, help="Numero di campioni.")
+    montecarlo.add_argument("--workers", type=int, help="Processi paralleli (default: numero di core).")
+    montecarlo.add_argument("--seed", type=int, help="Seme del generatore casuale.")
+    montecarlo.add_argument("--chunk-size", type=int, default=1 << 20, help="Campioni per blocco di calcolo.")
+    montecarlo.add_argument("--max-fail-rate", type=float, default=0.0,
+                            help="Frazione massima di FAIL ammessa per il codice di uscita 0.")
+    montecarlo.add_argument("--store", help="Salva ogni campione in un archivio a colonne.")
+    montecarlo.set_defaults(func=_cmd_montecarlo)
+
+    mcu = subparsers.add_parser("mcu", help="Gestisce la libreria MCU (gm per drive, Cs_pin per package).")
+    mcu.add_argument("action", choices=("list", "add", "delete"), nargs="?", default="list", help="Operazione.")
+    mcu.add_argument("name", nargs="?", help="Nome dell'MCU (per add/delete).")
+    mcu.add_argument("--drive", action="append", default=[], type=_parse_labelled_value, metavar="DRIVE=GM",
+                     help="Transconduttanza per impostazione di drive, es. HIGH=15mA/V.")
+    mcu.add_argument("--package", action="append", default=[], type=_parse_labelled_value, metavar="PACKAGE=CS",
+                     help="Capacità di pin per package, es. LQFP48=5pF.")
+    mcu.add_argument("--library-db", default=AppConfig.LIBRARY_DB_FILENAME, help="Database delle librerie.")
+    mcu.set_defaults(func=_cmd_mcu)
+
+    compat = subparsers.add_parser("compat", help="Matrice di compatibilità quarzi x MCU della libreria.")
+    compat.add_argument("--base", help="File .xtal da cui leggere i parametri di scheda.")
+    compat.add_argument("--set", action="append", default=[], type=_parse_assignment, metavar="PARAM=VALORE",
+                        help="Parametro di scheda, es. CS_PCB=2pF, VPP_MEASURED=1V.")
+    compat.add_argument("--cl-range", default="4:30pF", help="Intervallo ammesso per CL_sel, es. 4:30pF.")
+    compat.add_argument("--cl-series", default="E12", choices=sorted(AppConfig.STANDARD_SERIES),
+                        help="Serie dei valori di CL_sel ammessi.")
+    compat.add_argument("--cache", default=AppConfig.COMPAT_CACHE_FILENAME,
+                        help="File della matrice salvata ('' per non usarlo).")
+    compat.add_argument("--limit", type=int, default=50, help="Coppie massime stampate.")
+    compat.add_argument("-o", "--output", help="Salva tutte le coppie in un file CSV.")
+    compat.add_argument("--library-db", default=AppConfig.LIBRARY_DB_FILENAME, help="Database delle librerie.")
+    compat.set_defaults(func=_cmd_compat)
+
+    query = subparsers.add_parser("query", help="Interroga un archivio a colonne di sweep o Monte Carlo.")
+    query.add_argument("store", help="Directory dell'archivio (creata con --store).")
+    query.add_argument("--where", help="Condizione, es. 'gain_margin < 5 and dl_ratio > 0.8'.")
+    query.add_argument("--columns", help="Colonne da stampare, separate da virgole (default: tutte).")
+    query.add_argument("--limit", type=int, default=100, help="Righe massime stampate.")
+    query.set_defaults(func=_cmd_query)
+
+    pareto = subparsers.add_parser("pareto", help="Fronte di Pareto dei design di un archivio di sweep o Monte Carlo.")
+    pareto.add_argument("store", help="Directory dell'archivio (creata con --store).")
+    pareto.add_argument("--objective", action="append", type=_parse_objective,
+                        help="Obiettivo NOME:min|max, ripetibile (default: gain_margin:max, dl_ratio:min, "
+                             "REXT_SEL:min, CL_SEL:min; le colonne assenti sono ignorate).")
+    pareto.add_argument("--limit", type=int, help="Righe massime stampate (default: tutte).")
+    pareto.add_argument("--chunk-size", type=int, default=1 << 20, help="Righe lette per blocco.")
+    pareto.set_defaults(func=_cmd_pareto)
+
+    motional = subparsers.add_parser("motional",
+                                     help="Resistenza negativa, impedenza del quarzo e pulling sul modello motional.")
+    motional.add_argument("--base", help="File .xtal con il design (ed eventuali R1, L1, C1).")
+    motional.add_argument("--set", action="append", default=[], type=_parse_assignment, metavar="PARAM=VALORE",
+                          help="Imposta un parametro, es. GM_MCU=12mA/V.")
+    motional.add_argument("--axis", action="append", default=[], type=_parse_sweep_axis, metavar="PARAM=SPEC",
+                          help="Asse di design, es. GM_MCU=1:30:100mA/V (un design per combinazione).")
+    motional.add_argument("--c1", help="Capacità motional del modo principale, es. 5fF.")
+    motional.add_argument("--l1", help="Induttanza motional del modo principale, es. 8mH (alternativa a --c1).")
+    motional.add_argument("--r1", help="Resistenza motional del modo principale (default: ESR_MAX).")
+    motional.add_argument("--spurious", action="append", default=[], type=_parse_spurious, metavar="FREQ,R,C",
+                          help="Modo spurio o overtone, es. 75.1MHz,80,0.5fF (ripetibile).")
+    motional.add_argument("--span", type=float, default=1000.0, help="Semiampiezza della griglia attorno a FREQ (ppm).")
+    motional.add_argument("--points", type=lambda v: int(float(v)), default=1_000_000, help="Punti della griglia.")
+    motional.add_argument("--chunk-size", type=int, default=1 << 22, help="Punti design x frequenza per blocco.")
+    motional.add_argument("--keep", help="Griglie da salvare con -o, separate da virgole "
+                                         "(r_neg, x_load, margin, z_crystal).")
+    motional.add_argument("--limit", type=int, help="Design massimi stampati (default: tutti).")
+    motional.add_argument("-o", "--output", help="Salva riepiloghi e griglie in un file .npz.")
+    motional.set_defaults(func=_cmd_motional)
+
+    waveform = subparsers.add_parser("waveform", help="Misura Vpp e frequenza da un'acquisizione dell'oscilloscopio.")
+    waveform.add_argument("capture", help="File CSV (tempo, tensione), .npy o binario grezzo.")
+    waveform.add_argument("--sample-rate", help="Frequenza di campionamento, es. 100MHz (obbligatoria senza tempi).")
+    waveform.add_argument("--column", type=int, default=1, help="Colonna della tensione nei file CSV.")
+    waveform.add_argument("--time-column", type=int, default=0, help="Colonna dei tempi nei file CSV (-1 = assente).")
+    waveform.add_argument("--dtype", default="int16", help="Tipo dei campioni dei file binari grezzi.")
+    waveform.add_argument("--scale", type=float, default=1.0, help="Volt per unità dei campioni grezzi.")
+    waveform.add_argument("--offset", type=float, default=0.0, help="Offset in volt dei campioni grezzi.")
+    waveform.add_argument("--base", help="File .xtal da cui leggere FREQ nominale.")
+    waveform.add_argument("--freq", help="Frequenza nominale per lo scostamento in ppm, es. 25MHz.")
+    waveform.set_defaults(func=_cmd_waveform)
+
+    serve = subparsers.add_parser("serve", help="Servizio locale di validazione JSON (HTTP).")
+    serve.add_argument("--host", default="127.0.0.1", help="Indirizzo di ascolto.")
+    serve.add_argument("--port", type=int, default=8765, help="Porta TCP.")
+    serve.add_argument("--unix", help="Ascolta su un socket Unix invece che su TCP.")
+    serve.add_argument("--max-batch", type=int, default=1024, help="Design massimi per micro-batch.")
+    serve.add_argument("--max-delay-ms", type=float, default=0.0,
+                       help="Attesa massima per riempire un micro-batch (ms).")
+    serve.add_argument("--cache-size", type=int, default=AppConfig.RESULT_CACHE_SIZE,
+                       help="Design ripetuti da tenere in cache (0 = disattivata).")
+    serve.set_defaults(func=_cmd_serve)
+    return parser
+
+
+def headless_main(argv=None):
+    """Entry point for the command-line mode; returns the process exit code."""
+    args = build_arg_parser().parse_args(argv)
+    if args.profile:
+        profiler.enable(args.profile)
+    return args.func(args)
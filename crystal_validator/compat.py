@@ -0,0 +1,181 @@
+"""Crystal x MCU compatibility matrix over a set of allowed load capacitors."""
+import json
+import os
+
+import numpy as np
+
+from .config import AppConfig
+from .model import CrystalCircuitModel, Param
+from .rules import ValidationThresholds
+
+CRYSTAL_PARAMS = (Param.FREQ, Param.C0, Param.ESR_MAX, Param.DL_MAX)
+MCU_PARAMS = (Param.GM_MCU, Param.CS_PIN)
+BOARD_PARAMS = (Param.CS_PCB, Param.REXT_SEL, Param.VPP_MEASURED, Param.C_PROBE)
+
+
+class CompatibilityResult:
+    """crystals x MCU variants arrays over the allowed CL_SEL values.
+
+    gain_margin and dl_ratio are those of the best choice, the smallest allowed CL_SEL
+    (`cl_sel`); `passing` counts the CL_SEL values that do not FAIL and `cl_sel_max` is the
+    largest of them (NaN if none), i.e. the usable capacitor window of each pair.
+    """
+
+    KEYS = ('gain_margin', 'dl_ratio', 'cl_sel_max', 'passing')
+
+    def __init__(self, crystals, mcus, cl_values, arrays, computed_pairs):
+        self.crystals = crystals
+        self.mcus = mcus
+        self.cl_values = cl_values
+        self.cl_sel = float(cl_values[0])
+        self.gain_margin, self.dl_ratio, self.cl_sel_max, self.passing = (arrays[key] for key in self.KEYS)
+        self.computed_pairs = computed_pairs
+
+    @property
+    def shape(self):
+        return self.gain_margin.shape
+
+    def compatible_counts(self):
+        """Number of compatible crystals per MCU variant label."""
+        return dict(zip(self.mcus.tolist(), (self.passing > 0).sum(axis=0).tolist()))
+
+    def rows(self, limit=None, compatible_only=True):
+        """Yields (crystal, mcu, gain_margin, dl_ratio, largest passing CL_SEL, passing CL values),
+        best margin first."""
+        margin = self.gain_margin.ravel()
+        candidates = np.flatnonzero(self.passing.ravel() > 0) if compatible_only else np.arange(margin.size)
+        order = candidates[np.argsort(-margin[candidates], kind='stable')]
+        if limit is not None:
+            order = order[:limit]
+        n_mcus = self.shape[1]
+        for flat in order.tolist():
+            i, j = divmod(flat, n_mcus)
+            yield (self.crystals[i], self.mcus[j], float(self.gain_margin[i, j]), float(self.dl_ratio[i, j]),
+                   float(self.cl_sel_max[i, j]), int(self.passing[i, j]))
+
+
+class CompatibilityMatrix:
+    """Broadcasts every crystal (rows) against every MCU variant (columns) and the allowed CL_SEL values.
+
+    As in LoadOptimizer, gm_crit and drive_level grow monotonically with CL_SEL, so the
+    CL_SEL values that do not FAIL are always a prefix of the sorted list: the best one is
+    the smallest, evaluated with calculate_batch(), and the rest of the window follows
+    from closed-form CL_SEL bounds and one binary search per pair. No crystals x MCUs x CL
+    tensor is ever built. Results are persisted in `cache_path`, keyed on the crystal and
+    MCU values (not their names) and on the settings, so only new or edited rows and
+    columns are recomputed next time.
+    """
+
+    def __init__(self, cl_values, board=None, thresholds=None, chunk_size=1 << 20,
+                 cache_path=AppConfig.COMPAT_CACHE_FILENAME):
+        self.cl_values = np.unique(np.asarray(cl_values, dtype=np.float64))
+        if self.cl_values.size == 0:
+            raise ValueError("Nessun valore di CL_sel ammesso.")
+        self.board = {key: float((board or {}).get(key, 0.0)) for key in BOARD_PARAMS}
+        self.thresholds = thresholds or ValidationThresholds()
+        self.chunk_size = max(1, int(chunk_size))
+        self.cache_path = cache_path
+
+    def _settings(self):
+        return json.dumps({"cl": self.cl_values.tolist(), "board": {k.name: v for k, v in self.board.items()},
+                           "thresholds": self.thresholds.as_tuple()})
+
+    def compute(self, crystals, crystal_columns, mcus, mcu_columns, progress=None, cancel=None):
+        """`crystal_columns`/`mcu_columns` are {Param: 1-D array} as returned by the libraries' columns().
+
+        `progress(done, total)` is reported in recomputed pairs; `cancel` is checked between blocks.
+        """
+        x_keys = np.column_stack([np.asarray(crystal_columns[key], dtype=np.float64) for key in CRYSTAL_PARAMS])
+        m_keys = np.column_stack([np.asarray(mcu_columns[key], dtype=np.float64) for key in MCU_PARAMS])
+        x_keys = x_keys.reshape(-1, len(CRYSTAL_PARAMS))
+        m_keys = m_keys.reshape(-1, len(MCU_PARAMS))
+        shape = (len(x_keys), len(m_keys))
+        arrays = {'gain_margin': np.empty(shape), 'dl_ratio': np.empty(shape), 'cl_sel_max': np.empty(shape),
+                  'passing': np.empty(shape, dtype=np.uint16)}
+
+        cached = self._load_cache()
+        x_index = self._lookup(x_keys, cached['crystals']) if cached else np.full(shape[0], -1)
+        m_index = self._lookup(m_keys, cached['mcus']) if cached else np.full(shape[1], -1)
+        known_x, known_m = x_index >= 0, m_index >= 0
+        if known_x.any() and known_m.any():
+            rows, cols = np.ix_(x_index[known_x], m_index[known_m])
+            for key, values in arrays.items():
+                values[np.ix_(known_x, known_m)] = cached[key][rows, cols]
+
+        new_x, new_m, old_x = np.flatnonzero(~known_x), np.flatnonzero(~known_m), np.flatnonzero(known_x)
+        # New crystals against every MCU, then the known crystals against the new MCUs only
+        blocks = [(new_x, np.arange(shape[1])), (old_x, new_m)]
+        blocks = [(rows, cols) for rows, cols in blocks if rows.size and cols.size]
+        total = sum(rows.size * cols.size for rows, cols in blocks)
+        computed = 0
+        for rows, cols in blocks:
+            for done in self._evaluate_into(arrays, rows, cols, x_keys, m_keys):
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                computed += done
+                if progress is not None:
+                    progress(computed, total)
+
+        if self.cache_path and computed:
+            self._save_cache(x_keys, m_keys, arrays)
+        return CompatibilityResult(np.asarray(crystals, dtype=object), np.asarray(mcus, dtype=object),
+                                   self.cl_values, arrays, computed)
+
+    @staticmethod
+    def _lookup(keys, cached_keys):
+        """Row of each key in `cached_keys`, or -1."""
+        position = {tuple(row): i for i, row in enumerate(cached_keys.tolist())}
+        return np.array([position.get(tuple(row), -1) for row in keys.tolist()], dtype=np.int64)
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with np.load(self.cache_path) as data:
+                if str(data['settings']) != self._settings():
+                    return None
+                return {name: data[name] for name in data.files}
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save_cache(self, x_keys, m_keys, arrays):
+        tmp = self.cache_path + ".tmp.npz"
+        np.savez(tmp, settings=np.array(self._settings()), crystals=x_keys, mcus=m_keys, **arrays)
+        os.replace(tmp, self.cache_path)
+
+    def _evaluate_into(self, arrays, x_rows, m_cols, x_keys, m_keys):
+        """Fills arrays[x_rows x m_cols] in blocks of crystals of at most `chunk_size` pairs,
+        yielding the number of pairs of each block."""
+        board, t, cl = self.board, self.thresholds, self.cl_values
+        gm, cs_pin = m_keys[m_cols, 0][None, :], m_keys[m_cols, 1][None, :]
+        c_leg_fixed = board[Param.CS_PCB] + cs_pin
+        block = max(1, self.chunk_size // max(1, m_cols.size))
+
+        for start in range(0, x_rows.size, block):
+            rows = x_rows[start:start + block]
+            f, c0, esr_max, dl_max = (x_keys[rows, i][:, None] for i in range(len(CRYSTAL_PARAMS)))
+            columns = dict(zip(CRYSTAL_PARAMS, (f, c0, esr_max, dl_max)))
+            columns.update({Param.GM_MCU: gm, Param.CS_PIN: cs_pin, Param.CL_SEL: cl[0]})
+            columns.update({key: value for key, value in board.items() if key != Param.CS_PIN})
+            with np.errstate(divide='ignore', invalid='ignore'):
+                results = CrystalCircuitModel.calculate_batch(columns)
+
+                # Largest CL_SEL that still does not FAIL, from gm_crit <= min(gm, gm / margin_critical)
+                # and dl_ratio <= dl_ratio_max solved for CL_SEL
+                total_esr = esr_max + board[Param.REXT_SEL]
+                omega = 2 * np.pi * f
+                gm_limit = np.minimum(gm, gm / t.margin_critical)
+                cl_gm = 2.0 * (np.sqrt(gm_limit / (4.0 * total_esr * omega ** 2)) - c0) - c_leg_fixed
+                swing = np.pi * f * board[Param.VPP_MEASURED]
+                cl_dl = np.sqrt(t.dl_ratio_max * dl_max / (total_esr / 2.0)) / swing - c_leg_fixed \
+                    - board[Param.C_PROBE]
+                cl_max = np.minimum(cl_gm, cl_dl)
+            # NaN bounds (degenerate inputs) admit nothing
+            passing = np.searchsorted(cl, np.where(np.isnan(cl_max), -np.inf, cl_max * (1 + 1e-12)), side='right')
+
+            target = np.ix_(rows, m_cols)
+            arrays['gain_margin'][target] = results['gain_margin']
+            arrays['dl_ratio'][target] = results['dl_ratio']
+            arrays['cl_sel_max'][target] = np.where(passing > 0, cl[np.maximum(passing - 1, 0)], np.nan)
+            arrays['passing'][target] = passing
+            yield rows.size * m_cols.size
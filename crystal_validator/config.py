@@ -0,0 +1,138 @@
+"""Application constants: units, presets, GUI theme and input layout."""
+
+
+class AppConfig:
+    """Centralizes all application constants and configuration."""
+    APP_VERSION = "3.4"  # Versione aggiornata
+    LIBRARY_FILENAME = "xtal_library.json"      # Legacy format, imported once into the database
+    LIBRARY_DB_FILENAME = "xtal_library.db"
+    MCU_LIBRARY_FILENAME = "mcu_library.json"   # Optional MCU presets, imported once into the database
+    COMPAT_CACHE_FILENAME = "compat_matrix.npz" # Persisted crystal x MCU compatibility matrix
+    VALIDATION_INDEX_FILENAME = "validation_index.db"  # Fingerprints of incremental bulk re-validation
+    LIBRARY_PAGE_SIZE = 200                     # Names shown per combobox page
+    FINDER_FREQ_TOLERANCE = 1e-3                # Relative window around FREQ for the part finder
+    FINDER_MAX_ROWS = 500                       # Compatible crystals listed in the GUI
+    LIVE_RECALC_DELAY_MS = 40                   # Coalescing window for live recalculation
+    JOB_POLL_MS = 50                            # Background job queue polling interval
+    MONTECARLO_GUI_SAMPLES = 1_000_000          # Default sample count of the GUI tolerance analysis
+    SWEEP_GUI_POINTS = 1000                     # Default points per axis of the GUI CL_sel x Rext sweep
+    SWEEP_GUI_CL_RANGE_PF = (1.0, 40.0)
+    SWEEP_GUI_REXT_RANGE_OHM = (0.0, 2000.0)
+    COMPAT_GUI_CL_RANGE_PF = (4.0, 30.0)        # Allowed CL_sel of the GUI compatibility matrix
+    COMPAT_GUI_SERIES = "E12"
+    RESULTS_VISIBLE_ROWS = 25                   # Rows drawn by the results browser
+    CURVE_GUI_POINTS = 1_000_000                # Points per curve of the GUI result plot
+    RESULT_CACHE_SIZE = 4096                    # Designs kept by the LRU result cache
+    WAVEFORM_CHUNK_SAMPLES = 1 << 20            # Samples per block when streaming a scope capture
+    WAVEFORM_PEAK_PERCENTILE = 0.1              # Vpp = p(100 - x) - p(x), ignores spikes and glitches
+    WAVEFORM_HYSTERESIS = 0.1                   # Edge detector hysteresis, fraction of Vpp
+
+    # Colors (Scientific Paper Theme)
+    COLOR_OK = "#006400"                # Dark Green
+    COLOR_WARN = "#E69500"              # Amber/Ochre
+    COLOR_ERROR = "#C00000"             # Dark Red
+    COLOR_BACKGROUND = "#FFFFFF"        # White
+    COLOR_FRAME_BG = "#FDFDFD"          # Off-white
+    COLOR_ACCENT = "#A00000"             # Dark, academic red
+    COLOR_ACCENT_DARK = "#700000"        # Darker red for active states
+    COLOR_TEXT_PRIMARY = "#000000"       # Black
+    COLOR_TEXT_SECONDARY = "#555555"     # Dark Gray
+    COLOR_SEPARATOR = "#DDDDDD"         # Light Gray
+    COLOR_STALE_RESULT = "#777777"       # Gray
+    COLOR_INVALID_ENTRY = "#FFEEEE"     # Light pink
+    COLOR_DISABLED_ENTRY = "#F5F5F5"    # Very light gray
+    COLOR_BAND_OK = "#EDF6ED"           # Pale green (plot bands)
+    COLOR_BAND_WARN = "#FDF4E3"         # Pale amber
+    COLOR_BAND_ERROR = "#FAE8E8"        # Pale red
+
+    # Fonts (Scientific Paper Theme)
+    FONT_DEFAULT = ('Times New Roman', 11)
+    FONT_ITALIC = ('Times New Roman', 10, 'italic')
+    FONT_BOLD = ('Times New Roman', 11, 'bold')
+    FONT_TITLE = ('Times New Roman', 12, 'bold')
+    FONT_GROUP_TITLE = ('Times New Roman', 13, 'bold')
+    FONT_HEADER = ('Times New Roman', 14, 'bold')
+    FONT_MAIN_TITLE = ('Times New Roman', 18, 'bold')
+    FONT_VALUE = ('Times New Roman', 12, 'bold')
+    FONT_VALUE_STALE = ('Times New Roman', 12, 'normal')
+    FONT_STATUS = ('Times New Roman', 11, 'bold')
+    FONT_FINAL_STATUS = ('Times New Roman', 16, 'bold')
+    # Font for the formulas window
+    FONT_FORMULA_TITLE = ('Times New Roman', 13, 'bold')
+    FONT_FORMULA = ('Courier New', 11, 'bold') # Monospaced for formulas
+    FONT_FORMULA_DESC = ('Times New Roman', 11)
+
+    # Unit Multipliers
+    UNIT_MULTIPLIERS = {
+        'Hz': 1, 'kHz': 1e3, 'MHz': 1e6,
+        'F': 1, 'pF': 1e-12, 'nF': 1e-9, 'uF': 1e-6,
+        'Ohm': 1, 'kOhm': 1e3,
+        'W': 1, 'mW': 1e-3, 'uW': 1e-6,
+        'A/V': 1, 'mA/V': 1e-3,
+        'V': 1, 'mV': 1e-3,
+    }
+
+    # Probe Data
+    PROBE_MODELS = {
+        "Manuale/Custom": 0.0,
+        "Sonda Attiva (LeCroy ZS1500)": 0.9,  # Valore in pF
+        "Sonda Passiva (Tek P5050B)": 12.0,  # Valore in pF
+    }
+    DEFAULT_PROBE_NAME = "Manuale/Custom"
+
+    # Crystal Presets
+    XTAL_PRESETS = {
+        "Manuale/Custom": {},
+        "ECS-250-10-36Q-AES-TR": {
+            "FREQ": ("25", "MHz"),
+            "C0": ("5", "pF"),
+            "ESR_MAX": ("60", "Ohm"),
+            "DL_MAX": ("100", "uW"),
+        },
+        "Abracon IXA20 (24MHz)": {
+            "FREQ": ("24", "MHz"),
+            "C0": ("5", "pF"),
+            "ESR_MAX": ("40", "Ohm"),
+            "DL_MAX": ("300", "uW"),
+        },
+        "MicroCrystal CM7V-T1A (32.768kHz)": {
+            "FREQ": ("32.768", "kHz"),
+            "C0": ("1.3", "pF"),
+            "ESR_MAX": ("70", "kOhm"),
+            "DL_MAX": ("1.0", "uW"),
+        }
+    }
+    DEFAULT_XTAL_NAME = "Manuale/Custom"
+
+    # Standard component series (mantissas of one decade)
+    STANDARD_SERIES = {
+        "E12": (1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2),
+        "E24": (1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
+                3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1),
+    }
+
+    # GUI Layout Definitions
+    PARAM_MAP = {
+        "Parametri del Cristallo (XTAL Datasheet)": [
+            ("FREQ", "Frequenza (F)", "", "MHz", ['MHz', 'kHz', 'Hz'], "Frequenza operativa nominale."),
+            ("C0", "Capacità Shunt (C0)", "", "pF", ['pF', 'nF', 'F'],
+             "Capacità del contenitore e degli elettrodi."),
+            ("ESR_MAX", "ESR Max", "", "Ohm", ['Ohm', 'kOhm'], "Massima Resistenza Serie Equivalente."),
+            ("DL_MAX", "DL Max", "", "uW", ['uW', 'mW', 'W'], "Massima potenza dissipabile."),
+        ],
+        "Parametri Circuito e MCU": [
+            ("GM_MCU", "Gm MCU", "", "mA/V", ['mA/V', 'A/V'], "Transconduttanza dell'amplificatore MCU."),
+            ("CL_SEL", "CL Esterna (CL_sel)", "", "pF", ['pF', 'nF', 'F'],
+             "Valore condensatori esterni (CL1=CL2)."),
+            ("REXT_SEL", "Rext Selezionata", "", "Ohm", ['Ohm', 'kOhm'],
+             "Resistenza in serie per limitazione corrente."),
+            ("CS_PIN", "Cs PIN", "", "pF", ['pF', 'nF', 'F'], "Capacità parassita del singolo pin MCU (un ramo)."),
+            ("CS_PCB", "Cs PCB", "", "pF", ['pF', 'nF', 'F'], "Capacità parassita della singola linea PCB (un ramo)."),
+        ],
+        "Misurazioni (Per calcolo DL effettivo)": [
+            ("VPP_MEASURED", "Vpp Misurata", "", "mV", ['mV', 'V'],
+             "Tensione Picco-Picco misurata su OSC_IN (pin CL1)."),
+            ("C_PROBE", "Cap. Sonda (C_probe)", "", "pF", ['pF', 'nF', 'F'],
+             "Capacità della sonda DSO utilizzata."),
+        ]
+    }
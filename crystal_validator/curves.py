@@ -0,0 +1,63 @@
+"""Result curves against one Param, their PASS/WARN/FAIL bands and min/max decimation for drawing."""
+import numpy as np
+
+from .model import CrystalCircuitModel, Param
+from .rules import ValidationThresholds
+
+CURVE_KEYS = ('gain_margin', 'gm_crit', 'drive_level')
+AXIS_PARAMS = (Param.CL_SEL, Param.REXT_SEL)
+
+
+def result_curves(params, axis, values, keys=CURVE_KEYS):
+    """{key: array like `values`} with `axis` set to each of `values`, the other Params from `params` (base units)."""
+    values = np.asarray(values, dtype=np.float64)
+    columns = dict(params)
+    columns[axis] = values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results = CrystalCircuitModel.calculate_batch(columns)
+    return {key: np.broadcast_to(results[key], values.shape) for key in keys}
+
+
+def threshold_bands(key, params, thresholds=None):
+    """Ascending (low, high, code) intervals of result `key` and the PASS/WARN/FAIL code of its check.
+
+    gain_margin follows the margin check, drive_level the drive-level check scaled by
+    DL_MAX, gm_crit both the startup and the margin check (gain_margin = GM_MCU / gm_crit).
+    """
+    t = thresholds or ValidationThresholds()
+    ok, warn, fail = CrystalCircuitModel.VERDICT_PASS, CrystalCircuitModel.VERDICT_WARN, CrystalCircuitModel.VERDICT_FAIL
+    if key == 'gain_margin':
+        return [(-np.inf, t.margin_critical, fail), (t.margin_critical, t.margin_warn, warn), (t.margin_warn, np.inf, ok)]
+    if key == 'gm_crit':
+        gm = float(params.get(Param.GM_MCU, 0.0))
+        warn_limit, fail_limit = min(gm, gm / t.margin_warn), min(gm, gm / t.margin_critical)
+        return [(-np.inf, warn_limit, ok), (warn_limit, fail_limit, warn), (fail_limit, np.inf, fail)]
+    if key == 'drive_level':
+        dl_max = float(params.get(Param.DL_MAX, 0.0))
+        warn_limit, fail_limit = t.dl_ratio_warn * dl_max, t.dl_ratio_max * dl_max
+        return [(-np.inf, warn_limit, ok), (warn_limit, fail_limit, warn), (fail_limit, np.inf, fail)]
+    raise ValueError(f"Nessuna soglia definita per {key}.")
+
+
+def decimate_minmax(x, y, x_range, width):
+    """Min and max of `y` in each of `width` pixel columns of `x_range`; `x` must be ascending.
+
+    Returns (column, y_min, y_max) for the columns holding at least one point. Joining the
+    vertical span of every column draws exactly what the full curve would at that width,
+    with at most 2 * width vertices however many points there are. NaNs are skipped.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x0, x1 = x_range
+    edges = x0 + (x1 - x0) * np.arange(width + 1) / width
+    starts = np.searchsorted(x, edges[:-1], side='left')
+    stop = np.searchsorted(x, x1, side='right')
+    ends = np.append(starts[1:], stop)
+    filled = np.flatnonzero(starts < np.minimum(ends, stop))
+    if filled.size == 0:
+        empty = np.empty(0)
+        return filled, empty, empty
+    # reduceat() reduces each start up to the next one, and the last one up to the end
+    y = y[:stop]
+    with np.errstate(invalid='ignore'):
+        return filled, np.fmin.reduceat(y, starts[filled]), np.fmax.reduceat(y, starts[filled])
@@ -0,0 +1,77 @@
+"""Library-wide part finder: which stored crystals work with a given MCU and board."""
+import numpy as np
+
+from .model import CrystalCircuitModel, Param
+
+
+class FinderResult:
+    """Compatible crystals ranked by gain margin (best first), as parallel arrays."""
+
+    def __init__(self, names, columns, results, verdict):
+        self.names = names
+        self.columns = columns
+        self.results = results
+        self.verdict = verdict
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows(self, limit=None):
+        """Yields (name, FREQ, gain_margin, dl_ratio, verdict name) for display."""
+        freq, margin, ratio = self.columns[Param.FREQ], self.results['gain_margin'], self.results['dl_ratio']
+        for i in range(len(self) if limit is None else min(limit, len(self))):
+            yield (self.names[i], float(freq[i]), float(margin[i]), float(ratio[i]),
+                   CrystalCircuitModel.VERDICT_NAMES[self.verdict[i]])
+
+
+class CrystalFinder:
+    """Screens every library crystal against fixed MCU/board values in one vectorized pass.
+
+    Library columns are loaded once and reused until the library is written again.
+    Because they are sorted by frequency, the optional frequency window is a binary
+    search followed by a zero-copy slice.
+    """
+
+    BOARD_PARAMS = (Param.GM_MCU, Param.CS_PIN, Param.CS_PCB, Param.CL_SEL, Param.REXT_SEL,
+                    Param.VPP_MEASURED, Param.C_PROBE)
+
+    def __init__(self, library):
+        self.library = library
+        self._revision = None
+        self._names = None
+        self._columns = None
+
+    def _load(self):
+        if self._revision != self.library.revision or self._names is None:
+            self._names, self._columns = self.library.columns()
+            self._revision = self.library.revision
+
+    def find(self, board, freq_range=None, pass_only=False):
+        """Crystals whose verdict is not FAIL (or only PASS if `pass_only`) for the board.
+
+        `board` maps the BOARD_PARAMS to base-unit values; `freq_range` is an inclusive
+        (low, high) window in Hz.
+        """
+        self._load()
+        names, columns = self._names, self._columns
+        if freq_range is not None:
+            freq = columns[Param.FREQ]
+            start = np.searchsorted(freq, freq_range[0], side='left')
+            stop = np.searchsorted(freq, freq_range[1], side='right')
+            names = names[start:stop]
+            columns = {key: values[start:stop] for key, values in columns.items()}
+
+        design = dict(columns)
+        design.update({key: board.get(key, 0.0) for key in self.BOARD_PARAMS})
+        with np.errstate(invalid='ignore'):
+            results = CrystalCircuitModel.calculate_batch(design)
+            verdict = np.broadcast_to(CrystalCircuitModel.verdict_batch(design[Param.GM_MCU], results), names.shape)
+
+        limit = CrystalCircuitModel.VERDICT_PASS if pass_only else CrystalCircuitModel.VERDICT_WARN
+        selected = np.flatnonzero(verdict <= limit)
+        margin = np.broadcast_to(results['gain_margin'], names.shape)
+        order = selected[np.argsort(-margin[selected], kind='stable')]
+
+        return FinderResult(names[order], {key: values[order] for key, values in columns.items()},
+                            {key: np.broadcast_to(values, names.shape)[order] for key, values in results.items()},
+                            verdict[order])
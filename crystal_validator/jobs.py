@@ -0,0 +1,98 @@
+"""Background execution of long computations with progress and cooperative cancellation.
+
+The runner never touches the GUI: workers post events to a queue, which the Tk
+controller drains from its event loop with after().
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its CancelToken has been triggered."""
+
+
+class CancelToken:
+    """Cancellation flag shared between the GUI and one running job."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise JobCancelled()
+
+
+class JobRunner:
+    """Runs one job at a time in a worker thread and reports back through a queue.
+
+    Jobs are called as func(*args, progress=..., cancel=..., **kwargs): `progress(done, total)`
+    posts an update, `cancel` is the job's CancelToken. Submitting a new job cancels the
+    previous one, and events of superseded jobs are dropped by poll(), so only the
+    latest job's results are ever delivered.
+    """
+
+    PROGRESS, DONE, ERROR, CANCELLED = "progress", "done", "error", "cancelled"
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crystal-job")
+        self._events = queue.SimpleQueue()
+        self._job_id = 0
+        self._token = None
+
+    @property
+    def busy(self):
+        """True until the terminal event of the latest job has been polled."""
+        return self._token is not None
+
+    def submit(self, func, *args, **kwargs):
+        """Starts `func` in the background (cancelling any running job); returns the job id."""
+        self.cancel()
+        self._job_id += 1
+        job_id = self._job_id
+        token = self._token = CancelToken()
+        events = self._events
+
+        def progress(done, total):
+            events.put((job_id, self.PROGRESS, (done, total)))
+
+        def run():
+            try:
+                result = func(*args, progress=progress, cancel=token, **kwargs)
+            except JobCancelled:
+                events.put((job_id, self.CANCELLED, None))
+            except Exception as e:
+                events.put((job_id, self.ERROR, e))
+            else:
+                events.put((job_id, self.CANCELLED if token.cancelled else self.DONE, result))
+
+        self._executor.submit(run)
+        return job_id
+
+    def cancel(self):
+        if self._token is not None:
+            self._token.cancel()
+
+    def poll(self):
+        """Yields pending (kind, payload) events of the latest job, without blocking."""
+        while True:
+            try:
+                job_id, kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                return
+            if job_id != self._job_id:
+                continue
+            if kind != self.PROGRESS:
+                self._token = None
+            yield kind, payload
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,285 @@
+"""SQLite-backed crystal and MCU preset libraries.
+
+Each preset keeps the value/unit strings typed in the GUI (so it reloads exactly as
+saved) plus the same values in base units, indexed for range queries.
+"""
+import json
+import os
+import sqlite3
+
+from .config import AppConfig
+from .model import Param
+from .profiling import instrumented
+from .units import parse_design_value
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crystals (
+    name    TEXT PRIMARY KEY,
+    freq    REAL,
+    c0      REAL,
+    esr_max REAL,
+    dl_max  REAL,
+    preset  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_crystals_freq ON crystals(freq);
+CREATE INDEX IF NOT EXISTS idx_crystals_c0 ON crystals(c0);
+CREATE INDEX IF NOT EXISTS idx_crystals_esr_max ON crystals(esr_max);
+CREATE INDEX IF NOT EXISTS idx_crystals_dl_max ON crystals(dl_max);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_MCU_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mcus (
+    name  TEXT PRIMARY KEY,
+    entry TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mcu_variants (
+    mcu     TEXT NOT NULL,
+    drive   TEXT NOT NULL,
+    package TEXT NOT NULL,
+    gm_mcu  REAL NOT NULL,
+    cs_pin  REAL NOT NULL,
+    PRIMARY KEY (mcu, drive, package)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class XtalLibrary:
+    """Crystal presets ({PARAM: (value, unit)} for FREQ, C0, ESR_MAX, DL_MAX) stored in SQLite."""
+
+    PRESET_PARAMS = (Param.FREQ, Param.C0, Param.ESR_MAX, Param.DL_MAX)
+    # Indexed base-unit column for each preset Param
+    COLUMNS = {Param.FREQ: "freq", Param.C0: "c0", Param.ESR_MAX: "esr_max", Param.DL_MAX: "dl_max"}
+
+    def __init__(self, path=AppConfig.LIBRARY_DB_FILENAME):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    @property
+    def revision(self):
+        """Changes whenever this connection writes; lets callers cache derived data."""
+        return self._conn.total_changes
+
+    def _row_values(self, name, preset):
+        base_values = []
+        for key in self.PRESET_PARAMS:
+            try:
+                base_values.append(parse_design_value(key, *preset[key.name]))
+            except (KeyError, ValueError, TypeError):
+                base_values.append(None)
+        return (name, *base_values, json.dumps(preset))
+
+    @instrumented("library.save")
+    def save(self, name, preset):
+        """Inserts or replaces a single preset."""
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO crystals VALUES (?, ?, ?, ?, ?, ?)",
+                               self._row_values(name, preset))
+
+    @instrumented("library.delete")
+    def delete(self, name):
+        with self._conn:
+            self._conn.execute("DELETE FROM crystals WHERE name = ?", (name,))
+
+    @instrumented("library.get")
+    def get(self, name):
+        """Preset dict for `name` ({} for the custom entry), or None if it does not exist."""
+        if name == AppConfig.DEFAULT_XTAL_NAME:
+            return {}
+        row = self._conn.execute("SELECT preset FROM crystals WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return {key: tuple(value) for key, value in json.loads(row[0]).items()}
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM crystals").fetchone()[0]
+
+    @instrumented("library.names")
+    def names(self, prefix="", limit=None, offset=0):
+        """One page of preset names in alphabetical order, optionally filtered by prefix."""
+        sql = "SELECT name FROM crystals"
+        args = []
+        if prefix:
+            # Range on the primary key instead of LIKE, so the index is used
+            sql += " WHERE name >= ? AND name < ?"
+            args += [prefix, prefix + "\U0010ffff"]
+        sql += " ORDER BY name LIMIT ? OFFSET ?"
+        args += [-1 if limit is None else limit, offset]
+        return [row[0] for row in self._conn.execute(sql, args)]
+
+    @instrumented("library.query")
+    def query(self, limit=None, **ranges):
+        """Names of presets inside inclusive base-unit ranges, e.g. query(freq=(8e6, 26e6), esr_max=(None, 80)).
+
+        Results are ordered by the first range column, which SQLite serves from its index.
+        """
+        valid = {column: key for key, column in self.COLUMNS.items()}
+        clauses, args = [], []
+        for column, (low, high) in ranges.items():
+            if column not in valid:
+                raise ValueError(f"Colonna non indicizzata: {column}.")
+            if low is not None:
+                clauses.append(f"{column} >= ?")
+                args.append(low)
+            if high is not None:
+                clauses.append(f"{column} <= ?")
+                args.append(high)
+        sql = "SELECT name FROM crystals"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {next(iter(ranges), 'name')} LIMIT ?"
+        args.append(-1 if limit is None else limit)
+        return [row[0] for row in self._conn.execute(sql, args)]
+
+    def items(self):
+        """Iterates (name, preset) over the whole library without loading it at once."""
+        for name, preset in self._conn.execute("SELECT name, preset FROM crystals ORDER BY name"):
+            yield name, {key: tuple(value) for key, value in json.loads(preset).items()}
+
+    @instrumented("library.columns")
+    def columns(self):
+        """All complete presets as (names, {Param: array}) in base units, sorted by frequency.
+
+        One SQL query feeds the arrays directly, so the vectorized screens never touch
+        the per-preset JSON.
+        """
+        import numpy as np
+
+        rows = self._conn.execute(
+            "SELECT name, freq, c0, esr_max, dl_max FROM crystals "
+            "WHERE freq IS NOT NULL AND c0 IS NOT NULL AND esr_max IS NOT NULL AND dl_max IS NOT NULL "
+            "ORDER BY freq").fetchall()
+        names = np.array([row[0] for row in rows], dtype=object)
+        table = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, len(self.PRESET_PARAMS))
+        return names, {key: table[:, i] for i, key in enumerate(self.PRESET_PARAMS)}
+
+    @instrumented("library.import_json")
+    def import_json(self, path=AppConfig.LIBRARY_FILENAME):
+        """One-time import of the legacy xtal_library.json; returns the number of presets imported."""
+        if self._conn.execute("SELECT value FROM meta WHERE key = 'json_imported'").fetchone():
+            return 0
+        count = 0
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                legacy = json.load(f)
+            rows = [self._row_values(name, preset) for name, preset in legacy.items()
+                    if name != AppConfig.DEFAULT_XTAL_NAME and preset]
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO crystals VALUES (?, ?, ?, ?, ?, ?)", rows)
+            count = len(rows)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('json_imported', ?)", (path,))
+        return count
+
+
+class McuLibrary:
+    """MCU/oscillator-driver presets, stored next to the crystals (same database file).
+
+    An entry is {"drive": {setting: (value, unit)}, "package": {package: (value, unit)}}:
+    GM_MCU per drive-strength setting and CS_PIN per package. Every drive x package
+    combination is a variant, kept in base units in its own table for the vectorized screens.
+    """
+
+    def __init__(self, path=AppConfig.LIBRARY_DB_FILENAME):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_MCU_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    @property
+    def revision(self):
+        return self._conn.total_changes
+
+    @staticmethod
+    def _variant_rows(name, entry):
+        """Base-unit (mcu, drive, package, gm, cs_pin) rows; raises ValueError on a bad value."""
+        drives = {drive: parse_design_value(Param.GM_MCU, *value) for drive, value in entry.get("drive", {}).items()}
+        packages = {package: parse_design_value(Param.CS_PIN, *value)
+                    for package, value in entry.get("package", {}).items()}
+        if not drives or not packages:
+            raise ValueError(f"L'MCU {name} deve avere almeno un'impostazione di drive e un package.")
+        return [(name, drive, package, gm, cs_pin)
+                for drive, gm in drives.items() for package, cs_pin in packages.items()]
+
+    @instrumented("mcu_library.save")
+    def save(self, name, entry):
+        """Inserts or replaces an MCU entry and its variants."""
+        rows = self._variant_rows(name, entry)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO mcus VALUES (?, ?)", (name, json.dumps(entry)))
+            self._conn.execute("DELETE FROM mcu_variants WHERE mcu = ?", (name,))
+            self._conn.executemany("INSERT INTO mcu_variants VALUES (?, ?, ?, ?, ?)", rows)
+
+    def delete(self, name):
+        with self._conn:
+            self._conn.execute("DELETE FROM mcus WHERE name = ?", (name,))
+            self._conn.execute("DELETE FROM mcu_variants WHERE mcu = ?", (name,))
+
+    def get(self, name):
+        row = self._conn.execute("SELECT entry FROM mcus WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        entry = json.loads(row[0])
+        return {group: {key: tuple(value) for key, value in values.items()} for group, values in entry.items()}
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM mcus").fetchone()[0]
+
+    def names(self):
+        return [row[0] for row in self._conn.execute("SELECT name FROM mcus ORDER BY name")]
+
+    def variants(self):
+        """(mcu, drive, package, GM_MCU, CS_PIN) of every variant, in name order."""
+        return self._conn.execute("SELECT mcu, drive, package, gm_mcu, cs_pin FROM mcu_variants "
+                                  "ORDER BY mcu, drive, package").fetchall()
+
+    @instrumented("mcu_library.columns")
+    def columns(self):
+        """All variants as (labels, {Param: array}) with GM_MCU and CS_PIN in base units."""
+        import numpy as np
+
+        rows = self.variants()
+        labels = np.array([f"{mcu} [{drive}, {package}]" for mcu, drive, package, _, _ in rows], dtype=object)
+        table = np.array([row[3:] for row in rows], dtype=np.float64).reshape(-1, 2)
+        return labels, {Param.GM_MCU: table[:, 0], Param.CS_PIN: table[:, 1]}
+
+    @instrumented("mcu_library.import_json")
+    def import_json(self, path=AppConfig.MCU_LIBRARY_FILENAME):
+        """One-time import of an MCU JSON file ({name: entry}); returns the number of entries imported."""
+        if self._conn.execute("SELECT value FROM meta WHERE key = 'mcu_json_imported'").fetchone():
+            return 0
+        count = 0
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                entries = json.load(f)
+            rows = [(name, entry, self._variant_rows(name, entry)) for name, entry in entries.items()]
+            with self._conn:
+                for name, entry, variants in rows:
+                    self._conn.execute("INSERT OR REPLACE INTO mcus VALUES (?, ?)", (name, json.dumps(entry)))
+                    self._conn.execute("DELETE FROM mcu_variants WHERE mcu = ?", (name,))
+                    self._conn.executemany("INSERT INTO mcu_variants VALUES (?, ?, ?, ?, ?)", variants)
+            count = len(rows)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('mcu_json_imported', ?)", (path,))
+        return count
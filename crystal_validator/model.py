@@ -0,0 +1,240 @@
+"""Crystal oscillator circuit model (AN2867 formulas).
+
+The scalar path only needs the standard library; NumPy is imported on first use
+of the vectorized (*_batch) methods, so importing this module stays cheap.
+"""
+import math
+from enum import Enum
+
+from .profiling import instrumented
+
+
+class Param(Enum):
+    FREQ, C0, ESR_MAX, DL_MAX, GM_MCU, CL_SEL, REXT_SEL, CS_PIN, CS_PCB, VPP_MEASURED, C_PROBE = range(11)
+
+
+class CrystalCircuitModel:
+    GM_MARGIN_THRESHOLD = 5.0
+    MARGIN_CRITICAL = 3.0
+    DL_RATIO_WARN = 0.8
+    RESULT_KEYS = ('cl_eff', 'gm_crit', 'gain_margin', 'x_cl', 'drive_level', 'dl_ratio', 'c_tot_dl')
+    POSITIVE_PARAMS = (Param.FREQ, Param.ESR_MAX, Param.DL_MAX)
+
+    # Verdict codes returned by verdict_batch (ordered by severity)
+    VERDICT_PASS, VERDICT_WARN, VERDICT_FAIL = 0, 1, 2
+    VERDICT_NAMES = ('PASS', 'WARN', 'FAIL')
+
+    # Inputs each result depends on, directly or through another result
+    _CL_EFF_INPUTS = frozenset((Param.CL_SEL, Param.CS_PCB, Param.CS_PIN))
+    _GM_CRIT_INPUTS = _CL_EFF_INPUTS | {Param.ESR_MAX, Param.REXT_SEL, Param.FREQ, Param.C0}
+    _C_TOT_DL_INPUTS = _CL_EFF_INPUTS | {Param.C_PROBE}
+    _DRIVE_LEVEL_INPUTS = _C_TOT_DL_INPUTS | {Param.ESR_MAX, Param.REXT_SEL, Param.FREQ, Param.VPP_MEASURED}
+    RESULT_DEPENDENCIES = {
+        'cl_eff': _CL_EFF_INPUTS,
+        'gm_crit': _GM_CRIT_INPUTS,
+        'gain_margin': _GM_CRIT_INPUTS | {Param.GM_MCU},
+        'x_cl': frozenset((Param.FREQ, Param.CL_SEL)),
+        'drive_level': _DRIVE_LEVEL_INPUTS,
+        'dl_ratio': _DRIVE_LEVEL_INPUTS | {Param.DL_MAX},
+        'c_tot_dl': _C_TOT_DL_INPUTS,
+    }
+
+    def __init__(self, cache=None):
+        """`cache` is an optional cache.ResultCache consulted by full calculate() calls.
+
+        Only raw results are cached there, which do not depend on the thresholds.
+        """
+        self.params = {}
+        self.results = {}
+        self.cache = cache
+        self.reset()
+
+    @classmethod
+    def thresholds(cls):
+        """Validation thresholds; verdicts cached by the batch CLI are only valid for this exact tuple."""
+        return cls.GM_MARGIN_THRESHOLD, cls.MARGIN_CRITICAL, cls.DL_RATIO_WARN
+
+    def reset(self):
+        self.params = {param: 0.0 for param in Param}
+        self.results = {key: 0.0 for key in self.RESULT_KEYS}
+
+    @instrumented("model.set_param")
+    def set_param(self, key: Param, value: float):
+        if not isinstance(key, Param):
+            raise TypeError("La chiave deve essere un'istanza di Param Enum.")
+        if value < 0:
+            raise ValueError(f"Il valore per {key.name} non può essere negativo.")
+        if key in self.POSITIVE_PARAMS and value <= 0:
+            raise ValueError(f"Il valore per {key.name} deve essere positivo.")
+        self.params[key] = value
+
+    @classmethod
+    def affected_results(cls, params):
+        """Result keys (in RESULT_KEYS order) that change when any of `params` changes."""
+        params = set(params)
+        return tuple(key for key in cls.RESULT_KEYS if cls.RESULT_DEPENDENCIES[key] & params)
+
+    @instrumented("model.calculate")
+    def calculate(self, keys=None):
+        """Updates self.results; `keys` limits the update to those results.
+
+        Results outside `keys` are reused as intermediates, so a partial update is only
+        correct when `keys` covers affected_results() of every Param changed since the
+        last full calculation.
+        """
+        if keys is not None:
+            return self._calculate_partial(keys)
+        cache_key = None
+        if self.cache is not None:
+            # params is kept in Param order by reset(), so its values are the cache key
+            cache_key = tuple(self.params.values())
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.results.update(cached)
+                return True, None
+        try:
+            p = self.params
+            f, c0, cs_pcb, cs_pin, cl_sel, esr_max, gm, dl_max, rext_sel, vpp_measured, c_probe = (
+                p[Param.FREQ], p[Param.C0], p[Param.CS_PCB], p[Param.CS_PIN], p[Param.CL_SEL],
+                p[Param.ESR_MAX], p[Param.GM_MCU], p[Param.DL_MAX], p[Param.REXT_SEL],
+                p[Param.VPP_MEASURED], p[Param.C_PROBE]
+            )
+
+            total_esr = esr_max + rext_sel
+
+            c_stray_single_leg = cs_pcb + cs_pin
+            cl_eff = (cl_sel + c_stray_single_leg) / 2.0
+            gm_crit = 4.0 * total_esr * (2 * math.pi * f) ** 2 * (c0 + cl_eff) ** 2
+            gain_margin = gm / gm_crit if gm_crit > 0 else float('inf')
+            x_cl = 1.0 / (2 * math.pi * f * cl_sel) if cl_sel > 0 else 0.0
+            c_tot_dl = cl_sel + c_stray_single_leg + c_probe
+            drive_level = (total_esr / 2.0) * (math.pi * f * c_tot_dl * vpp_measured) ** 2
+            dl_ratio = drive_level / dl_max if dl_max > 0 else float('inf')
+
+            results = {
+                'cl_eff': cl_eff, 'gm_crit': gm_crit, 'gain_margin': gain_margin,
+                'x_cl': x_cl, 'drive_level': drive_level, 'dl_ratio': dl_ratio,
+                'c_tot_dl': c_tot_dl
+            }
+            self.results.update(results)
+            if cache_key is not None:
+                self.cache.put(cache_key, results)
+            return True, None
+        except (ZeroDivisionError, ValueError) as e:
+            return self._calculation_error(e)
+
+    def _calculate_partial(self, keys):
+        """calculate() restricted to `keys`, for live updates after a single Param changed."""
+        try:
+            p = self.params
+            r = self.results
+            f, c0, cs_pcb, cs_pin, cl_sel, esr_max, gm, dl_max, rext_sel, vpp_measured, c_probe = (
+                p[Param.FREQ], p[Param.C0], p[Param.CS_PCB], p[Param.CS_PIN], p[Param.CL_SEL],
+                p[Param.ESR_MAX], p[Param.GM_MCU], p[Param.DL_MAX], p[Param.REXT_SEL],
+                p[Param.VPP_MEASURED], p[Param.C_PROBE]
+            )
+
+            total_esr = esr_max + rext_sel
+            c_stray_single_leg = cs_pcb + cs_pin
+            updates = {}
+
+            if 'cl_eff' in keys:
+                updates['cl_eff'] = (cl_sel + c_stray_single_leg) / 2.0
+            if 'gm_crit' in keys:
+                cl_eff = updates.get('cl_eff', r['cl_eff'])
+                updates['gm_crit'] = 4.0 * total_esr * (2 * math.pi * f) ** 2 * (c0 + cl_eff) ** 2
+            if 'gain_margin' in keys:
+                gm_crit = updates.get('gm_crit', r['gm_crit'])
+                updates['gain_margin'] = gm / gm_crit if gm_crit > 0 else float('inf')
+            if 'x_cl' in keys:
+                updates['x_cl'] = 1.0 / (2 * math.pi * f * cl_sel) if cl_sel > 0 else 0.0
+            if 'c_tot_dl' in keys:
+                updates['c_tot_dl'] = cl_sel + c_stray_single_leg + c_probe
+            if 'drive_level' in keys:
+                c_tot_dl = updates.get('c_tot_dl', r['c_tot_dl'])
+                updates['drive_level'] = (total_esr / 2.0) * (math.pi * f * c_tot_dl * vpp_measured) ** 2
+            if 'dl_ratio' in keys:
+                drive_level = updates.get('drive_level', r['drive_level'])
+                updates['dl_ratio'] = drive_level / dl_max if dl_max > 0 else float('inf')
+
+            self.results.update(updates)
+            return True, None
+        except (ZeroDivisionError, ValueError) as e:
+            return self._calculation_error(e)
+
+    @staticmethod
+    def _calculation_error(error):
+        error_message = f"Errore di calcolo nel modello: {error}"
+        print(error_message)
+        return False, error_message
+
+    @staticmethod
+    @instrumented("model.calculate_batch")
+    def calculate_batch(columns):
+        """Vectorized counterpart of calculate().
+
+        `columns` maps each Param to a NumPy array (or scalar) in base units; missing
+        params default to 0.0 like the scalar path. Arrays are broadcast together, so a
+        column can be a scalar shared by every design. Returns a dict of result arrays
+        keyed like `results`, with the same edge-case handling as calculate().
+        """
+        import numpy as np
+
+        def col(param):
+            return np.asarray(columns.get(param, 0.0), dtype=np.float64)
+
+        f, c0, cs_pcb, cs_pin, cl_sel, esr_max, gm, dl_max, rext_sel, vpp_measured, c_probe = (
+            col(Param.FREQ), col(Param.C0), col(Param.CS_PCB), col(Param.CS_PIN), col(Param.CL_SEL),
+            col(Param.ESR_MAX), col(Param.GM_MCU), col(Param.DL_MAX), col(Param.REXT_SEL),
+            col(Param.VPP_MEASURED), col(Param.C_PROBE)
+        )
+
+        total_esr = esr_max + rext_sel
+        omega = (2 * np.pi) * f
+
+        c_stray_single_leg = cs_pcb + cs_pin
+        cl_eff = (cl_sel + c_stray_single_leg) / 2.0
+        gm_crit = 4.0 * total_esr * omega ** 2 * (c0 + cl_eff) ** 2
+        gain_margin = np.full(np.broadcast_shapes(gm.shape, gm_crit.shape), np.inf)
+        np.divide(gm, gm_crit, out=gain_margin, where=gm_crit > 0)
+
+        x_cl = np.zeros(np.broadcast_shapes(omega.shape, cl_sel.shape))
+        with np.errstate(divide='ignore'):
+            np.divide(1.0, omega * cl_sel, out=x_cl, where=cl_sel > 0)
+
+        c_tot_dl = c_stray_single_leg + cl_sel + c_probe
+        drive_level = (total_esr / 2.0) * ((np.pi * f) * c_tot_dl * vpp_measured) ** 2
+        dl_ratio = np.full(np.broadcast_shapes(drive_level.shape, dl_max.shape), np.inf)
+        np.divide(drive_level, dl_max, out=dl_ratio, where=dl_max > 0)
+
+        return {
+            'cl_eff': cl_eff, 'gm_crit': gm_crit, 'gain_margin': gain_margin,
+            'x_cl': x_cl, 'drive_level': drive_level, 'dl_ratio': dl_ratio,
+            'c_tot_dl': c_tot_dl
+        }
+
+    @classmethod
+    def invalid_mask_batch(cls, columns):
+        """Boolean mask of the designs that set_param() would reject."""
+        import numpy as np
+
+        invalid = False
+        for param, values in columns.items():
+            values = np.asarray(values, dtype=np.float64)
+            bad = ~(values > 0) if param in cls.POSITIVE_PARAMS else ~(values >= 0)
+            invalid = invalid | bad
+        return np.asarray(invalid)
+
+    @classmethod
+    def check_batch(cls, gm_mcu, results, thresholds=None):
+        """PASS/WARN/FAIL code per design for each check (see rules.RuleEngine)."""
+        from .rules import RuleEngine
+
+        return RuleEngine(thresholds).checks(gm_mcu, results)
+
+    @classmethod
+    def verdict_batch(cls, gm_mcu, results, thresholds=None):
+        """Overall PASS/WARN/FAIL code per design: the worst of check_batch()."""
+        from .rules import RuleEngine
+
+        return RuleEngine(thresholds).classify(gm_mcu, results)['verdict']
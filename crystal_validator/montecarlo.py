@@ -0,0 +1,289 @@
+"""Monte Carlo tolerance and yield analysis on a process pool."""
+import os
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import numpy as np
+
+from .model import CrystalCircuitModel, Param
+
+
+class ParamDistribution:
+    """Sampling law of one Param: uniform, normal or discrete worst-case corners."""
+
+    KINDS = ('uniform', 'normal', 'corners')
+
+    def __init__(self, kind, low=0.0, high=0.0, mean=0.0, sigma=0.0, values=()):
+        if kind not in self.KINDS:
+            raise ValueError(f"Distribuzione sconosciuta: {kind}.")
+        self.kind = kind
+        self.low, self.high = low, high
+        self.mean, self.sigma = mean, sigma
+        self.values = np.asarray(values, dtype=np.float64)
+
+    @classmethod
+    def uniform(cls, low, high):
+        return cls('uniform', low=low, high=high)
+
+    @classmethod
+    def normal(cls, mean, sigma):
+        return cls('normal', mean=mean, sigma=sigma)
+
+    @classmethod
+    def corners(cls, values):
+        return cls('corners', values=values)
+
+    @classmethod
+    def tolerance(cls, nominal, rel_tol, kind='uniform'):
+        """±rel_tol around nominal; for 'normal' rel_tol is the relative sigma."""
+        if kind == 'normal':
+            return cls.normal(nominal, abs(nominal) * rel_tol)
+        if kind == 'corners':
+            return cls.corners([nominal * (1 - rel_tol), nominal * (1 + rel_tol)])
+        return cls.uniform(nominal * (1 - rel_tol), nominal * (1 + rel_tol))
+
+    def sample(self, rng, n):
+        if self.kind == 'uniform':
+            return rng.uniform(self.low, self.high, n)
+        if self.kind == 'normal':
+            # Negative component values are not physical: truncate at zero
+            return np.maximum(rng.normal(self.mean, self.sigma, n), 0.0)
+        return self.values[rng.integers(0, len(self.values), n)]
+
+
+class StreamingStats:
+    """Mergeable count/mean/variance/min/max plus a log-binned histogram for percentiles.
+
+    Only finite positive values enter the histogram; the bin range is fixed up front
+    so partial results from different workers can be summed bin by bin.
+    """
+
+    def __init__(self, log_low, log_high, bins=4096):
+        self.log_low, self.log_high, self.bins = log_low, log_high, bins
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.non_finite = 0
+        # [underflow, bins..., overflow]
+        self.histogram = np.zeros(bins + 2, dtype=np.int64)
+
+    def update(self, values):
+        values = np.asarray(values).ravel()
+        finite = values[np.isfinite(values)]
+        self.non_finite += values.size - finite.size
+        if finite.size == 0:
+            return
+        n = finite.size
+        chunk_mean = float(finite.mean())
+        chunk_m2 = float(((finite - chunk_mean) ** 2).sum())
+        self._merge_moments(n, chunk_mean, chunk_m2)
+        self.min = min(self.min, float(finite.min()))
+        self.max = max(self.max, float(finite.max()))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position = (np.log10(finite) - self.log_low) * (self.bins / (self.log_high - self.log_low))
+        index = np.clip(np.floor(np.nan_to_num(position, nan=-1.0, neginf=-1.0)), -1, self.bins).astype(np.int64) + 1
+        self.histogram += np.bincount(index, minlength=self.bins + 2)
+
+    def _merge_moments(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def merge(self, other):
+        if other.count:
+            self._merge_moments(other.count, other.mean, other.m2)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.non_finite += other.non_finite
+        self.histogram += other.histogram
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def percentile(self, q):
+        """Approximate q-th percentile (0-100) of the finite values."""
+        if self.count == 0:
+            return np.nan
+        target = q / 100.0 * self.count
+        cumulative = np.cumsum(self.histogram)
+        i = int(np.searchsorted(cumulative, target, side='left'))
+        if i == 0:
+            return self.min
+        if i > self.bins:
+            return self.max
+        before = cumulative[i - 1]
+        fraction = (target - before) / self.histogram[i] if self.histogram[i] else 0.0
+        width = (self.log_high - self.log_low) / self.bins
+        value = 10.0 ** (self.log_low + (i - 1 + fraction) * width)
+        return float(min(max(value, self.min), self.max))
+
+
+def _monte_carlo_shard(task):
+    """Process-pool worker: samples one shard and returns its partial statistics.
+
+    With a store path, the shard also writes its samples to rows [offset, offset + n_samples).
+    """
+    nominal, distributions, n_samples, chunk_size, seed, ranges, bins, store_path, offset = task
+    rng = np.random.default_rng(seed)
+    store = None
+    if store_path is not None:
+        from .store import ResultStore
+        store = ResultStore(store_path, 'r+')
+    stats = {key: StreamingStats(low, high, bins) for key, (low, high) in ranges.items()}
+    verdicts = np.zeros(len(CrystalCircuitModel.VERDICT_NAMES), dtype=np.int64)
+
+    remaining = n_samples
+    with np.errstate(divide='ignore', invalid='ignore'):
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            remaining -= n
+            columns = dict(nominal)
+            for key, distribution in distributions.items():
+                columns[key] = distribution.sample(rng, n)
+            results = CrystalCircuitModel.calculate_batch(columns)
+            verdict = np.broadcast_to(
+                CrystalCircuitModel.verdict_batch(columns.get(Param.GM_MCU, 0.0), results), (n,)).copy()
+            verdict[np.broadcast_to(CrystalCircuitModel.invalid_mask_batch(columns), (n,))] = \
+                CrystalCircuitModel.VERDICT_FAIL
+            verdicts += np.bincount(verdict, minlength=len(verdicts))
+            for key, stat in stats.items():
+                stat.update(np.broadcast_to(results[key], (n,)))
+            if store is not None:
+                rows = {key.name: columns[key] for key in distributions}
+                rows.update({key: np.broadcast_to(results[key], (n,)) for key in MonteCarloAnalysis.STAT_KEYS})
+                rows['verdict'] = verdict
+                store.write(offset, rows)
+                offset += n
+    return stats, verdicts
+
+
+class MonteCarloAnalysis:
+    """Tolerance/yield analysis: samples Params, runs calculate_batch, merges streaming stats.
+
+    Work is split in shards with independent random streams and run on a process pool;
+    only per-shard statistics travel back, never the samples.
+    """
+
+    STAT_KEYS = ('cl_eff', 'gm_crit', 'gain_margin', 'drive_level', 'dl_ratio')
+    PILOT_SAMPLES = 1 << 16
+
+    def __init__(self, nominal, distributions, n_samples, chunk_size=1 << 20, workers=None, seed=None, bins=4096):
+        self.nominal = {key: value for key, value in nominal.items() if key not in distributions}
+        self.distributions = distributions
+        self.n_samples = int(n_samples)
+        self.chunk_size = max(1, int(chunk_size))
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.bins = bins
+
+    def create_store(self, path):
+        """Empty store.ResultStore for the samples: sampled Params, STAT_KEYS results and verdict."""
+        from .store import ResultStore
+
+        columns = {key.name: np.float64 for key in self.distributions}
+        columns.update({key: np.float64 for key in self.STAT_KEYS})
+        columns['verdict'] = np.uint8
+        nominal = {key.name: value for key, value in self.nominal.items() if np.ndim(value) == 0}
+        return ResultStore.create(path, columns, metadata={"kind": "montecarlo", "nominal": nominal,
+                                                           "seed": self.seed})
+
+    def _histogram_ranges(self, rng):
+        """Fixes the log10 histogram range of each statistic from a small pilot run."""
+        columns = dict(self.nominal)
+        for key, distribution in self.distributions.items():
+            columns[key] = distribution.sample(rng, self.PILOT_SAMPLES)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            results = CrystalCircuitModel.calculate_batch(columns)
+        ranges = {}
+        for key in self.STAT_KEYS:
+            values = np.asarray(results[key]).ravel()
+            values = values[np.isfinite(values) & (values > 0)]
+            if values.size == 0:
+                ranges[key] = (-1.0, 1.0)
+                continue
+            low, high = np.log10(values.min()), np.log10(values.max())
+            span = max(high - low, 1e-3)
+            # Generous padding: the tails of the full run extend beyond the pilot
+            ranges[key] = (low - span, high + span)
+        return ranges
+
+    def run(self, progress=None, cancel=None, store=None):
+        """Runs the analysis; `progress(done, total)` is called after each shard.
+
+        `cancel` is an optional jobs.CancelToken, checked between shards; queued
+        shards are dropped when it fires. With a `store` (see create_store) every sample
+        is also saved: the store is sized up front and each shard fills its own row range.
+        """
+        seeds = np.random.SeedSequence(self.seed)
+        pilot_seed, shard_seed = seeds.spawn(2)
+        ranges = self._histogram_ranges(np.random.default_rng(pilot_seed))
+
+        n_shards = min(max(1, self.workers * 4), max(1, self.n_samples // self.chunk_size))
+        sizes = [self.n_samples // n_shards + (1 if i < self.n_samples % n_shards else 0) for i in range(n_shards)]
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).tolist()
+        if store is not None:
+            store.resize(self.n_samples)
+        tasks = [(self.nominal, self.distributions, size, self.chunk_size, child, ranges, self.bins,
+                  None if store is None else store.path, offset)
+                 for size, child, offset in zip(sizes, shard_seed.spawn(n_shards), offsets)]
+
+        stats = {key: StreamingStats(low, high, self.bins) for key, (low, high) in ranges.items()}
+        verdicts = np.zeros(len(CrystalCircuitModel.VERDICT_NAMES), dtype=np.int64)
+        if self.workers == 1 or n_shards == 1:
+            self._merge(map(_monte_carlo_shard, tasks), stats, verdicts, sizes, progress, cancel)
+        else:
+            pool = ProcessPoolExecutor(max_workers=self.workers)
+            try:
+                futures = [pool.submit(_monte_carlo_shard, task) for task in tasks]
+                self._merge(self._wait_each(futures, cancel), stats, verdicts, sizes, progress, cancel)
+            finally:
+                # On cancellation, don't wait for the shards already running
+                pool.shutdown(wait=cancel is None or not cancel.cancelled, cancel_futures=True)
+        return MonteCarloResult(self.n_samples, stats, verdicts)
+
+    @staticmethod
+    def _wait_each(futures, cancel, poll_s=0.1):
+        """Shard results in submission order, checking `cancel` while waiting."""
+        for future in futures:
+            while True:
+                try:
+                    yield future.result(timeout=None if cancel is None else poll_s)
+                    break
+                except TimeoutError:
+                    cancel.raise_if_cancelled()
+
+    def _merge(self, partials, stats, verdicts, sizes, progress=None, cancel=None):
+        done = 0
+        for size, (shard_stats, shard_verdicts) in zip(sizes, partials):
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            for key, stat in shard_stats.items():
+                stats[key].merge(stat)
+            verdicts += shard_verdicts
+            done += size
+            if progress is not None:
+                progress(done, self.n_samples)
+
+
+class MonteCarloResult:
+    """Merged statistics and verdict counts of a MonteCarloAnalysis run."""
+
+    def __init__(self, n_samples, stats, verdicts):
+        self.n_samples = n_samples
+        self.stats = stats
+        self.verdict_counts = dict(zip(CrystalCircuitModel.VERDICT_NAMES, verdicts.tolist()))
+
+    @property
+    def fail_yield(self):
+        """Fraction of samples with a FAIL verdict."""
+        return self.verdict_counts['FAIL'] / self.n_samples if self.n_samples else 0.0
+
+    def summary(self, percentiles=(1, 50, 99)):
+        return {key: dict(mean=stat.mean, std=stat.variance ** 0.5, min=stat.min, max=stat.max,
+                          **{f"p{q}": stat.percentile(q) for q in percentiles})
+                for key, stat in self.stats.items()}
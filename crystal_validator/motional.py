@@ -0,0 +1,234 @@
+"""Motional crystal model and frequency-domain analysis of the Pierce loop.
+
+The crystal is one or more motional arms (R, L, C: the main mode first, then spurious
+or overtone modes) in parallel with C0. The amplifier is a transconductance GM_MCU
+between two load legs Ca = Cb = CL_SEL + CS_PCB + CS_PIN. Seen from the motional arm,
+the loop (legs, amplifier and C0) is an impedance r_neg + j*x_load with
+
+    r_neg  = -(p / C0^2) / (p^2 + s^2 w^2)
+    x_load = -(q s w^2 + p^2) / (C0 w (p^2 + s^2 w^2))
+
+where p = gm / (Ca Cb), q = 1/Ca + 1/Cb and s = q + 1/C0. For small gm, r_neg tends to
+-gm / (4 w^2 (C0 + CL_eff)^2), so -r_neg / (R + REXT_SEL) is the model's gain margin,
+and x_load to the load capacitance C0 + CL_eff. Unlike that approximation, r_neg
+saturates (and then falls) as gm grows, and it is evaluated at every mode.
+"""
+import json
+
+import numpy as np
+
+from .model import Param
+from .rules import ValidationThresholds
+from .units import split_unit
+
+MOTIONAL_KEYS = ('R1', 'L1', 'C1')
+MOTIONAL_UNITS = {'R1': {'Ohm': 1.0, 'kOhm': 1e3},
+                  'L1': {'H': 1.0, 'mH': 1e-3, 'uH': 1e-6},
+                  'C1': {'F': 1.0, 'pF': 1e-12, 'fF': 1e-15}}
+DEFAULT_MOTIONAL_UNITS = {'R1': 'Ohm', 'L1': 'mH', 'C1': 'fF'}
+# Arrays over designs x frequency that run() can keep
+GRID_KEYS = ('r_neg', 'x_load', 'margin', 'z_crystal')
+
+
+def parse_motional(name, text):
+    """Parses 'VALUE[UNIT]' (e.g. '5fF', '12.5mH') for R1, L1 or C1, into base units."""
+    numbers, unit = split_unit(text)
+    unit = unit or DEFAULT_MOTIONAL_UNITS[name]
+    multiplier = MOTIONAL_UNITS[name].get(unit)
+    if multiplier is None:
+        raise ValueError(f"Unità '{unit}' non valida per {name}.")
+    try:
+        return float(numbers) * multiplier
+    except ValueError:
+        raise ValueError(f"Valore non numerico per {name}: '{numbers}'.")
+
+
+def read_motional_fields(path):
+    """Optional R1/L1/C1 entries of a .xtal work file ({"value", "unit"} like the Params), in base units."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    values = {}
+    for name in MOTIONAL_KEYS:
+        entry = data.get(name)
+        if isinstance(entry, dict) and str(entry.get("value", "")).strip():
+            values[name] = parse_motional(name, f"{entry['value']}{entry.get('unit') or ''}")
+    return values
+
+
+def motional_modes(columns, r1=None, l1=None, c1=None, spurious=()):
+    """(R, L, C) arrays of shape (designs, modes) in base units, the main mode first.
+
+    `columns` are the designs' Params (scalars or 1-D arrays, as for calculate_batch()).
+    The main mode defaults to R1 = ESR_MAX and gets L1 from C1 (or C1 from L1) with its
+    series resonance at FREQ. Each spurious mode is (series resonance, R, C).
+    """
+    if l1 is None and c1 is None:
+        raise ValueError("Il modello motional richiede C1 oppure L1.")
+    f = np.asarray(columns.get(Param.FREQ, 0.0), dtype=np.float64)
+    r1 = np.asarray(columns.get(Param.ESR_MAX, 0.0) if r1 is None else r1, dtype=np.float64)
+    omega2 = (2 * np.pi * f) ** 2
+    with np.errstate(divide='ignore'):
+        l1 = 1.0 / (omega2 * c1) if l1 is None else np.asarray(l1, dtype=np.float64)
+        c1 = 1.0 / (omega2 * l1) if c1 is None else np.asarray(c1, dtype=np.float64)
+    modes = [(r1, l1, c1)]
+    for freq, r, c in spurious:
+        modes.append((r, 1.0 / ((2 * np.pi * freq) ** 2 * c), c))
+    # One row per design: the Param columns may vary while the motional values are shared
+    values = [np.asarray(value) for value in columns.values()] + [value for mode in modes for value in mode]
+    n = np.broadcast(*values).size
+    return tuple(np.column_stack([np.broadcast_to(mode[i], (n,)) for mode in modes]) for i in range(3))
+
+
+class MotionalResult:
+    """Per-design summaries of a NegativeResistanceAnalysis, plus the kept grids (designs x freq).
+
+    mode_freq/mode_margin are (designs, modes): series resonance and -r_neg / (R + REXT_SEL)
+    there. f_load is the closed-form load resonance of the main mode, f_osc the frequency
+    where the loop reactance cancels on the grid (NaN if the grid does not contain it).
+    """
+
+    def __init__(self, freq, grids, mode_freq, mode_margin, f_load, f_osc):
+        self.freq = freq
+        self.grids = grids
+        self.mode_freq = mode_freq
+        self.mode_margin = mode_margin
+        self.f_load = f_load
+        self.f_osc = f_osc
+
+    def __len__(self):
+        return len(self.f_load)
+
+    @property
+    def pulling_ppm(self):
+        """Oscillation frequency offset from the main series resonance."""
+        return (self.f_osc / self.mode_freq[:, 0] - 1.0) * 1e6
+
+    def checks(self, thresholds=None):
+        """{check: uint8 code array} in the RuleEngine convention, plus the worst as 'verdict'.
+
+        motional_margin: the margin check on the main mode's exact margin.
+        spurious:        FAIL if a spurious mode could start (margin >= 1), WARN if it is
+                         not kept below 1 by the same factor (margin_critical) that the main
+                         mode must exceed it by.
+        """
+        t = thresholds or ValidationThresholds()
+        main = self.mode_margin[:, 0]
+        motional_margin = (main < t.margin_warn).astype(np.uint8)
+        motional_margin += main < t.margin_critical
+        spur = self.mode_margin[:, 1:].max(axis=1, initial=0.0)
+        spurious = (spur >= 1.0 / t.margin_critical).astype(np.uint8)
+        spurious += spur >= 1.0
+        return {'motional_margin': motional_margin, 'spurious': spurious,
+                'verdict': np.maximum(motional_margin, spurious)}
+
+
+class NegativeResistanceAnalysis:
+    """Evaluates the Pierce loop of many designs over one frequency grid (see the module docstring).
+
+    `columns` holds the Params like calculate_batch() (scalars or 1-D arrays, one entry
+    per design) and `modes` is motional_modes() output. The grid is processed in blocks
+    of about `chunk_size` designs x frequencies, so only the kept grids scale with it.
+    """
+
+    def __init__(self, columns, modes, freq, chunk_size=1 << 22):
+        self.freq = np.asarray(freq, dtype=np.float64).ravel()
+        if self.freq.size == 0 or not np.all(np.diff(self.freq) > 0):
+            raise ValueError("La griglia di frequenza deve essere crescente e non vuota.")
+        self.r, self.l, self.c = (np.asarray(values, dtype=np.float64) for values in modes)
+        n = self.r.shape[0]
+
+        def col(param):
+            return np.broadcast_to(np.asarray(columns.get(param, 0.0), dtype=np.float64), (n,))[:, None]
+
+        self.c0, self.rext, gm = col(Param.C0), col(Param.REXT_SEL), col(Param.GM_MCU)
+        c_leg = col(Param.CL_SEL) + col(Param.CS_PCB) + col(Param.CS_PIN)
+        self.cl_eff = c_leg / 2.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.p = gm / c_leg ** 2
+            self.q = 2.0 / c_leg
+            self.s = self.q + 1.0 / self.c0
+        self.chunk_size = max(1, int(chunk_size))
+
+    def loop(self, omega):
+        """(r_neg, x_load) at angular frequencies broadcastable against (designs, 1)."""
+        p, s, c0 = self.p, self.s, self.c0
+        denominator = p ** 2 + s ** 2 * omega ** 2
+        r_neg = -(p / c0 ** 2) / denominator
+        x_load = -(self.q * s * omega ** 2 + p ** 2) / (c0 * omega * denominator)
+        return r_neg, x_load
+
+    def run(self, keep=(), progress=None, cancel=None):
+        """Returns a MotionalResult; `keep` names GRID_KEYS to return as full (designs, freq) arrays.
+
+        `progress(done, total)` is called after each block of frequencies and `cancel` (a
+        jobs.CancelToken) is checked before it.
+        """
+        for key in keep:
+            if key not in GRID_KEYS:
+                raise ValueError(f"Griglia sconosciuta: {key} (ammesse: {', '.join(GRID_KEYS)}).")
+        n, m = self.r.shape[0], self.freq.size
+        grids = {key: np.empty((n, m), dtype=np.complex128 if key == 'z_crystal' else np.float64) for key in keep}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mode_omega = 1.0 / np.sqrt(self.l * self.c)
+            mode_margin = -self.loop(mode_omega)[0] / (self.r + self.rext)
+            f_load = mode_omega[:, 0] / (2 * np.pi) * np.sqrt(1.0 + self.c[:, 0] / (self.c0[:, 0] + self.cl_eff[:, 0]))
+
+            f_osc = np.full(n, np.nan)
+            previous = None
+            block = max(1, self.chunk_size // n)
+            for start in range(0, m, block):
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                stop = min(start + block, m)
+                freq = self.freq[start:stop]
+                omega = 2 * np.pi * freq
+                r_neg, x_load = self.loop(omega)
+                # Main arm plus loop reactance: the oscillation sits where it crosses zero upwards
+                total = x_load + (self.l[:, :1] * omega - 1.0 / (self.c[:, :1] * omega))
+                self._find_crossing(f_osc, freq, total, previous)
+                previous = (freq[-1], total[:, -1])
+
+                if 'r_neg' in grids:
+                    grids['r_neg'][:, start:stop] = r_neg
+                if 'x_load' in grids:
+                    grids['x_load'][:, start:stop] = x_load
+                if 'margin' in grids:
+                    grids['margin'][:, start:stop] = -r_neg / (self.r[:, :1] + self.rext)
+                if 'z_crystal' in grids:
+                    grids['z_crystal'][:, start:stop] = self._crystal_impedance(omega)
+                if progress is not None:
+                    progress(stop, m)
+
+        return MotionalResult(self.freq, grids, mode_omega / (2 * np.pi), mode_margin, f_load, f_osc)
+
+    @staticmethod
+    def _find_crossing(f_osc, freq, total, previous):
+        """Fills the still-NaN f_osc with the first upward zero of `total`, linearly interpolated."""
+        open_rows = np.flatnonzero(np.isnan(f_osc))
+        if not open_rows.size:
+            return
+        values = total[open_rows]
+        if previous is not None:
+            # The crossing may fall between the last point of the previous block and this one
+            freq = np.concatenate(([previous[0]], freq))
+            values = np.column_stack((previous[1][open_rows], values))
+        negative = values < 0
+        upward = negative[:, :-1] & ~negative[:, 1:]
+        found = upward.any(axis=1)
+        rows = np.flatnonzero(found)
+        i = upward[rows].argmax(axis=1)
+        v0, v1 = values[rows, i], values[rows, i + 1]
+        f_osc[open_rows[rows]] = freq[i] + (freq[i + 1] - freq[i]) * (-v0 / (v1 - v0))
+
+    def _crystal_impedance(self, omega):
+        """Impedance of the crystal (every motional arm in parallel with C0)."""
+        conductance = np.zeros((self.r.shape[0], omega.size))
+        susceptance = self.c0 * omega
+        for k in range(self.r.shape[1]):
+            r = self.r[:, k:k + 1]
+            x = self.l[:, k:k + 1] * omega - 1.0 / (self.c[:, k:k + 1] * omega)
+            magnitude = r ** 2 + x ** 2
+            conductance += r / magnitude
+            susceptance = susceptance - x / magnitude
+        return 1.0 / (conductance + 1j * susceptance)
@@ -0,0 +1,104 @@
+"""Closed-form choice of load capacitors and series resistor."""
+import numpy as np
+
+from .config import AppConfig
+from .model import CrystalCircuitModel, Param
+
+
+def snap_to_series(values, series, direction="up"):
+    """Rounds values to the nearest standard value above ("up") or below ("down").
+
+    Zero and negative values are returned as 0.0 (no component fitted); infinite
+    bounds are passed through unchanged.
+    """
+    mantissas = np.asarray(AppConfig.STANDARD_SERIES[series])
+    values = np.asarray(values, dtype=np.float64)
+    positive = (values > 0) & np.isfinite(values)
+    safe = np.where(positive, values, 1.0)
+    decade = np.floor(np.log10(safe))
+    mantissa = safe / 10.0 ** decade
+    eps = 1e-9
+    if direction == "up":
+        idx = np.searchsorted(mantissas, mantissa * (1 - eps), side='left')
+        decade = np.where(idx == len(mantissas), decade + 1, decade)
+        idx = np.where(idx == len(mantissas), 0, idx)
+    else:
+        idx = np.searchsorted(mantissas, mantissa * (1 + eps), side='right') - 1
+        decade = np.where(idx < 0, decade - 1, decade)
+        idx = np.where(idx < 0, len(mantissas) - 1, idx)
+    return np.where(positive, mantissas[idx] * 10.0 ** decade, np.where(values > 0, values, 0.0))
+
+
+def series_values(series, low, high):
+    """All standard values of `series` in [low, high], ascending."""
+    mantissas = np.asarray(AppConfig.STANDARD_SERIES[series])
+    if not (0 < low <= high):
+        return np.empty(0)
+    decades = np.arange(np.floor(np.log10(low)), np.floor(np.log10(high)) + 1)
+    values = (mantissas[None, :] * 10.0 ** decades[:, None]).ravel()
+    eps = 1e-9
+    return values[(values >= low * (1 - eps)) & (values <= high * (1 + eps))]
+
+
+class LoadOptimizer:
+    """Chooses the CL_SEL/REXT_SEL pair that maximizes gain margin with dl_ratio <= 1.
+
+    With Vpp taken as measured, gm_crit and drive_level both grow monotonically with
+    CL_SEL and REXT_SEL. The best pair in the allowed box is therefore its lowest
+    corner whenever that corner meets the drive-level limit, and the limit itself has
+    closed-form bounds (rext_max, cl_sel_max). No grid evaluation is needed, so
+    solve() handles a whole crystal library in one vectorized pass.
+    """
+
+    SOLUTION_KEYS = ('cl_sel', 'rext_sel', 'gain_margin', 'dl_ratio', 'feasible', 'rext_max', 'cl_sel_max')
+
+    def __init__(self, cl_range, rext_range=(0.0, np.inf), series=None):
+        if series is not None and series not in AppConfig.STANDARD_SERIES:
+            raise ValueError(f"Serie standard sconosciuta: {series}.")
+        self.cl_range = cl_range
+        self.rext_range = rext_range
+        self.series = series
+
+    def _bounds(self, low, high):
+        low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+        if self.series is None:
+            return low, high
+        return snap_to_series(low, self.series, "up"), snap_to_series(high, self.series, "down")
+
+    def solve(self, columns):
+        """Returns a dict of arrays (SOLUTION_KEYS); infeasible designs get NaN values."""
+        def col(param):
+            return np.asarray(columns.get(param, 0.0), dtype=np.float64)
+
+        f, esr_max, dl_max, vpp = col(Param.FREQ), col(Param.ESR_MAX), col(Param.DL_MAX), col(Param.VPP_MEASURED)
+        c_fixed = col(Param.CS_PCB) + col(Param.CS_PIN) + col(Param.C_PROBE)
+        cl_low, cl_high = self._bounds(*self.cl_range)
+        rext_low, rext_high = self._bounds(*self.rext_range)
+
+        candidate = dict(columns)
+        candidate[Param.CL_SEL] = cl_low
+        candidate[Param.REXT_SEL] = rext_low
+        results = CrystalCircuitModel.calculate_batch(candidate)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # DL = (Rtot / 2) * (pi * F * Ctot * Vpp)^2 <= DL_max, solved for Rtot and for Ctot
+            swing = np.pi * f * vpp
+            rext_max = 2.0 * dl_max / (swing * (cl_low + c_fixed)) ** 2 - esr_max
+            cl_sel_max = np.sqrt(2.0 * dl_max / (esr_max + rext_low)) / swing - c_fixed
+        rext_max = np.minimum(rext_max, rext_high)
+        cl_sel_max = np.minimum(cl_sel_max, cl_high)
+        if self.series is not None:
+            rext_max = snap_to_series(rext_max, self.series, "down")
+            cl_sel_max = snap_to_series(cl_sel_max, self.series, "down")
+
+        feasible = (results['dl_ratio'] <= 1.0) & (cl_low <= cl_high) & (rext_low <= rext_high)
+        shape = feasible.shape
+
+        def masked(values):
+            return np.where(feasible, np.broadcast_to(values, shape), np.nan)
+
+        return {
+            'cl_sel': masked(cl_low), 'rext_sel': masked(rext_low),
+            'gain_margin': masked(results['gain_margin']), 'dl_ratio': masked(results['dl_ratio']),
+            'feasible': feasible, 'rext_max': masked(rext_max), 'cl_sel_max': masked(cl_sel_max)
+        }
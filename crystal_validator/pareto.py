@@ -0,0 +1,247 @@
+"""Pareto (non-dominated) set of sweep and Monte Carlo results over several objectives.
+
+A row dominates another if it is at least as good in every objective and strictly
+better in one. Rows are sorted first so that a row can only be dominated by rows
+before it: two objectives then need a single running-minimum scan (O(n log n)), three
+a divide and conquer over the sorted rows (O(n log^2 n)); more objectives are filtered
+block by block against the front found so far (sort-filter skyline, linear in n times
+the front size). There is no all-pairs comparison, and since the front of a union is
+the front of the fronts of its parts, results larger than memory are processed in chunks.
+"""
+import numpy as np
+
+DEFAULT_OBJECTIVES = (('gain_margin', 'max'), ('dl_ratio', 'min'), ('REXT_SEL', 'min'), ('CL_SEL', 'min'))
+SENSES = ('min', 'max')
+
+
+def skyline(points, block_size=1024):
+    """Indices (ascending) of the non-dominated rows of an (n, d) array, every column minimized.
+
+    Rows containing NaN are never on the front; identical rows are all kept.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2:
+        raise ValueError("Attesa una matrice (righe, obiettivi).")
+    valid = np.flatnonzero(~np.isnan(points).any(axis=1))
+    points = points[valid]
+    if valid.size:
+        # Constant objectives cannot separate rows
+        points = points[:, points.min(axis=0) < points.max(axis=0)]
+    if valid.size == 0 or points.shape[1] == 0:
+        return valid
+    if points.shape[1] == 1:
+        return valid[points[:, 0] == points[:, 0].min()]
+
+    alive = _prefilter(points, block_size)
+    rows = points[alive]
+    if rows.shape[1] == 2:
+        keep = _skyline_2d(rows)
+    elif rows.shape[1] == 3:
+        keep = _skyline_3d(rows)
+    else:
+        keep = _skyline_sfs(rows, block_size)
+    return valid[alive[keep]]
+
+
+def _scaled_sum(points):
+    """Sum of the columns scaled to [0, 1]: never larger for a dominating row."""
+    low, high = points.min(axis=0), points.max(axis=0)
+    return ((points - low) / np.where(high > low, high - low, 1.0)).sum(axis=1)
+
+
+def _prefilter(points, block_size, count=32):
+    """Rows not dominated by the `count` rows of best scaled sum, which usually eliminate most of them."""
+    if len(points) <= count:
+        return np.arange(len(points))
+    best = points[np.argpartition(_scaled_sum(points), count)[:count]]
+    step = block_size * 32
+    return np.concatenate([np.flatnonzero(~_dominated(best, points[start:start + step])) + start
+                           for start in range(0, len(points), step)])
+
+
+def _sorted_distinct(rows):
+    """Lexicographic order of the rows, the distinct rows in that order and the group of each ordered row."""
+    order = np.lexsort(tuple(rows.T[::-1]))
+    ordered = rows[order]
+    distinct = np.ones(len(ordered), dtype=bool)
+    distinct[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    return order, ordered[distinct], np.cumsum(distinct) - 1
+
+
+def _skyline_2d(rows):
+    """Sorted by (x, y), a row survives iff its y beats every row with a smaller x."""
+    order, unique, group = _sorted_distinct(rows)
+    best_y = np.minimum.accumulate(unique[:, 1])
+    keep = np.ones(len(unique), dtype=bool)
+    keep[1:] = unique[1:, 1] < best_y[:-1]
+    return np.sort(order[keep[group]])
+
+
+def _skyline_3d(rows):
+    """Sorted by (x, y, z), a distinct row is dominated iff an earlier one has y and z no larger."""
+    order, unique, group = _sorted_distinct(rows)
+    keep = ~_dominated_by_earlier(unique[:, 1], unique[:, 2])
+    return np.sort(order[keep[group]])
+
+
+def _dominated_by_earlier(y, z):
+    """Mask of the rows i for which some row j < i has y[j] <= y[i] and z[j] <= z[i].
+
+    Divide and conquer on the row index, one vectorized pass per level: in every segment
+    of 2h rows the right half is checked against a running minimum of z over the left
+    half sorted by y. The order by y inside each segment is carried from level to level,
+    so a level costs a merge of sorted runs plus a binary search: O(n log^2 n) in total.
+    """
+    n = len(y)
+    y = np.searchsorted(np.sort(y), y)
+    z = np.searchsorted(np.sort(z), z)
+    stride = n + 1
+    dominated = np.zeros(n, dtype=bool)
+    perm = np.arange(n)  # Ordered by (block of h rows, y)
+    h = 1
+    while h < n:
+        segment = perm // (2 * h)
+        key = segment * stride + y[perm]
+        left = (perm // h) % 2 == 0
+        right = ~left
+        left_keys = key[left]
+        # Running minimum restarting at each segment: earlier segments are shifted higher
+        left_min = np.minimum.accumulate(z[perm[left]] - segment[left] * stride)
+        right_segment = segment[right]
+        pos = np.searchsorted(left_keys, key[right], side='right') - 1
+        found = pos >= 0
+        pos = np.maximum(pos, 0)
+        found &= left_keys[pos] >= right_segment * stride
+        found &= left_min[pos] + right_segment * stride <= z[perm[right]]
+        dominated[perm[right][found]] = True
+        perm = perm[np.argsort(key, kind='stable')]
+        h *= 2
+    return dominated
+
+
+def _skyline_sfs(rows, block_size):
+    """Sort-filter skyline: rows in order of scaled sum, filtered block by block against the front."""
+    score = _scaled_sum(rows)
+    order = np.lexsort((rows[:, 0], score))
+    ordered = rows[order]
+    # Ties are broken by the first column and never split across blocks
+    run_starts = np.ones(len(ordered), dtype=bool)
+    run_starts[1:] = (score[order][1:] != score[order][:-1]) | (ordered[1:, 0] != ordered[:-1, 0])
+    keep = _filter_blocks(ordered, np.flatnonzero(run_starts), block_size)
+    return np.sort(order[keep])
+
+
+def _dominated(dominators, rows):
+    """Mask of `rows` dominated by at least one of `dominators`."""
+    weak = dominators[:, None, 0] <= rows[None, :, 0]
+    strict = dominators[:, None, 0] < rows[None, :, 0]
+    for k in range(1, rows.shape[1]):
+        weak &= dominators[:, None, k] <= rows[None, :, k]
+        strict |= dominators[:, None, k] < rows[None, :, k]
+    return (weak & strict).any(axis=0)
+
+
+def _filter_blocks(rows, run_starts, block_size):
+    """Sort-filter skyline of rows sorted so that no row is dominated by a row of a later run."""
+    keep = np.zeros(len(rows), dtype=bool)
+    front = np.empty((0, rows.shape[1]))
+    start = 0
+    while start < len(rows):
+        i = np.searchsorted(run_starts, start + block_size)
+        stop = run_starts[i] if i < len(run_starts) else len(rows)
+        block = rows[start:stop]
+        # The front is in score order: its first rows eliminate most of a block, the rest
+        # is compared with the survivors only
+        alive = np.flatnonzero(~_dominated(front[:32], block)) if len(front) else np.arange(len(block))
+        for f_start in range(32, len(front), block_size):
+            if not alive.size:
+                break
+            alive = alive[~_dominated(front[f_start:f_start + block_size], block[alive])]
+        candidates = block[alive]
+        survivors = alive[~_dominated(candidates, candidates)]
+        keep[start + survivors] = True
+        front = np.concatenate((front, block[survivors]))
+        start = stop
+    return keep
+
+
+class ParetoFront:
+    """Non-dominated rows accumulated over chunks of columns.
+
+    `objectives` is a sequence of (column name, 'min' | 'max'); objectives whose column is
+    not in the data (e.g. a Param that was not swept, hence constant) are ignored. Every
+    column passed to add() is kept for the front rows, so a point can be loaded back.
+    """
+
+    def __init__(self, objectives=DEFAULT_OBJECTIVES):
+        for name, sense in objectives:
+            if sense not in SENSES:
+                raise ValueError(f"Obiettivo non valido per {name}: '{sense}' (ammessi: min, max).")
+        self.objectives = tuple(objectives)
+        self.active = None
+        self.columns = {}
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def _matrix(self, columns):
+        return np.column_stack([columns[name] if sense == 'min' else -np.asarray(columns[name], dtype=np.float64)
+                                for name, sense in self.active])
+
+    def add(self, columns):
+        """Merges a chunk of rows ({name: 1-D array}, scalars broadcast) into the front."""
+        n = max(np.size(values) for values in columns.values())
+        if self.active is None:
+            self.active = tuple((name, sense) for name, sense in self.objectives if name in columns)
+            if not self.active:
+                names = ", ".join(name for name, _ in self.objectives)
+                raise ValueError(f"Nessuna colonna obiettivo tra i dati ({names}).")
+        block = {name: np.broadcast_to(np.asarray(values).ravel(), (n,)) for name, values in columns.items()}
+        local = skyline(self._matrix(block))
+        if self.columns:
+            merged = {name: np.concatenate((self.columns[name], block[name][local])) for name in self.columns}
+        else:
+            merged = {name: values[local] for name, values in block.items()}
+        keep = skyline(self._matrix(merged))
+        self.columns = {name: values[keep] for name, values in merged.items()}
+
+    def scan(self, columns, chunk_size=1 << 20, progress=None, cancel=None):
+        """Adds equal-length columns (e.g. memory-mapped store columns) chunk by chunk; returns self.
+
+        A 'row' column with the row numbers is added, so front rows can be found again.
+        """
+        total = max(len(values) for values in columns.values())
+        for start in range(0, total, chunk_size):
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            stop = min(start + chunk_size, total)
+            block = {name: np.asarray(values[start:stop]) for name, values in columns.items()}
+            block['row'] = np.arange(start, stop)
+            self.add(block)
+            if progress is not None:
+                progress(stop, total)
+        return self
+
+    def sorted_by(self, name, descending=False):
+        """Front columns ordered by one column."""
+        order = np.argsort(self.columns[name], kind='stable')
+        if descending:
+            order = order[::-1]
+        return {key: values[order] for key, values in self.columns.items()}
+
+
+def pareto_from_store(path, objectives=DEFAULT_OBJECTIVES, chunk_size=1 << 20, progress=None, cancel=None):
+    """Pareto front of a store.ResultStore directory, reading only the objective columns in chunks
+    (the other columns are then read for the front rows only)."""
+    from .store import ResultStore
+
+    store = ResultStore(path)
+    wanted = [name for name, _ in objectives if name in store.names]
+    if not wanted:
+        names = ", ".join(name for name, _ in objectives)
+        raise ValueError(f"Nessuna colonna obiettivo nell'archivio ({names}).")
+    front = ParetoFront(objectives).scan(store.columns(wanted), chunk_size, progress, cancel)
+    if len(front):
+        rows = front.columns['row']
+        front.columns.update(store.take(rows, [name for name in store.names if name not in front.columns]))
+    return front
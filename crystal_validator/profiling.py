@@ -0,0 +1,127 @@
+"""Opt-in timing and call counters for the hot paths.
+
+Enabled by the CRYSTAL_VALIDATOR_PROFILE environment variable ('1' or the path
+of the JSON dump written at exit), by the headless --profile flag or from the
+GUI Diagnostics window. While disabled, instrumented calls only test a flag:
+no timer is read and nothing is allocated.
+"""
+import atexit
+import functools
+import os
+import time
+
+ENV_VAR = "CRYSTAL_VALIDATOR_PROFILE"
+DEFAULT_DUMP_FILENAME = "crystal_validator_profile.json"
+
+
+class _Section:
+    """Context manager timing one block into a Profiler entry."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class Profiler:
+    """Accumulates calls, total and worst time per named section."""
+
+    def __init__(self):
+        self.enabled = False
+        self.dump_path = None
+        self._stats = {}        # name -> [calls, total_s, max_s]
+        self._exit_hook = False
+
+    def enable(self, dump_path=None):
+        """Starts recording; if `dump_path` is given, the statistics are written there at exit."""
+        self.enabled = True
+        if dump_path:
+            self.dump_path = dump_path
+            if not self._exit_hook:
+                atexit.register(self._dump_at_exit)
+                self._exit_hook = True
+
+    def disable(self):
+        self.enabled = False
+
+    def configure_from_env(self):
+        value = os.environ.get(ENV_VAR, "").strip()
+        if value and value != "0":
+            self.enable(DEFAULT_DUMP_FILENAME if value == "1" else value)
+
+    def reset(self):
+        self._stats.clear()
+
+    def record(self, name, elapsed):
+        entry = self._stats.get(name)
+        if entry is None:
+            self._stats[name] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+    def section(self, name):
+        """`with profiler.section(name):` times the block (a shared no-op while disabled)."""
+        return _Section(self, name) if self.enabled else _NULL_SECTION
+
+    def snapshot(self):
+        """Rows of {name, calls, total_s, mean_s, max_s}, slowest total first."""
+        rows = [{"name": name, "calls": calls, "total_s": total, "mean_s": total / calls, "max_s": worst}
+                for name, (calls, total, worst) in self._stats.items()]
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def dump(self, path):
+        import json
+
+        with open(path, "w") as f:
+            json.dump({"sections": self.snapshot()}, f, indent=2)
+
+    def _dump_at_exit(self):
+        if self.dump_path and self._stats:
+            try:
+                self.dump(self.dump_path)
+            except OSError as e:
+                print(f"Impossibile scrivere il profilo in {self.dump_path}: {e}")
+
+
+profiler = Profiler()
+profiler.configure_from_env()
+
+
+def instrumented(name):
+    """Decorator recording each call of the function under `name` while profiling is enabled."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,80 @@
+"""Pass/fail rule engine: result arrays in, compact per-check status codes out.
+
+This is the single place where the validation criteria live; the GUI status panel,
+the batch CLI, sweeps, Monte Carlo runs and the library finder all render or count
+its codes (CrystalCircuitModel.VERDICT_PASS/WARN/FAIL, as uint8).
+"""
+import numpy as np
+
+from .model import CrystalCircuitModel
+
+
+class ValidationThresholds:
+    """Limits of the three checks.
+
+    startup:     FAIL if gm_crit > gm_mcu
+    margin:      FAIL if gain_margin < margin_critical, WARN if < margin_warn
+    drive_level: FAIL if dl_ratio > dl_ratio_max, WARN if > dl_ratio_warn
+    """
+
+    def __init__(self, margin_warn=None, margin_critical=None, dl_ratio_warn=None, dl_ratio_max=1.0):
+        model = CrystalCircuitModel
+        self.margin_warn = model.GM_MARGIN_THRESHOLD if margin_warn is None else margin_warn
+        self.margin_critical = model.MARGIN_CRITICAL if margin_critical is None else margin_critical
+        self.dl_ratio_warn = model.DL_RATIO_WARN if dl_ratio_warn is None else dl_ratio_warn
+        self.dl_ratio_max = dl_ratio_max
+        if self.margin_critical > self.margin_warn:
+            raise ValueError("La soglia critica del margine deve essere <= della soglia di attenzione.")
+        if self.dl_ratio_warn > self.dl_ratio_max:
+            raise ValueError("La soglia di attenzione DL/DL_max deve essere <= del limite massimo.")
+
+    def as_tuple(self):
+        return self.margin_warn, self.margin_critical, self.dl_ratio_warn, self.dl_ratio_max
+
+
+class RuleEngine:
+    """Classifies any number of designs in one vectorized pass.
+
+    Each check is a sum of two comparisons (thresholds are ordered, so 0/1/2 maps
+    directly to PASS/WARN/FAIL); the verdict is the worst check. A single design of
+    Python floats (CrystalCircuitModel.results) is classified without NumPy and gets ints.
+    """
+
+    CHECKS = ('startup', 'margin', 'drive_level')
+
+    def __init__(self, thresholds=None):
+        self.thresholds = thresholds or ValidationThresholds()
+
+    def checks(self, gm_mcu, results):
+        """{check: uint8 code array} for results shaped like calculate_batch() output."""
+        t = self.thresholds
+        gm_crit = np.asarray(results['gm_crit'])
+        gain_margin = np.asarray(results['gain_margin'])
+        dl_ratio = np.asarray(results['dl_ratio'])
+        fail = CrystalCircuitModel.VERDICT_FAIL
+        startup = (gm_crit > gm_mcu).astype(np.uint8) * np.uint8(fail)
+        margin = (gain_margin < t.margin_warn).astype(np.uint8)
+        margin += gain_margin < t.margin_critical
+        drive_level = (dl_ratio > t.dl_ratio_warn).astype(np.uint8)
+        drive_level += dl_ratio > t.dl_ratio_max
+        return {'startup': startup, 'margin': margin, 'drive_level': drive_level}
+
+    def _checks_scalar(self, gm_mcu, results):
+        t = self.thresholds
+        gain_margin, dl_ratio = results['gain_margin'], results['dl_ratio']
+        startup_fail = results['gm_crit'] > gm_mcu
+        return {
+            'startup': CrystalCircuitModel.VERDICT_FAIL if startup_fail else CrystalCircuitModel.VERDICT_PASS,
+            'margin': (gain_margin < t.margin_warn) + (gain_margin < t.margin_critical),
+            'drive_level': (dl_ratio > t.dl_ratio_warn) + (dl_ratio > t.dl_ratio_max),
+        }
+
+    def classify(self, gm_mcu, results):
+        """checks() plus the overall 'verdict' code (the worst of them)."""
+        if isinstance(results['gain_margin'], float):
+            codes = self._checks_scalar(gm_mcu, results)
+            codes['verdict'] = max(codes.values())
+            return codes
+        codes = self.checks(gm_mcu, results)
+        codes['verdict'] = np.maximum(np.maximum(codes['startup'], codes['margin']), codes['drive_level'])
+        return codes
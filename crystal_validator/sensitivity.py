@@ -0,0 +1,93 @@
+"""Analytic sensitivity (Jacobian) of the validation results with respect to every Param.
+
+The derivatives are the closed forms of the calculate() formulas, evaluated with the
+same broadcasting rules as calculate_batch(), so one call covers any number of designs.
+"""
+import numpy as np
+
+from .model import CrystalCircuitModel, Param
+
+SENSITIVITY_KEYS = ('gm_crit', 'gain_margin', 'drive_level', 'dl_ratio')
+
+
+class SensitivityResult:
+    """∂result/∂param and normalized sensitivities (∂r/∂p · p/r, i.e. % change of r per % of p).
+
+    Both are {result key: {Param: array}}; Params a result does not depend on map to 0.
+    """
+
+    def __init__(self, results, jacobian, normalized):
+        self.results = results
+        self.jacobian = jacobian
+        self.normalized = normalized
+
+    def ranking(self, key, index=()):
+        """Params ordered by |normalized sensitivity| of `key` for one design (largest first)."""
+        values = {param: float(np.asarray(value)[index]) for param, value in self.normalized[key].items()}
+        return sorted(values.items(), key=lambda item: -abs(item[1]) if np.isfinite(item[1]) else float('-inf'))
+
+
+def sensitivity_batch(columns):
+    """Jacobian of SENSITIVITY_KEYS for the designs in `columns` (as for calculate_batch)."""
+    def col(param):
+        return np.asarray(columns.get(param, 0.0), dtype=np.float64)
+
+    f, c0, esr_max, gm, dl_max, rext_sel, vpp = (
+        col(Param.FREQ), col(Param.C0), col(Param.ESR_MAX), col(Param.GM_MCU), col(Param.DL_MAX),
+        col(Param.REXT_SEL), col(Param.VPP_MEASURED)
+    )
+    results = CrystalCircuitModel.calculate_batch(columns)
+    shape = np.broadcast_shapes(*(np.shape(value) for value in results.values()),
+                                *(np.shape(col(param)) for param in Param))
+    zero = np.zeros(shape)
+
+    total_esr = esr_max + rext_sel
+    omega = (2 * np.pi) * f
+    k = c0 + results['cl_eff']                      # gm_crit = 4 R ω² k²
+    gm_crit = results['gm_crit']
+
+    # gm_crit
+    d_gm_r = 4.0 * omega ** 2 * k ** 2
+    d_gm_c = 4.0 * total_esr * omega ** 2 * k       # per unit of CL_SEL/CS_PIN/CS_PCB (k moves by half)
+    d_gm_crit = {
+        Param.ESR_MAX: d_gm_r, Param.REXT_SEL: d_gm_r,
+        Param.FREQ: 8.0 * total_esr * (2 * np.pi) ** 2 * f * k ** 2,
+        Param.C0: 2.0 * d_gm_c,
+        Param.CL_SEL: d_gm_c, Param.CS_PIN: d_gm_c, Param.CS_PCB: d_gm_c,
+    }
+
+    # gain_margin = gm / gm_crit
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_gm_crit = np.where(gm_crit > 0, 1.0 / gm_crit, np.inf)
+        ratio = -gm * inv_gm_crit ** 2
+        d_gain_margin = {param: ratio * d for param, d in d_gm_crit.items()}
+    d_gain_margin[Param.GM_MCU] = inv_gm_crit
+
+    # drive_level = (R/2) (π f c V)²
+    c_tot = results['c_tot_dl']
+    d_dl_c = total_esr * (np.pi * f * vpp) ** 2 * c_tot
+    d_drive_level = {
+        Param.ESR_MAX: 0.5 * (np.pi * f * c_tot * vpp) ** 2,
+        Param.FREQ: total_esr * (np.pi * c_tot * vpp) ** 2 * f,
+        Param.VPP_MEASURED: total_esr * (np.pi * f * c_tot) ** 2 * vpp,
+        Param.CL_SEL: d_dl_c, Param.CS_PIN: d_dl_c, Param.CS_PCB: d_dl_c, Param.C_PROBE: d_dl_c,
+    }
+    d_drive_level[Param.REXT_SEL] = d_drive_level[Param.ESR_MAX]
+
+    # dl_ratio = drive_level / dl_max
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_dl_max = np.where(dl_max > 0, 1.0 / dl_max, np.inf)
+        d_dl_ratio = {param: d * inv_dl_max for param, d in d_drive_level.items()}
+        d_dl_ratio[Param.DL_MAX] = -results['drive_level'] * inv_dl_max ** 2
+
+    jacobian = {}
+    for key, partials in zip(SENSITIVITY_KEYS, (d_gm_crit, d_gain_margin, d_drive_level, d_dl_ratio)):
+        jacobian[key] = {param: np.broadcast_to(partials.get(param, zero), shape) for param in Param}
+
+    normalized = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for key, partials in jacobian.items():
+            value = results[key]
+            normalized[key] = {param: np.where(value != 0, d * col(param) / value, np.nan)
+                               for param, d in partials.items()}
+    return SensitivityResult(results, jacobian, normalized)
@@ -0,0 +1,191 @@
+"""Local JSON validation service for build pipelines (stdlib asyncio, HTTP/1.1 keep-alive).
+
+    POST /validate   body: one design in the .xtal value/unit schema, or {"designs": [...]}
+    GET  /health
+
+Requests arriving together are coalesced into micro-batches and evaluated with a
+single BatchValidator.evaluate_chunk call, so the per-request cost is mostly HTTP
+and JSON handling.
+"""
+import asyncio
+import http.client
+import json
+
+from .cli import BatchValidator, design_fields
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class MicroBatcher:
+    """Queues designs from concurrent requests and validates them in batches.
+
+    The worker takes everything queued by the time it runs, up to `max_batch`; with
+    `max_delay` > 0 it also waits that long (seconds) for a batch to fill up.
+    """
+
+    def __init__(self, max_batch=1024, max_delay=0.0, cache=None):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.cache = cache
+        self.batches = 0
+        self.designs = 0
+        self._queue = asyncio.Queue()
+        self._worker = None
+
+    def start(self):
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def validate(self, designs):
+        """Validates a list of (name, fields); returns one evaluate_chunk() row per design."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((designs, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            if self.max_delay > 0:
+                await asyncio.sleep(self.max_delay)
+            while size < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                batch.append(item)
+                size += len(item[0])
+
+            chunk = [design for designs, _ in batch for design in designs]
+            try:
+                rows = BatchValidator.evaluate_chunk(chunk, self.cache)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.designs += len(chunk)
+            start = 0
+            for designs, future in batch:
+                if not future.done():
+                    future.set_result(rows[start:start + len(designs)])
+                start += len(designs)
+
+
+class ValidationService:
+    """HTTP front end of a MicroBatcher, on a TCP port or a Unix socket."""
+
+    MAX_BODY = 16 << 20
+
+    def __init__(self, batcher=None):
+        self.batcher = batcher or MicroBatcher()
+        self.requests = 0
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, ready=None):
+        """Serves until cancelled; `ready(server)` is called once the socket is listening."""
+        self.batcher.start()
+        if unix_path:
+            server = await asyncio.start_unix_server(self._handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+        try:
+            async with server:
+                if ready is not None:
+                    ready(server)
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > self.MAX_BODY:
+                    status, payload = 413, {"error": "Richiesta troppo grande."}
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(method, path, body)
+                self.requests += 1
+
+                data = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close" and version != "HTTP/1.0"
+                writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if path == "/health":
+            cache = self.batcher.cache
+            return 200, {"status": "ok", "requests": self.requests, "batches": self.batcher.batches,
+                         "designs": self.batcher.designs, "cache": cache.stats() if cache is not None else None}
+        if path != "/validate":
+            return 404, {"error": f"Percorso sconosciuto: {path}"}
+        if method != "POST":
+            return 405, {"error": "Usare POST."}
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            return 400, {"error": f"JSON non valido: {e}"}
+
+        many = isinstance(data, dict) and isinstance(data.get("designs"), list)
+        designs = data["designs"] if many else [data]
+        if not all(isinstance(design, dict) for design in designs):
+            return 400, {"error": "Ogni design deve essere un oggetto JSON."}
+        rows = await self.batcher.validate([(design.get("name", ""), design_fields(design)) for design in designs])
+        records = [BatchValidator.record(*row) for row in rows]
+        return 200, {"designs": records} if many else records[0]
+
+
+class ServiceClient:
+    """Minimal blocking client for scripts and tests (one keep-alive connection)."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=10.0):
+        self._conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def close(self):
+        self._conn.close()
+
+    def _request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        self._conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+        response = self._conn.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise ValueError(data.get("error", f"HTTP {response.status}"))
+        return data
+
+    def validate(self, design):
+        """Validates one design dict (.xtal schema); returns {name, results, verdict, failed_checks, error}."""
+        return self._request("POST", "/validate", design)
+
+    def validate_many(self, designs):
+        return self._request("POST", "/validate", {"designs": list(designs)})["designs"]
+
+    def health(self):
+        return self._request("GET", "/health")
@@ -0,0 +1,255 @@
+"""Columnar on-disk store for large sweep and Monte Carlo runs.
+
+A store is a directory with one .npy file per column plus manifest.json (row count,
+dtype and base unit of each column, the unit multipliers and the validation thresholds
+the verdicts were computed with). Column files have a fixed-size header, so rows can be
+appended while a run is still computing and np.load(..., mmap_mode='r') can open them
+at any time; readers trust the manifest row count, which is updated last.
+"""
+import ast
+import json
+import os
+import struct
+
+import numpy as np
+
+from .config import AppConfig
+from .model import CrystalCircuitModel
+from .rules import ValidationThresholds
+from .units import BASE_UNITS
+
+RESULT_UNITS = {'cl_eff': 'F', 'gm_crit': 'A/V', 'gain_margin': '', 'x_cl': 'Ohm',
+                'drive_level': 'W', 'dl_ratio': '', 'c_tot_dl': 'F', 'verdict': ''}
+
+
+def column_unit(name):
+    """Base unit of a Param or result column ('' for ratios and codes)."""
+    return BASE_UNITS.get(name, RESULT_UNITS.get(name, ''))
+
+
+class ResultStore:
+    """One directory of memory-mappable columns; see the module docstring for the layout."""
+
+    MANIFEST = "manifest.json"
+    HEADER_SIZE = 128
+    FORMAT_VERSION = 1
+
+    def __init__(self, path, mode='r'):
+        if mode not in ('r', 'r+'):
+            raise ValueError(f"Modalità non valida: {mode}.")
+        self.path = path
+        self.mode = mode
+        try:
+            with open(os.path.join(path, self.MANIFEST), 'r') as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"Archivio risultati non trovato: {path}")
+        if self.manifest.get("format") != self.FORMAT_VERSION:
+            raise ValueError(f"Versione dell'archivio non supportata: {self.manifest.get('format')}.")
+        self.dtypes = {name: np.dtype(spec["dtype"]) for name, spec in self.manifest["columns"].items()}
+
+    @classmethod
+    def create(cls, path, columns, thresholds=None, metadata=None):
+        """Creates an empty store; `columns` maps names to dtypes (Param/result names get their base unit)."""
+        os.makedirs(path, exist_ok=True)
+        thresholds = thresholds or ValidationThresholds()
+        manifest = {
+            "format": cls.FORMAT_VERSION,
+            "rows": 0,
+            "columns": {name: {"dtype": np.dtype(dtype).str, "unit": column_unit(name)}
+                        for name, dtype in columns.items()},
+            "unit_multipliers": AppConfig.UNIT_MULTIPLIERS,
+            "thresholds": dict(zip(("margin_warn", "margin_critical", "dl_ratio_warn", "dl_ratio_max"),
+                                   thresholds.as_tuple())),
+            "verdict_names": CrystalCircuitModel.VERDICT_NAMES,
+            "metadata": metadata or {},
+        }
+        for name, dtype in columns.items():
+            with open(cls._column_path(path, name), 'wb') as f:
+                f.write(cls._header(np.dtype(dtype), 0))
+        cls._write_manifest(path, manifest)
+        return cls(path, 'r+')
+
+    @staticmethod
+    def _column_path(path, name):
+        return os.path.join(path, f"{name}.npy")
+
+    @classmethod
+    def _header(cls, dtype, rows):
+        """.npy v1.0 header padded to HEADER_SIZE, so rewriting the row count never moves the data."""
+        text = f"{{'descr': {np.lib.format.dtype_to_descr(dtype)!r}, 'fortran_order': False, 'shape': ({rows},), }}"
+        text = text.ljust(cls.HEADER_SIZE - 11) + "\n"
+        return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(text)) + text.encode("latin1")
+
+    @classmethod
+    def _write_manifest(cls, path, manifest):
+        tmp = os.path.join(path, cls.MANIFEST + ".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, os.path.join(path, cls.MANIFEST))
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    @property
+    def names(self):
+        return tuple(self.dtypes)
+
+    @property
+    def thresholds(self):
+        return ValidationThresholds(**self.manifest["thresholds"])
+
+    def _check_writable(self):
+        if self.mode != 'r+':
+            raise ValueError("Archivio aperto in sola lettura.")
+
+    def _commit(self, rows):
+        for name, dtype in self.dtypes.items():
+            with open(self._column_path(self.path, name), 'r+b') as f:
+                f.write(self._header(dtype, rows))
+        self.manifest["rows"] = rows
+        self._write_manifest(self.path, self.manifest)
+
+    def append(self, columns):
+        """Appends rows; every column must be given, scalars are broadcast to the block length."""
+        self._check_writable()
+        missing = set(self.dtypes) - set(columns)
+        if missing:
+            raise ValueError(f"Colonne mancanti: {', '.join(sorted(missing))}.")
+        n = max(np.size(values) for values in columns.values())
+        start = len(self)
+        for name, dtype in self.dtypes.items():
+            block = np.broadcast_to(np.asarray(columns[name], dtype=dtype).ravel(), (n,))
+            with open(self._column_path(self.path, name), 'r+b') as f:
+                f.seek(self.HEADER_SIZE + start * dtype.itemsize)
+                f.write(np.ascontiguousarray(block).tobytes())
+        self._commit(start + n)
+
+    def resize(self, rows):
+        """Pre-allocates `rows` rows (zero-filled, sparse on most filesystems) to be filled by write()."""
+        self._check_writable()
+        for name, dtype in self.dtypes.items():
+            with open(self._column_path(self.path, name), 'r+b') as f:
+                f.truncate(self.HEADER_SIZE + rows * dtype.itemsize)
+        self._commit(rows)
+
+    def write(self, start, columns):
+        """Writes a block of rows at `start` inside the allocated range (safe from several processes)."""
+        self._check_writable()
+        for name, values in columns.items():
+            values = np.asarray(values).ravel()
+            if start + values.size > len(self):
+                raise ValueError(f"Scrittura oltre la fine dell'archivio ({len(self)} righe).")
+            target = self._memmap(name, 'r+')
+            target[start:start + values.size] = values
+            target.flush()
+
+    def _memmap(self, name, mode='r'):
+        if name not in self.dtypes:
+            raise ValueError(f"Colonna sconosciuta: {name}.")
+        if not len(self):
+            return np.empty(0, dtype=self.dtypes[name])
+        return np.memmap(self._column_path(self.path, name), dtype=self.dtypes[name], mode=mode,
+                         offset=self.HEADER_SIZE, shape=(len(self),))
+
+    def column(self, name):
+        """Read-only memory map of a whole column; nothing is loaded until it is indexed."""
+        return self._memmap(name)
+
+    def columns(self, names=None):
+        return {name: self.column(name) for name in (names or self.names)}
+
+    def query(self, predicate, start=0, stop=None, chunk_size=1 << 20, limit=None):
+        """Row indices in [start, stop) matching `predicate`, e.g. 'gain_margin < 5 and dl_ratio > 0.8'.
+
+        Only the columns named in the predicate are read, one chunk at a time.
+        """
+        condition = StorePredicate(predicate, self.names)
+        stop = len(self) if stop is None else min(stop, len(self))
+        mapped = {name: self.column(name) for name in condition.names}
+        found, count = [], 0
+        for offset in range(start, stop, chunk_size):
+            end = min(offset + chunk_size, stop)
+            mask = condition.evaluate({name: values[offset:end] for name, values in mapped.items()})
+            rows = np.flatnonzero(np.broadcast_to(mask, (end - offset,))) + offset
+            found.append(rows)
+            count += rows.size
+            if limit is not None and count >= limit:
+                break
+        rows = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        return rows if limit is None else rows[:limit]
+
+    def take(self, rows, names=None):
+        """{column: values} of the given row indices."""
+        return {name: np.asarray(self.column(name)[rows]) for name in (names or self.names)}
+
+
+class StorePredicate:
+    """Safe parser for column comparisons joined by and/or/not (no arbitrary Python is evaluated)."""
+
+    _COMPARE = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+                ast.Eq: np.equal, ast.NotEq: np.not_equal}
+    _ALLOWED = "La condizione ammette solo colonne, numeri, confronti e and/or/not."
+
+    def __init__(self, text, names):
+        try:
+            self.tree = ast.parse(text.strip(), mode='eval').body
+        except SyntaxError as e:
+            raise ValueError(f"Condizione non valida: {e.msg}.")
+        self.available = set(names)
+        self.names = set()
+        self._check(self.tree)
+
+    def _check(self, node):
+        """A condition: comparisons, possibly joined by and/or and negated by not."""
+        if isinstance(node, ast.BoolOp):
+            for value in node.values:
+                self._check(value)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            self._check(node.operand)
+        elif isinstance(node, ast.Compare):
+            if not all(type(op) in self._COMPARE for op in node.ops):
+                raise ValueError("Operatore di confronto non ammesso.")
+            for operand in [node.left] + node.comparators:
+                self._check_operand(operand)
+        else:
+            raise ValueError(self._ALLOWED)
+
+    def _check_operand(self, node):
+        """A compared value: a column or a number, possibly negated."""
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            self._check_operand(node.operand)
+        elif isinstance(node, ast.Name):
+            if node.id not in self.available:
+                raise ValueError(f"Colonna sconosciuta: {node.id}.")
+            self.names.add(node.id)
+        elif not (isinstance(node, ast.Constant) and isinstance(node.value, (int, float))):
+            raise ValueError(self._ALLOWED)
+
+    def evaluate(self, columns):
+        return self._eval(self.tree, columns)
+
+    def _eval(self, node, columns):
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            result = self._eval(node.values[0], columns)
+            for value in node.values[1:]:
+                result = combine(result, self._eval(value, columns))
+            return result
+        if isinstance(node, ast.UnaryOp):
+            operand = self._eval(node.operand, columns)
+            if isinstance(node.op, ast.Not):
+                return np.logical_not(operand)
+            # Columns may be unsigned (verdict is uint8), where negation would wrap around
+            return -np.asarray(operand, dtype=np.float64)
+        if isinstance(node, ast.Compare):
+            left = self._eval(node.left, columns)
+            result = True
+            for op, comparator in zip(node.ops, node.comparators):
+                right = self._eval(comparator, columns)
+                result = np.logical_and(result, self._COMPARE[type(op)](left, right))
+                left = right
+            return result
+        if isinstance(node, ast.Name):
+            return columns[node.id]
+        return node.value
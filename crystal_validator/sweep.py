@@ -0,0 +1,117 @@
+"""Design-space sweeps over the Cartesian grid of Param axes."""
+import numpy as np
+
+from .config import AppConfig
+from .model import CrystalCircuitModel, Param
+
+
+class SweepResult:
+    """PASS/WARN/FAIL map (and optional result grids) of a DesignSweep run."""
+
+    def __init__(self, axes, verdict, results):
+        self.axes = axes
+        self.verdict = verdict
+        self.results = results
+
+    @property
+    def shape(self):
+        return self.verdict.shape
+
+    def counts(self):
+        """Number of grid points per verdict name."""
+        totals = np.bincount(self.verdict.ravel(), minlength=len(CrystalCircuitModel.VERDICT_NAMES))
+        return dict(zip(CrystalCircuitModel.VERDICT_NAMES, totals.tolist()))
+
+    def point(self, index):
+        """Param values (base units) of the swept axes at a grid index."""
+        return {param: float(values[i]) for (param, values), i in zip(self.axes, index)}
+
+
+class DesignSweep:
+    """Evaluates the Cartesian grid of some Param axes around a fixed base design.
+
+    The grid is never materialized: each block is built by broadcasting the axis
+    vectors, and blocks are sized so that no temporary exceeds `chunk_size` points.
+    """
+
+    def __init__(self, base, axes, chunk_size=1 << 20):
+        if not axes:
+            raise ValueError("Specificare almeno un parametro da variare.")
+        self.base = {key: value for key, value in base.items() if key not in axes}
+        self.axes = [(key, np.asarray(values, dtype=np.float64).ravel()) for key, values in axes.items()]
+        self.chunk_size = max(1, int(chunk_size))
+
+    @staticmethod
+    def probe_axis():
+        """C_PROBE values (F) of every entry in AppConfig.PROBE_MODELS, in menu order."""
+        return np.array(list(AppConfig.PROBE_MODELS.values())) * AppConfig.UNIT_MULTIPLIERS['pF']
+
+    def _blocks(self, shape):
+        """Yields (grid index, columns) blocks covering the grid in C order."""
+        ndim = len(shape)
+        split, inner = ndim - 1, 1
+        while split > 0 and inner * shape[split] <= self.chunk_size:
+            inner *= shape[split]
+            split -= 1
+        rows = max(1, self.chunk_size // inner)
+
+        trailing = {}
+        for axis in range(split + 1, ndim):
+            key, values = self.axes[axis]
+            trailing[key] = values.reshape((-1,) + (1,) * (ndim - axis - 1))
+        split_key, split_values = self.axes[split]
+        split_tail = (1,) * (ndim - split - 1)
+
+        for outer in np.ndindex(*shape[:split]):
+            columns = dict(self.base)
+            for axis, i in enumerate(outer):
+                key, values = self.axes[axis]
+                columns[key] = values[i]
+            columns.update(trailing)
+            for start in range(0, shape[split], rows):
+                block = slice(start, min(start + rows, shape[split]))
+                columns[split_key] = split_values[block].reshape((-1,) + split_tail)
+                yield outer + (block,), columns
+
+    def create_store(self, path, keep=()):
+        """Empty store.ResultStore with the swept Params, the `keep` results and the verdict as columns."""
+        from .store import ResultStore
+
+        columns = {key.name: np.float64 for key, _ in self.axes}
+        columns.update({key: np.float64 for key in keep})
+        columns['verdict'] = np.uint8
+        base = {key.name: value for key, value in self.base.items() if np.ndim(value) == 0}
+        return ResultStore.create(path, columns, metadata={"kind": "sweep", "base": base,
+                                                           "shape": [len(values) for _, values in self.axes]})
+
+    def run(self, keep=(), progress=None, cancel=None, store=None):
+        """Evaluates the whole grid; `keep` names result keys to return as full grids.
+
+        `progress(done, total)` is called after each block and `cancel` (a jobs.CancelToken)
+        is checked before it, for use as a background job. With a `store` (see create_store)
+        each block is appended to it as soon as it is computed, in C order of the grid.
+        """
+        shape = tuple(len(values) for _, values in self.axes)
+        verdict = np.empty(shape, dtype=np.uint8)
+        kept = {key: np.empty(shape) for key in keep}
+        gm_fixed = self.base.get(Param.GM_MCU, 0.0)
+        total, done = verdict.size, 0
+
+        with np.errstate(invalid='ignore'):
+            for index, columns in self._blocks(shape):
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                results = CrystalCircuitModel.calculate_batch(columns)
+                verdict[index] = CrystalCircuitModel.verdict_batch(columns.get(Param.GM_MCU, gm_fixed), results)
+                for key, grid in kept.items():
+                    grid[index] = results[key]
+                if store is not None:
+                    block_shape = verdict[index].shape
+                    rows = {key.name: np.broadcast_to(columns[key], block_shape) for key, _ in self.axes}
+                    rows.update({key: np.broadcast_to(results[key], block_shape) for key in keep})
+                    rows['verdict'] = verdict[index]
+                    store.append(rows)
+                if progress is not None:
+                    done += verdict[index].size
+                    progress(done, total)
+        return SweepResult(self.axes, verdict, kept)
@@ -0,0 +1,111 @@
+"""Column-oriented result rows for the GUI results browser.
+
+Sorting and verdict filtering work on index arrays over the NumPy columns; the
+view only ever reads the window of rows currently on screen.
+"""
+import numpy as np
+
+from .model import CrystalCircuitModel, Param
+from .sweep import SweepResult
+
+
+class ResultTable:
+    """Rows of named 1-D columns plus a verdict code per row.
+
+    The visible row order is an index array: sort() permutes it with a cached argsort
+    of the column, filter() masks it by verdict. Neither copies the columns.
+    """
+
+    def __init__(self, columns, verdict):
+        self.columns = {name: np.asarray(values).ravel() for name, values in columns.items()}
+        self.verdict = np.asarray(verdict, dtype=np.uint8).ravel()
+        for name, values in self.columns.items():
+            if values.shape != self.verdict.shape:
+                raise ValueError(f"La colonna {name} ha {values.size} righe invece di {self.verdict.size}.")
+        self.sort_key = None
+        self.descending = False
+        self.verdicts = None
+        self._argsorts = {}
+        self._view = np.arange(self.verdict.size)
+
+    @classmethod
+    def from_sweep(cls, result):
+        """One row per grid point of a SweepResult: swept Param values, kept result grids."""
+        shape = result.shape
+        columns = {}
+        for axis, (key, values) in enumerate(result.axes):
+            index_shape = [1] * len(shape)
+            index_shape[axis] = -1
+            columns[key.name] = np.broadcast_to(values.reshape(index_shape), shape)
+        columns.update(result.results)
+        return cls(columns, result.verdict)
+
+    @classmethod
+    def from_npz(cls, path):
+        """Loads a map saved by the headless `sweep --save` (verdict plus axis_<i>_<PARAM> arrays)."""
+        with np.load(path) as data:
+            axis_names = sorted((name for name in data.files if name.startswith("axis_")),
+                                key=lambda name: int(name.split("_")[1]))
+            axes = [(Param[name.split("_", 2)[2]], data[name]) for name in axis_names]
+            results = {name: data[name] for name in data.files
+                       if name != "verdict" and not name.startswith("axis_")}
+            return cls.from_sweep(SweepResult(axes, data["verdict"], results))
+
+    @classmethod
+    def from_store(cls, path):
+        """Opens a store.ResultStore directory; its columns stay memory-mapped."""
+        from .store import ResultStore
+
+        store = ResultStore(path)
+        columns = store.columns()
+        return cls({name: values for name, values in columns.items() if name != "verdict"}, columns["verdict"])
+
+    def __len__(self):
+        return self._view.size
+
+    @property
+    def total(self):
+        return self.verdict.size
+
+    def sort(self, key, descending=False):
+        """Orders the rows by column `key` (None restores the original order)."""
+        self.sort_key = key
+        self.descending = descending
+        self._refresh()
+
+    def filter(self, verdicts=None):
+        """Keeps only rows whose verdict code is in `verdicts` (None keeps all)."""
+        self.verdicts = None if verdicts is None else tuple(verdicts)
+        self._refresh()
+
+    def _order(self):
+        if self.sort_key is None:
+            return None
+        order = self._argsorts.get(self.sort_key)
+        if order is None:
+            values = self.verdict if self.sort_key == "verdict" else self.columns[self.sort_key]
+            order = self._argsorts[self.sort_key] = np.argsort(values)
+        return order[::-1] if self.descending else order
+
+    def _refresh(self):
+        order = self._order()
+        if self.verdicts is None:
+            self._view = np.arange(self.verdict.size) if order is None else order
+            return
+        allowed = np.zeros(len(CrystalCircuitModel.VERDICT_NAMES), dtype=bool)
+        allowed[list(self.verdicts)] = True
+        keep = allowed[self.verdict]
+        self._view = np.flatnonzero(keep) if order is None else order[keep[order]]
+
+    def counts(self):
+        """Number of rows per verdict name, over the whole table."""
+        totals = np.bincount(self.verdict, minlength=len(CrystalCircuitModel.VERDICT_NAMES))
+        return dict(zip(CrystalCircuitModel.VERDICT_NAMES, totals.tolist()))
+
+    def window(self, start, count):
+        """Rows start..start+count of the current view as (row number, {column: float}, verdict name)."""
+        rows = self._view[start:start + count]
+        values = {name: column[rows].tolist() for name, column in self.columns.items()}
+        names = CrystalCircuitModel.VERDICT_NAMES
+        return [(int(row), {name: column[i] for name, column in values.items()}, names[self.verdict[row]])
+                for i, row in enumerate(rows.tolist())]
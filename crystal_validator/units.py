@@ -0,0 +1,84 @@
+"""Value+unit parsing shared by the GUI inputs, .xtal files and the headless modes."""
+import json
+
+from .config import AppConfig
+from .model import Param
+from .profiling import instrumented
+
+
+DEFAULT_UNITS = {key_str: default_unit
+                 for params in AppConfig.PARAM_MAP.values()
+                 for key_str, _, _, default_unit, _, _ in params}
+ALLOWED_UNITS = {key_str: units
+                 for params in AppConfig.PARAM_MAP.values()
+                 for key_str, _, _, _, units, _ in params}
+
+PARAM_NAMES = tuple(key.name for key in Param)
+BASE_UNITS = {name: next(unit for unit in units if AppConfig.UNIT_MULTIPLIERS[unit] == 1)
+              for name, units in ALLOWED_UNITS.items()}
+UNIT_TABLES = tuple({unit: AppConfig.UNIT_MULTIPLIERS[unit] for unit in ALLOWED_UNITS[name]}
+                    for name in PARAM_NAMES)
+
+
+@instrumented("parse.design_value")
+def parse_design_value(key: Param, value, unit=None):
+    """Converts a value+unit pair (as shown in the GUI) to base units."""
+    unit = unit or DEFAULT_UNITS[key.name]
+    multiplier = UNIT_TABLES[key.value].get(unit)
+    if multiplier is None:
+        raise ValueError(f"Unità '{unit}' non valida per {key.name}.")
+    val_str = str(value).strip()
+    if not val_str:
+        raise ValueError(f"Il campo {key.name} non può essere vuoto.")
+    try:
+        return float(val_str) * multiplier
+    except ValueError:
+        raise ValueError(f"Valore non numerico per {key.name}: '{val_str}'.")
+
+
+def split_unit(text):
+    """Splits a trailing unit suffix: '10pF' -> ('10', 'pF'), '4:30:27' -> ('4:30:27', None)."""
+    text = text.strip()
+    split = len(text)
+    while split > 0 and (text[split - 1].isalpha() or text[split - 1] == '/'):
+        split -= 1
+    return text[:split].strip(), text[split:] or None
+
+
+def parse_quantity(key: Param, text):
+    """Parses 'VALUE[UNIT]' (e.g. '10pF', '1.5 kOhm') for a Param, into base units."""
+    return parse_design_value(key, *split_unit(text))
+
+
+@instrumented("session.read")
+def read_work_fields(path):
+    """Reads a .xtal work file into {Param: base value}, skipping empty fields."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    values = {}
+    for key in Param:
+        entry = data.get(key.name)
+        if isinstance(entry, dict) and str(entry.get("value", "")).strip():
+            values[key] = parse_design_value(key, entry["value"], entry.get("unit"))
+    return values
+
+
+def preset_columns(library):
+    """Converts crystal presets ({name: {PARAM: (value, unit)}}) into name list + column arrays.
+
+    Custom/empty entries and presets with unparsable values are skipped.
+    """
+    import numpy as np
+
+    preset_params = (Param.FREQ, Param.C0, Param.ESR_MAX, Param.DL_MAX)
+    names, rows = [], []
+    for name, preset in library.items():
+        if not preset:
+            continue
+        try:
+            rows.append([parse_design_value(key, *preset[key.name]) for key in preset_params])
+        except (KeyError, ValueError, TypeError):
+            continue
+        names.append(name)
+    table = np.array(rows, dtype=np.float64).reshape(-1, len(preset_params))
+    return names, {key: table[:, i] for i, key in enumerate(preset_params)}
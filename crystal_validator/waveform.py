@@ -0,0 +1,225 @@
+"""Oscilloscope capture import: peak-to-peak amplitude and oscillation frequency.
+
+Captures are read block by block (text parsing of CSV, np.memmap of binary files), so
+memory stays constant however many samples the scope exported. The frequency is
+measured by counting edges over the whole record, as recommended by TI SLLA549: a long
+gate averages out the period jitter that a single-cycle measurement would see.
+"""
+import os
+
+import numpy as np
+
+from .config import AppConfig
+
+
+class WaveformResult:
+    """Measurements of one capture; frequencies in Hz, voltages in V."""
+
+    def __init__(self, vpp, frequency, n_samples, sample_rate, cycles, nominal_freq=None):
+        self.vpp = vpp
+        self.frequency = frequency
+        self.n_samples = n_samples
+        self.sample_rate = sample_rate
+        self.cycles = cycles
+        self.nominal_freq = nominal_freq
+
+    @property
+    def ppm_error(self):
+        """(f_measured - FREQ) / FREQ in ppm, or None without a nominal frequency or a measurement."""
+        if not self.nominal_freq or self.frequency is None:
+            return None
+        return (self.frequency - self.nominal_freq) / self.nominal_freq * 1e6
+
+
+class WaveformCapture:
+    """A capture file streamed as float64 voltage blocks.
+
+    Supported formats:
+      - .csv/.txt: time and voltage columns (`time_column`, `value_column`; header and
+        metadata lines are skipped). With `time_column=None` the sample rate must be given.
+      - .npy: 1-D voltages, or 2-D (time, voltage) rows; opened memory-mapped.
+      - anything else: raw samples of `dtype`, converted as value * scale + offset.
+    """
+
+    TEXT_EXTENSIONS = ('.csv', '.txt')
+
+    def __init__(self, path, sample_rate=None, dtype='int16', scale=1.0, offset=0.0,
+                 time_column=0, value_column=1, chunk_size=AppConfig.WAVEFORM_CHUNK_SAMPLES):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.dtype = np.dtype(dtype)
+        self.scale, self.offset = scale, offset
+        self.time_column, self.value_column = time_column, value_column
+        self.chunk_size = max(2, int(chunk_size))
+        self.size = os.path.getsize(path)
+        # First/last time stamps seen, used to derive the sample rate of timed captures
+        self.t_first = self.t_last = None
+
+    def blocks(self):
+        """Yields (voltages, bytes read so far) until the end of the file."""
+        ext = os.path.splitext(self.path)[1].lower()
+        if ext in self.TEXT_EXTENSIONS:
+            yield from self._text_blocks()
+            return
+        if ext == '.npy':
+            data = np.load(self.path, mmap_mode='r')
+        else:
+            if not self.sample_rate:
+                raise ValueError("Specificare la frequenza di campionamento per i file binari grezzi.")
+            data = np.memmap(self.path, dtype=self.dtype, mode='r')
+        if data.ndim == 1 and not self.sample_rate:
+            raise ValueError("Il file non contiene i tempi: specificare la frequenza di campionamento.")
+        if data.ndim not in (1, 2):
+            raise ValueError(f"Formato non supportato: array a {data.ndim} dimensioni.")
+        total = data.shape[0]
+        for start in range(0, total, self.chunk_size):
+            block = np.asarray(data[start:start + self.chunk_size], dtype=np.float64)
+            if block.ndim == 2:
+                self._track_time(block[:, self.time_column])
+                block = block[:, self.value_column]
+            yield block * self.scale + self.offset, self.size * min(start + self.chunk_size, total) // total
+
+    def _text_blocks(self):
+        columns = [self.value_column] if self.time_column is None else [self.time_column, self.value_column]
+        with open(self.path, 'r', newline='') as f:
+            delimiter, first = self._skip_header(f, columns)
+            lines, read = [first], len(first)
+            for line in f:
+                lines.append(line)
+                read += len(line)
+                if len(lines) >= self.chunk_size:
+                    yield self._parse_lines(lines, delimiter, columns), read
+                    lines = []
+            if lines:
+                yield self._parse_lines(lines, delimiter, columns), read
+
+    @staticmethod
+    def _skip_header(f, columns):
+        """Returns (delimiter, first data line), skipping lines whose selected fields are not numbers."""
+        for line in f:
+            delimiter = ',' if ',' in line else ';' if ';' in line else None
+            fields = line.split(delimiter)
+            try:
+                for column in columns:
+                    float(fields[column])
+            except (IndexError, ValueError):
+                continue
+            return delimiter, line
+        raise ValueError("Nessun campione numerico trovato nel file.")
+
+    def _parse_lines(self, lines, delimiter, columns):
+        try:
+            data = np.loadtxt(lines, delimiter=delimiter, usecols=columns, ndmin=2)
+        except ValueError as e:
+            raise ValueError(f"Riga non valida nel file di acquisizione: {e}")
+        if self.time_column is not None:
+            self._track_time(data[:, 0])
+        return data[:, -1] * self.scale + self.offset
+
+    def _track_time(self, times):
+        if times.size:
+            if self.t_first is None:
+                self.t_first = float(times[0])
+            self.t_last = float(times[-1])
+
+
+class WaveformAnalysis:
+    """Streams a WaveformCapture once, measuring Vpp and the oscillation frequency.
+
+    Vpp: the high and low percentiles (WAVEFORM_PEAK_PERCENTILE) of every block, combined
+    with a median across blocks, so isolated spikes or a glitchy block do not inflate it.
+    Frequency: rising edges of a Schmitt trigger around the mid level (hysteresis
+    WAVEFORM_HYSTERESIS of Vpp, thresholds fixed after the first block), fed through a
+    3-tap median filter so single-sample spikes cannot add edges; the crossing instant
+    is interpolated between samples and f = (edges - 1) / (last - first edge).
+    """
+
+    def __init__(self, capture, nominal_freq=None, percentile=AppConfig.WAVEFORM_PEAK_PERCENTILE,
+                 hysteresis=AppConfig.WAVEFORM_HYSTERESIS):
+        self.capture = capture
+        self.nominal_freq = nominal_freq
+        self.percentile = percentile
+        self.hysteresis = hysteresis
+
+    def run(self, progress=None, cancel=None):
+        lows, highs = [], []
+        thresholds = None
+        n_samples = 0
+        # Edge detector state carried across blocks
+        state, tail = 0, None
+        edges, first_edge, last_edge = 0, None, None
+
+        for block, read in self.capture.blocks():
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            if block.size:
+                low, high = np.percentile(block, (self.percentile, 100.0 - self.percentile))
+                lows.append(low)
+                highs.append(high)
+                if thresholds is None:
+                    mid, band = (low + high) / 2.0, self.hysteresis * (high - low) / 2.0
+                    thresholds = (mid - band, mid + band)
+
+                filtered, tail = self._median3(block, tail)
+                found, state = self._rising_edges(filtered, thresholds, state)
+                if found.size:
+                    found += n_samples
+                    edges += found.size
+                    if first_edge is None:
+                        first_edge = float(found[0])
+                    last_edge = float(found[-1])
+                n_samples += block.size
+            if progress is not None:
+                progress(read, self.capture.size)
+
+        if not n_samples:
+            raise ValueError("Il file di acquisizione non contiene campioni.")
+        sample_rate = self._sample_rate(n_samples)
+        frequency = None
+        if edges >= 2 and sample_rate and last_edge > first_edge:
+            frequency = (edges - 1) / (last_edge - first_edge) * sample_rate
+        vpp = float(np.median(highs) - np.median(lows))
+        return WaveformResult(vpp, frequency, n_samples, sample_rate, max(edges - 1, 0), self.nominal_freq)
+
+    def _sample_rate(self, n_samples):
+        capture = self.capture
+        if capture.sample_rate:
+            return float(capture.sample_rate)
+        if capture.t_first is not None and capture.t_last > capture.t_first and n_samples > 1:
+            return (n_samples - 1) / (capture.t_last - capture.t_first)
+        return None
+
+    @staticmethod
+    def _median3(block, tail):
+        """Causal 3-tap median (one sample of delay) over the last three raw samples of the
+        previous block (`tail`) and this one; returns (filtered samples, preceded by the
+        previous block's last filtered sample, new tail)."""
+        if tail is None:
+            tail = np.full(3, block[0])
+        x = np.concatenate((tail, block))
+        a, b, c = x[:-2], x[1:-1], x[2:]
+        filtered = np.maximum(np.minimum(a, b), np.minimum(np.maximum(a, b), c))
+        return filtered, x[-3:]
+
+    @staticmethod
+    def _rising_edges(samples, thresholds, state):
+        """Fractional sample indices (within the block) of low->high transitions.
+
+        `samples` starts with the last sample of the previous block; returns (edges,
+        final state) so the next block continues seamlessly.
+        """
+        low, high = thresholds
+        block = samples[1:]
+        levels = np.zeros(samples.size, dtype=np.int8)
+        levels[0] = state
+        levels[1:][block > high] = 1
+        levels[1:][block < low] = -1
+        # Between the thresholds the trigger keeps its previous state: forward-fill
+        held = np.where(levels != 0, np.arange(samples.size), 0)
+        np.maximum.accumulate(held, out=held)
+        levels = levels[held]
+
+        rise = np.flatnonzero((levels[1:] == 1) & (levels[:-1] == -1)) + 1
+        before, after = samples[rise - 1], samples[rise]
+        edges = (rise - 2) + (high - before) / (after - before)
+        return edges, int(levels[-1])
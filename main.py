@@ -1,180 +1,22 @@
 import tkinter as tk
 from tkinter import messagebox, ttk, font, filedialog, simpledialog
 import json
+import math
 import os
-import numpy as np
-from enum import Enum
-
-
-# --- CONFIGURATION (Centralized constants) ---
-
-class AppConfig:
-    """Centralizes all application constants and configuration."""
-    APP_VERSION = "3.4"  # Versione aggiornata
-    LIBRARY_FILENAME = "xtal_library.json"
-
-    # Colors (Scientific Paper Theme)
-    COLOR_OK = "#006400"                # Dark Green
-    COLOR_WARN = "#E69500"              # Amber/Ochre
-    COLOR_ERROR = "#C00000"             # Dark Red
-    COLOR_BACKGROUND = "#FFFFFF"        # White
-    COLOR_FRAME_BG = "#FDFDFD"          # Off-white
-    COLOR_ACCENT = "#A00000"             # Dark, academic red
-    COLOR_ACCENT_DARK = "#700000"        # Darker red for active states
-    COLOR_TEXT_PRIMARY = "#000000"       # Black
-    COLOR_TEXT_SECONDARY = "#555555"     # Dark Gray
-    COLOR_SEPARATOR = "#DDDDDD"         # Light Gray
-    COLOR_STALE_RESULT = "#777777"       # Gray
-    COLOR_INVALID_ENTRY = "#FFEEEE"     # Light pink
-    COLOR_DISABLED_ENTRY = "#F5F5F5"    # Very light gray
-
-    # Fonts (Scientific Paper Theme)
-    FONT_DEFAULT = ('Times New Roman', 11)
-    FONT_ITALIC = ('Times New Roman', 10, 'italic')
-    FONT_BOLD = ('Times New Roman', 11, 'bold')
-    FONT_TITLE = ('Times New Roman', 12, 'bold')
-    FONT_GROUP_TITLE = ('Times New Roman', 13, 'bold')
-    FONT_HEADER = ('Times New Roman', 14, 'bold')
-    FONT_MAIN_TITLE = ('Times New Roman', 18, 'bold')
-    FONT_VALUE = ('Times New Roman', 12, 'bold')
-    FONT_VALUE_STALE = ('Times New Roman', 12, 'normal')
-    FONT_STATUS = ('Times New Roman', 11, 'bold')
-    FONT_FINAL_STATUS = ('Times New Roman', 16, 'bold')
-    # Font for the formulas window
-    FONT_FORMULA_TITLE = ('Times New Roman', 13, 'bold')
-    FONT_FORMULA = ('Courier New', 11, 'bold') # Monospaced for formulas
-    FONT_FORMULA_DESC = ('Times New Roman', 11)
-
-    # Unit Multipliers
-    UNIT_MULTIPLIERS = {
-        'Hz': 1, 'kHz': 1e3, 'MHz': 1e6,
-        'F': 1, 'pF': 1e-12, 'nF': 1e-9, 'uF': 1e-6,
-        'Ohm': 1, 'kOhm': 1e3,
-        'W': 1, 'mW': 1e-3, 'uW': 1e-6,
-        'A/V': 1, 'mA/V': 1e-3,
-        'V': 1, 'mV': 1e-3,
-    }
-
-    # Probe Data
-    PROBE_MODELS = {
-        "Manuale/Custom": 0.0,
-        "Sonda Attiva (LeCroy ZS1500)": 0.9,  # Valore in pF
-        "Sonda Passiva (Tek P5050B)": 12.0,  # Valore in pF
-    }
-    DEFAULT_PROBE_NAME = "Manuale/Custom"
-
-    # Crystal Presets
-    XTAL_PRESETS = {
-        "Manuale/Custom": {},
-        "ECS-250-10-36Q-AES-TR": {
-            "FREQ": ("25", "MHz"),
-            "C0": ("5", "pF"),
-            "ESR_MAX": ("60", "Ohm"),
-            "DL_MAX": ("100", "uW"),
-        },
-        "Abracon IXA20 (24MHz)": {
-            "FREQ": ("24", "MHz"),
-            "C0": ("5", "pF"),
-            "ESR_MAX": ("40", "Ohm"),
-            "DL_MAX": ("300", "uW"),
-        },
-        "MicroCrystal CM7V-T1A (32.768kHz)": {
-            "FREQ": ("32.768", "kHz"),
-            "C0": ("1.3", "pF"),
-            "ESR_MAX": ("70", "kOhm"),
-            "DL_MAX": ("1.0", "uW"),
-        }
-    }
-    DEFAULT_XTAL_NAME = "Manuale/Custom"
-
-    # GUI Layout Definitions
-    PARAM_MAP = {
-        "Parametri del Cristallo (XTAL Datasheet)": [
-            ("FREQ", "Frequenza (F)", "", "MHz", ['MHz', 'kHz', 'Hz'], "Frequenza operativa nominale."),
-            ("C0", "Capacità Shunt (C0)", "", "pF", ['pF', 'nF', 'F'],
-             "Capacità del contenitore e degli elettrodi."),
-            ("ESR_MAX", "ESR Max", "", "Ohm", ['Ohm', 'kOhm'], "Massima Resistenza Serie Equivalente."),
-            ("DL_MAX", "DL Max", "", "uW", ['uW', 'mW', 'W'], "Massima potenza dissipabile."),
-        ],
-        "Parametri Circuito e MCU": [
-            ("GM_MCU", "Gm MCU", "", "mA/V", ['mA/V', 'A/V'], "Transconduttanza dell'amplificatore MCU."),
-            ("CL_SEL", "CL Esterna (CL_sel)", "", "pF", ['pF', 'nF', 'F'],
-             "Valore condensatori esterni (CL1=CL2)."),
-            ("REXT_SEL", "Rext Selezionata", "", "Ohm", ['Ohm', 'kOhm'],
-             "Resistenza in serie per limitazione corrente."),
-            ("CS_PIN", "Cs PIN", "", "pF", ['pF', 'nF', 'F'], "Capacità parassita del singolo pin MCU (un ramo)."),
-            ("CS_PCB", "Cs PCB", "", "pF", ['pF', 'nF', 'F'], "Capacità parassita della singola linea PCB (un ramo)."),
-        ],
-        "Misurazioni (Per calcolo DL effettivo)": [
-            ("VPP_MEASURED", "Vpp Misurata", "", "mV", ['mV', 'V'],
-             "Tensione Picco-Picco misurata su OSC_IN (pin CL1)."),
-            ("C_PROBE", "Cap. Sonda (C_probe)", "", "pF", ['pF', 'nF', 'F'],
-             "Capacità della sonda DSO utilizzata."),
-        ]
-    }
-
-
-# --- MODEL (Data and Business Logic) ---
-
-class Param(Enum):
-    FREQ, C0, ESR_MAX, DL_MAX, GM_MCU, CL_SEL, REXT_SEL, CS_PIN, CS_PCB, VPP_MEASURED, C_PROBE = range(11)
-
-
-class CrystalCircuitModel:
-    GM_MARGIN_THRESHOLD = 5.0
-
-    def __init__(self):
-        self.params = {}
-        self.results = {}
-        self.reset()
-
-    def reset(self):
-        self.params = {param: 0.0 for param in Param}
-        self.results = {
-            'cl_eff': 0.0, 'gm_crit': 0.0, 'gain_margin': 0.0,
-            'x_cl': 0.0, 'drive_level': 0.0, 'dl_ratio': 0.0,
-            'c_tot_dl': 0.0
-        }
-
-    def set_param(self, key: Param, value: float):
-        if not isinstance(key, Param):
-            raise TypeError("La chiave deve essere un'istanza di Param Enum.")
-        if value < 0:
-            raise ValueError(f"Il valore per {key.name} non può essere negativo.")
-        if key in [Param.FREQ, Param.ESR_MAX, Param.DL_MAX] and value <= 0:
-            raise ValueError(f"Il valore per {key.name} deve essere positivo.")
-        self.params[key] = value
-
-    def calculate(self):
-        try:
-            p = self.params
-            f, c0, cs_pcb, cs_pin, cl_sel, esr_max, gm, dl_max, rext_sel, vpp_measured, c_probe = (
-                p[Param.FREQ], p[Param.C0], p[Param.CS_PCB], p[Param.CS_PIN], p[Param.CL_SEL],
-                p[Param.ESR_MAX], p[Param.GM_MCU], p[Param.DL_MAX], p[Param.REXT_SEL],
-                p[Param.VPP_MEASURED], p[Param.C_PROBE]
-            )
-
-            total_esr = esr_max + rext_sel
-
-            c_stray_single_leg = cs_pcb + cs_pin
-            cl_eff = (cl_sel + c_stray_single_leg) / 2.0
-            gm_crit = 4.0 * total_esr * (2 * np.pi * f) ** 2 * (c0 + cl_eff) ** 2
-            gain_margin = gm / gm_crit if gm_crit > 0 else float('inf')
-            x_cl = 1.0 / (2 * np.pi * f * cl_sel) if cl_sel > 0 else 0.0
-            c_tot_dl = cl_sel + c_stray_single_leg + c_probe
-            drive_level = (total_esr / 2.0) * (np.pi * f * c_tot_dl * vpp_measured) ** 2
-            dl_ratio = drive_level / dl_max if dl_max > 0 else float('inf')
-
-            self.results.update({
-                'cl_eff': cl_eff, 'gm_crit': gm_crit, 'gain_margin': gain_margin,
-                'x_cl': x_cl, 'drive_level': drive_level, 'dl_ratio': dl_ratio,
-                'c_tot_dl': c_tot_dl
-            })
-            return True, None
-        except (ZeroDivisionError, ValueError) as e:
-            error_message = f"Errore di calcolo nel modello: {e}"
-            print(error_message)
-            return False, error_message
+from itertools import zip_longest
+import multiprocessing
+import sqlite3
+import sys
+
+from crystal_validator import AppConfig, CrystalCircuitModel, Param
+from crystal_validator.cache import ResultCache
+from crystal_validator.finder import CrystalFinder
+from crystal_validator.jobs import JobRunner
+from crystal_validator.library import McuLibrary, XtalLibrary
+from crystal_validator.profiling import instrumented, profiler
+from crystal_validator.rules import RuleEngine
+from crystal_validator.table import ResultTable
+from crystal_validator.units import DEFAULT_UNITS
 
 
 # --- VIEW (GUI Rendering) ---
@@ -263,6 +105,679 @@ class FormulasView(tk.Toplevel):
         self._add_formula_block(parent, title_5, formula_5, desc_5)
 
 
+class CompatibleCrystalsView(tk.Toplevel):
+    """Finestra con i quarzi della libreria compatibili con MCU e scheda correnti."""
+
+    COLUMNS = (("name", "Quarzo", 260), ("freq", "F [MHz]", 100), ("gain_margin", "Gain Margin", 110),
+               ("dl_ratio", "DL/DL_max", 100), ("verdict", "Esito", 80))
+
+    def __init__(self, master, controller, result):
+        super().__init__(master)
+        self.controller = controller
+        self.title("Quarzi Compatibili")
+        self.geometry("720x480")
+        self.configure(background=AppConfig.COLOR_BACKGROUND)
+
+        shown = min(len(result), AppConfig.FINDER_MAX_ROWS)
+        summary = f"{len(result)} quarzi compatibili, ordinati per margine di guadagno"
+        if shown < len(result):
+            summary += f" (mostrati i primi {shown})"
+        ttk.Label(self, text=summary + ". Doppio clic per caricare.", padding=10).pack(anchor="w")
+
+        frame = ttk.Frame(self)
+        frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="w" if key == "name" else "e")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        fmt = controller._format_value
+        for name, freq, margin, ratio, verdict in result.rows(shown):
+            self.tree.insert("", "end", values=(name, fmt(freq / 1e6, 4), fmt(margin, 2), fmt(ratio, 3), verdict))
+        self.tree.bind("<Double-1>", self._on_double_click)
+
+    def _on_double_click(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.controller.select_library_preset(self.tree.item(selection[0], "values")[0])
+
+
+class CompatibilityMatrixView(tk.Toplevel):
+    """Finestra con le coppie quarzo x variante MCU compatibili della libreria."""
+
+    COLUMNS = (("crystal", "Quarzo", 220), ("mcu", "Variante MCU", 240), ("gain_margin", "Gain Margin", 100),
+               ("dl_ratio", "DL/DL_max", 90), ("cl_window", "CL_sel [pF]", 110))
+
+    def __init__(self, master, controller, result):
+        super().__init__(master)
+        self.controller = controller
+        self.title("Matrice di Compatibilità Quarzi × MCU")
+        self.geometry("820x480")
+        self.configure(background=AppConfig.COLOR_BACKGROUND)
+
+        compatible = int((result.passing > 0).sum())
+        shown = min(compatible, AppConfig.FINDER_MAX_ROWS)
+        summary = (f"{result.shape[0]} quarzi × {result.shape[1]} varianti MCU: {compatible} coppie compatibili, "
+                   f"ordinate per margine di guadagno")
+        if shown < compatible:
+            summary += f" (mostrate le prime {shown})"
+        ttk.Label(self, text=summary + ". Doppio clic per caricare.", padding=10).pack(anchor="w")
+
+        frame = ttk.Frame(self)
+        frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="w" if key in ("crystal", "mcu") else "e")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        fmt = controller._format_value
+        for crystal, mcu, margin, ratio, cl_max, _ in result.rows(shown):
+            window = f"{fmt(result.cl_sel * 1e12, 1)} - {fmt(cl_max * 1e12, 1)}"
+            self.tree.insert("", "end", values=(crystal, mcu, fmt(margin, 2), fmt(ratio, 3), window))
+        self.tree.bind("<Double-1>", self._on_double_click)
+
+    def _on_double_click(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            crystal, mcu = self.tree.item(selection[0], "values")[:2]
+            self.controller.select_mcu_variant(mcu)
+            self.controller.select_library_preset(crystal)
+
+
+class SensitivityView(tk.Toplevel):
+    """Finestra con la sensibilità di ogni risultato a ogni parametro del design corrente."""
+
+    COLUMNS = (("param", "Parametro", 140), ("gm_crit", "gm_crit", 120), ("gain_margin", "Gain Margin", 120),
+               ("drive_level", "Drive Level", 120), ("dl_ratio", "DL/DL_max", 120))
+
+    def __init__(self, master, controller, result):
+        super().__init__(master)
+        self.controller = controller
+        self.result = result
+        self.title("Sensibilità Parametri")
+        self.geometry("700x400")
+        self.configure(background=AppConfig.COLOR_BACKGROUND)
+
+        controls = ttk.Frame(self, padding=10)
+        controls.pack(fill="x")
+        self.absolute_var = tk.BooleanVar(value=False)
+        self.caption_var = tk.StringVar()
+        ttk.Label(controls, textvariable=self.caption_var).pack(side="left")
+        ttk.Checkbutton(controls, text="Derivate assolute", variable=self.absolute_var,
+                        command=self._render).pack(side="right")
+
+        frame = ttk.Frame(self)
+        frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="w" if key == "param" else "e")
+        self.tree.pack(fill="both", expand=True)
+        self._render()
+
+    def _render(self):
+        absolute = self.absolute_var.get()
+        table = self.result.jacobian if absolute else self.result.normalized
+        self.caption_var.set("dr/dp in unità base" if absolute
+                             else "Variazione % del risultato per +1% del parametro")
+        self.tree.delete(*self.tree.get_children())
+        fmt = self.controller._format_value
+        for param in Param:
+            row = [float(table[key][param]) for key, _, _ in self.COLUMNS[1:]]
+            if not any(row):
+                continue
+            self.tree.insert("", "end", values=[param.name] + [fmt(value, 3) for value in row])
+
+
+class ResultsTableView(tk.Toplevel):
+    """Finestra che sfoglia i risultati di sweep e batch disegnando solo le righe visibili."""
+
+    FILTERS = (("Tutti", None),
+               ("Solo PASS", (CrystalCircuitModel.VERDICT_PASS,)),
+               ("Solo WARN", (CrystalCircuitModel.VERDICT_WARN,)),
+               ("Solo FAIL", (CrystalCircuitModel.VERDICT_FAIL,)),
+               ("WARN + FAIL", (CrystalCircuitModel.VERDICT_WARN, CrystalCircuitModel.VERDICT_FAIL)))
+    # Display scale and unit of result columns; Param columns use their default GUI unit
+    RESULT_UNITS = {'cl_eff': (1e12, "pF"), 'gm_crit': (1e3, "mA/V"), 'gain_margin': (1, ""), 'x_cl': (1, "Ohm"),
+                    'drive_level': (1e6, "uW"), 'dl_ratio': (1, ""), 'c_tot_dl': (1e12, "pF")}
+    WHEEL_ROWS = 3
+
+    def __init__(self, master, controller, table, title):
+        super().__init__(master)
+        self.controller = controller
+        self.table = table
+        self.first = 0
+        self.title(title)
+        self.geometry("900x640")
+        self.configure(background=AppConfig.COLOR_BACKGROUND)
+
+        controls = ttk.Frame(self, padding=10)
+        controls.pack(fill="x")
+        ttk.Label(controls, text="Filtro:").pack(side="left")
+        self.filter_combo = ttk.Combobox(controls, values=[name for name, _ in self.FILTERS], state='readonly',
+                                         width=14)
+        self.filter_combo.set(self.FILTERS[0][0])
+        self.filter_combo.bind("<<ComboboxSelected>>", self._on_filter)
+        self.filter_combo.pack(side="left", padx=(5, 15))
+        self.summary_var = tk.StringVar()
+        ttk.Label(controls, textvariable=self.summary_var).pack(side="left")
+        ttk.Button(controls, text="Fronte di Pareto...", style="Secondary.TButton",
+                   command=lambda: ParetoView(self, controller, self.table, self.formats)).pack(side="right")
+
+        self.formats = []
+        for name in table.columns:
+            if name in DEFAULT_UNITS:
+                unit = DEFAULT_UNITS[name]
+                self.formats.append((name, 1.0 / AppConfig.UNIT_MULTIPLIERS[unit], f"{name} [{unit}]"))
+            else:
+                scale, unit = self.RESULT_UNITS.get(name, (1, ""))
+                self.formats.append((name, scale, f"{name} [{unit}]" if unit else name))
+        headings = [("row", "#")] + [(name, heading) for name, _, heading in self.formats] + [("verdict", "Esito")]
+        self.headings = dict(headings)
+
+        frame = ttk.Frame(self)
+        frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(frame, columns=[key for key, _ in headings], show="headings",
+                                 height=AppConfig.RESULTS_VISIBLE_ROWS, selectmode="browse")
+        for key, text in headings:
+            self.tree.heading(key, text=text, command=lambda k=key: self._on_sort(k))
+            self.tree.column(key, width=70 if key in ("row", "verdict") else 120, anchor="e")
+        # Fixed pool of items, refilled on every scroll: the widget never holds more rows than it shows
+        self.items = [self.tree.insert("", "end", values=()) for _ in range(AppConfig.RESULTS_VISIBLE_ROWS)]
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        for widget in (self.tree, self):
+            widget.bind("<MouseWheel>", self._on_wheel)
+            widget.bind("<Button-4>", self._on_wheel)
+            widget.bind("<Button-5>", self._on_wheel)
+        self.bind("<Prior>", lambda e: self._scroll_to(self.first - len(self.items)))
+        self.bind("<Next>", lambda e: self._scroll_to(self.first + len(self.items)))
+        self.bind("<Home>", lambda e: self._scroll_to(0))
+        self.bind("<End>", lambda e: self._scroll_to(len(self.table)))
+
+        self._render()
+
+    def _render(self):
+        fmt = self.controller._format_value
+        for item, row in zip_longest(self.items, self.table.window(self.first, len(self.items))):
+            if row is None:
+                self.tree.item(item, values=())
+                continue
+            index, values, verdict = row
+            self.tree.item(item, values=[index + 1] + [fmt(values[name] * scale) for name, scale, _ in self.formats]
+                           + [verdict])
+
+        total = len(self.table)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + len(self.items)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        counts = self.table.counts()
+        self.summary_var.set(f"{total} righe su {self.table.total}   (PASS {counts['PASS']}, "
+                             f"WARN {counts['WARN']}, FAIL {counts['FAIL']})")
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, len(self.table) - len(self.items)))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.table)))
+        elif args[0] == "scroll":
+            step = len(self.items) if args[2] == "pages" else 1
+            self._scroll_to(self.first + int(args[1]) * step)
+
+    def _on_wheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self._scroll_to(self.first + (-self.WHEEL_ROWS if up else self.WHEEL_ROWS))
+        return "break"
+
+    def _on_sort(self, key):
+        key = None if key == "row" else key
+        descending = self.table.sort_key == key and key is not None and not self.table.descending
+        self.table.sort(key, descending)
+        for column, text in self.headings.items():
+            if column == key:
+                text += " ▼" if descending else " ▲"
+            self.tree.heading(column, text=text)
+        self.first = 0
+        self._render()
+
+    def _on_filter(self, event=None):
+        self.table.filter(dict(self.FILTERS)[self.filter_combo.get()])
+        self.first = 0
+        self._render()
+
+
+class ParetoView(tk.Toplevel):
+    """Finestra con il fronte di Pareto di una tabella di risultati, come dispersione su un Canvas."""
+
+    SENSES = ("max", "min")
+    MARGINS = (80, 20, 20, 50)  # left, top, right, bottom [px]
+    MARKER_PX = 3
+    PICK_RADIUS_PX = 8
+
+    def __init__(self, master, controller, table, formats):
+        from crystal_validator.pareto import DEFAULT_OBJECTIVES
+
+        super().__init__(master)
+        self.controller = controller
+        self.table = table
+        self.formats = {name: (scale, heading) for name, scale, heading in formats}
+        self.front = None
+        self.points = None
+        self.title("Fronte di Pareto")
+        self.geometry("820x640")
+        self.configure(background=AppConfig.COLOR_BACKGROUND)
+
+        objectives_frame = ttk.Frame(self, padding=10)
+        objectives_frame.pack(fill="x")
+        ttk.Label(objectives_frame, text="Obiettivi:").grid(row=0, column=0, sticky="w", padx=(0, 10))
+        defaults = dict(DEFAULT_OBJECTIVES)
+        self.objective_vars = {}
+        for i, name in enumerate(table.columns):
+            row, column = divmod(i, 4)
+            selected = tk.BooleanVar(value=name in defaults)
+            sense = ttk.Combobox(objectives_frame, values=self.SENSES, state='readonly', width=5)
+            sense.set(defaults.get(name, "min"))
+            ttk.Checkbutton(objectives_frame, text=name, variable=selected).grid(row=row, column=2 * column + 1,
+                                                                               sticky="w")
+            sense.grid(row=row, column=2 * column + 2, sticky="w", padx=(2, 15))
+            self.objective_vars[name] = (selected, sense)
+        ttk.Button(objectives_frame, text="Calcola", command=self._compute).grid(row=0, column=9, sticky="e")
+
+        axes_frame = ttk.Frame(self, padding=(10, 0, 10, 10))
+        axes_frame.pack(fill="x")
+        self.axis_combos = {}
+        for axis in ("X", "Y"):
+            ttk.Label(axes_frame, text=f"Asse {axis}:").pack(side="left")
+            combo = ttk.Combobox(axes_frame, values=list(table.columns), state='readonly', width=14)
+            combo.bind("<<ComboboxSelected>>", lambda e: self._render())
+            combo.pack(side="left", padx=(5, 15))
+            self.axis_combos[axis] = combo
+        names = list(table.columns)
+        self.axis_combos["X"].set('dl_ratio' if 'dl_ratio' in names else names[0])
+        self.axis_combos["Y"].set('gain_margin' if 'gain_margin' in names else names[-1])
+        self.summary_var = tk.StringVar()
+        ttk.Label(axes_frame, textvariable=self.summary_var).pack(side="left")
+
+        self.canvas = tk.Canvas(self, background=AppConfig.COLOR_BACKGROUND, highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.canvas.bind("<Configure>", lambda e: self._render())
+        self.canvas.bind("<Button-1>", self._on_click)
+
+        self._compute()
+
+    def _compute(self):
+        objectives = [(name, sense.get()) for name, (selected, sense) in self.objective_vars.items() if selected.get()]
+        if not objectives:
+            self.summary_var.set("Selezionare almeno un obiettivo.")
+            return
+        columns = dict(self.table.columns)
+        columns['verdict'] = self.table.verdict
+        self.summary_var.set("Calcolo in corso...")
+        self.controller.compute_pareto_front(columns, objectives, self._show_front)
+
+    def _show_front(self, front):
+        if not self.winfo_exists():
+            return
+        self.front = front
+        active = ", ".join(f"{name} ({sense})" for name, sense in front.active)
+        self.summary_var.set(f"{len(front)} design non dominati su {self.table.total}. Clic per caricare.")
+        self.controller.status_var.set(f"Fronte di Pareto: {len(front)} design non dominati su {active}.")
+        self._render()
+
+    def _scaled(self, name):
+        scale, heading = self.formats.get(name, (1, name))
+        return self.front.columns[name] * scale, heading
+
+    def _render(self):
+        import numpy as np
+
+        self.canvas.delete("all")
+        self.points = None
+        if self.front is None or not len(self.front):
+            return
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        left, top, right, bottom = self.MARGINS
+        if width <= left + right or height <= top + bottom:
+            return
+
+        x, x_heading = self._scaled(self.axis_combos["X"].get())
+        y, y_heading = self._scaled(self.axis_combos["Y"].get())
+        finite = np.isfinite(x) & np.isfinite(y)
+        if not finite.any():
+            return
+        x0, x1 = float(x[finite].min()), float(x[finite].max())
+        y0, y1 = float(y[finite].min()), float(y[finite].max())
+        x_span, y_span = (x1 - x0) or 1.0, (y1 - y0) or 1.0
+        px = left + (x - x0) / x_span * (width - left - right)
+        py = height - bottom - (y - y0) / y_span * (height - top - bottom)
+        self.points = np.where(finite, px, np.nan), np.where(finite, py, np.nan)
+
+        plot_bottom = height - bottom
+        self.canvas.create_line(left, top, left, plot_bottom, width - right, plot_bottom,
+                                fill=AppConfig.COLOR_TEXT_SECONDARY)
+        fmt = self.controller._format_value
+        for fraction in (0.0, 0.5, 1.0):
+            tx = left + fraction * (width - left - right)
+            ty = plot_bottom - fraction * (height - top - bottom)
+            self.canvas.create_text(tx, plot_bottom + 4, text=fmt(x0 + fraction * (x1 - x0)), anchor="n",
+                                    fill=AppConfig.COLOR_TEXT_SECONDARY)
+            self.canvas.create_text(left - 6, ty, text=fmt(y0 + fraction * (y1 - y0)), anchor="e",
+                                    fill=AppConfig.COLOR_TEXT_SECONDARY)
+        self.canvas.create_text((left + width - right) / 2, height - 4, text=x_heading, anchor="s")
+        self.canvas.create_text(4, top - 4, text=y_heading, anchor="nw")
+
+        # One marker per occupied cell: the canvas holds at most as many items as it has room for
+        cells = np.flatnonzero(finite)
+        cell_keys = (px[cells] // self.MARKER_PX).astype(np.int64) * (height + 1) \
+            + (py[cells] // self.MARKER_PX).astype(np.int64)
+        shown = cells[np.unique(cell_keys, return_index=True)[1]]
+        verdict = self.front.columns['verdict']
+        r = self.MARKER_PX
+        for i in shown.tolist():
+            self.canvas.create_oval(px[i] - r, py[i] - r, px[i] + r, py[i] + r, outline="",
+                                    fill=self.controller.STATUS_COLORS[int(verdict[i])])
+
+    def _on_click(self, event):
+        import numpy as np
+
+        if self.points is None:
+            return
+        px, py = self.points
+        distance = (px - event.x) ** 2 + (py - event.y) ** 2
+        if np.isnan(distance).all():
+            return
+        i = int(np.nanargmin(distance))
+        if distance[i] > self.PICK_RADIUS_PX ** 2:
+            return
+        self.canvas.delete("selected")
+        r = self.MARKER_PX + 3
+        self.canvas.create_oval(px[i] - r, py[i] - r, px[i] + r, py[i] + r, outline=AppConfig.COLOR_ACCENT,
+                                width=2, tags="selected")
+        self.controller.apply_design_values({name: float(values[i]) for name, values in self.front.columns.items()
+                                             if name in Param.__members__})
+
+
+class CurvePlotView(tk.Toplevel):
+    """Finestra con un risultato in funzione di CL_sel o Rext e le fasce PASS/WARN/FAIL delle sue soglie.
+
+    Le curve sono calcolate col modello vettoriale e disegnate con un minimo e un massimo per
+    colonna di pixel, così anche milioni di punti si ridisegnano mentre si trascina un parametro.
+    """
+
+    MARGINS = (80, 20, 20, 50)  # left, top, right, bottom [px]
+    BAND_COLORS = (AppConfig.COLOR_BAND_OK, AppConfig.COLOR_BAND_WARN, AppConfig.COLOR_BAND_ERROR)
+    # X range of each axis Param, and drag range of the Params without a natural one, in base units
+    AXIS_RANGES = {Param.CL_SEL: tuple(v * AppConfig.UNIT_MULTIPLIERS['pF'] for v in AppConfig.SWEEP_GUI_CL_RANGE_PF),
+                   Param.REXT_SEL: AppConfig.SWEEP_GUI_REXT_RANGE_OHM}
+
+    def __init__(self, master, controller, params):
+        from crystal_validator.curves import AXIS_PARAMS, CURVE_KEYS
+
+        super().__init__(master)
+        self.controller = controller
+        self.params = dict(params)
+        self.x = None
+        self.curves = None
+        self._pending = None
+        self.title("Grafico Risultati")
+        self.geometry("900x640")
+        self.configure(background=AppConfig.COLOR_BACKGROUND)
+
+        controls = ttk.Frame(self, padding=10)
+        controls.pack(fill="x")
+        ttk.Label(controls, text="Asse X:").pack(side="left")
+        self.axis_combo = ttk.Combobox(controls, values=[key.name for key in AXIS_PARAMS], state='readonly', width=10)
+        self.axis_combo.set(AXIS_PARAMS[0].name)
+        self.axis_combo.bind("<<ComboboxSelected>>", lambda e: self._on_axis())
+        self.axis_combo.pack(side="left", padx=(5, 15))
+        ttk.Label(controls, text="Risultato:").pack(side="left")
+        self.result_combo = ttk.Combobox(controls, values=CURVE_KEYS, state='readonly', width=12)
+        self.result_combo.set(CURVE_KEYS[0])
+        self.result_combo.bind("<<ComboboxSelected>>", lambda e: self._draw())
+        self.result_combo.pack(side="left", padx=(5, 15))
+        self.summary_var = tk.StringVar()
+        ttk.Label(controls, textvariable=self.summary_var).pack(side="left")
+
+        drag = ttk.Frame(self, padding=(10, 0, 10, 10))
+        drag.pack(fill="x")
+        ttk.Label(drag, text="Trascina:").pack(side="left")
+        self.drag_combo = ttk.Combobox(drag, state='readonly', width=12)
+        self.drag_combo.bind("<<ComboboxSelected>>", lambda e: self._on_drag_param())
+        self.drag_combo.pack(side="left", padx=(5, 10))
+        self.drag_scale = ttk.Scale(drag, orient="horizontal", length=320, command=self._on_drag)
+        self.drag_scale.pack(side="left")
+        self.drag_value_var = tk.StringVar()
+        ttk.Label(drag, textvariable=self.drag_value_var, width=16).pack(side="left", padx=10)
+        ttk.Button(drag, text="Applica al design", style="Secondary.TButton",
+                   command=self._apply).pack(side="right")
+
+        self.canvas = tk.Canvas(self, background=AppConfig.COLOR_BACKGROUND, highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.canvas.bind("<Configure>", lambda e: self._draw())
+
+        self._on_axis()
+
+    @property
+    def axis(self):
+        return Param[self.axis_combo.get()]
+
+    @property
+    def drag_param(self):
+        return Param[self.drag_combo.get()]
+
+    def _drag_range(self, key):
+        return self.AXIS_RANGES.get(key, (0.0, 2.0 * self.params[key]))
+
+    def _on_axis(self):
+        # The other axis Param, or any Param with a non-zero value, can be dragged
+        names = [key.name for key in Param
+                 if key != self.axis and (key in self.AXIS_RANGES or self.params.get(key, 0.0) > 0)]
+        self.drag_combo.config(values=names)
+        if self.drag_combo.get() not in names:
+            other = [key for key in self.AXIS_RANGES if key != self.axis]
+            self.drag_combo.set(other[0].name if other else names[0])
+        self._on_drag_param()
+
+    def _on_drag_param(self):
+        key = self.drag_param
+        low, high = self._drag_range(key)
+        self.drag_scale.config(from_=low, to=high)
+        self.drag_scale.set(self.params.get(key, 0.0))
+        self._show_drag_value()
+        # set() fires the Scale command too: run its update now instead
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        self._update()
+
+    def _show_drag_value(self):
+        key = self.drag_param
+        unit = DEFAULT_UNITS[key.name]
+        value = self.params.get(key, 0.0) / AppConfig.UNIT_MULTIPLIERS[unit]
+        self.drag_value_var.set(f"{key.name} = {self.controller._format_value(value)} {unit}")
+
+    def _on_drag(self, value):
+        self.params[self.drag_param] = float(value)
+        self._show_drag_value()
+        # Scale events arrive faster than frames: coalesce them into one update when idle
+        if self._pending is None:
+            self._pending = self.after_idle(self._update)
+
+    def _update(self):
+        import time
+
+        import numpy as np
+        from crystal_validator.curves import result_curves
+
+        self._pending = None
+        start = time.perf_counter()
+        self.x = np.linspace(*self.AXIS_RANGES[self.axis], AppConfig.CURVE_GUI_POINTS)
+        self.curves = result_curves(self.params, self.axis, self.x)
+        computed = time.perf_counter()
+        self._draw()
+        self.summary_var.set(f"{self.x.size} punti: calcolo {1e3 * (computed - start):.0f} ms, "
+                             f"disegno {1e3 * (time.perf_counter() - computed):.0f} ms")
+
+    def _apply(self):
+        key = self.drag_param
+        self.controller.apply_design_values({key.name: self.params[key]})
+
+    def _draw(self):
+        import numpy as np
+        from crystal_validator.curves import decimate_minmax, threshold_bands
+
+        self.canvas.delete("all")
+        if self.curves is None:
+            return
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        left, top, right, bottom = self.MARGINS
+        plot_width, plot_height = width - left - right, height - top - bottom
+        if plot_width <= 1 or plot_height <= 1:
+            return
+
+        key = self.result_combo.get()
+        x_unit = DEFAULT_UNITS[self.axis.name]
+        x_scale = 1.0 / AppConfig.UNIT_MULTIPLIERS[x_unit]
+        y_scale, y_unit = ResultsTableView.RESULT_UNITS.get(key, (1, ""))
+        x0, x1 = self.x[0], self.x[-1]
+        columns, low, high = decimate_minmax(self.x, self.curves[key], (x0, x1), plot_width)
+        finite = np.isfinite(low) & np.isfinite(high)
+        columns, low, high = columns[finite], low[finite], high[finite]
+        if not columns.size:
+            return
+        y0, y1 = float(low.min()), float(high.max())
+        pad = 0.05 * ((y1 - y0) or abs(y1) or 1.0)
+        y0, y1 = y0 - pad, y1 + pad
+
+        def to_py(values):
+            return top + plot_height - (np.asarray(values) - y0) / (y1 - y0) * plot_height
+
+        plot_bottom = top + plot_height
+        for band_low, band_high, code in threshold_bands(key, self.params, self.controller.rules.thresholds):
+            if band_high <= y0 or band_low >= y1:
+                continue
+            band_top, band_bottom = to_py(min(band_high, y1)), to_py(max(band_low, y0))
+            self.canvas.create_rectangle(left, band_top, left + plot_width, band_bottom, outline="",
+                                         fill=self.BAND_COLORS[code])
+            if band_low > y0:
+                self.canvas.create_line(left, band_bottom, left + plot_width, band_bottom, dash=(4, 3),
+                                        fill=self.controller.STATUS_COLORS[code])
+
+        # Current design value of the X Param
+        current = self.params.get(self.axis, 0.0)
+        if x0 <= current <= x1:
+            px = left + (current - x0) / (x1 - x0) * plot_width
+            self.canvas.create_line(px, top, px, plot_bottom, dash=(2, 4), fill=AppConfig.COLOR_TEXT_SECONDARY)
+
+        # Each pixel column spans its min and max: at most 2 vertices per column
+        px = left + columns + 0.5
+        points = np.empty((2 * columns.size, 2))
+        points[0::2, 0] = points[1::2, 0] = px
+        points[0::2, 1], points[1::2, 1] = to_py(low), to_py(high)
+        self.canvas.create_line(*points.ravel().tolist(), fill=AppConfig.COLOR_ACCENT, width=2)
+
+        self.canvas.create_line(left, top, left, plot_bottom, left + plot_width, plot_bottom,
+                                fill=AppConfig.COLOR_TEXT_SECONDARY)
+        fmt = self.controller._format_value
+        for fraction in (0.0, 0.25, 0.5, 0.75, 1.0):
+            tx = left + fraction * plot_width
+            ty = plot_bottom - fraction * plot_height
+            self.canvas.create_text(tx, plot_bottom + 4, text=fmt((x0 + fraction * (x1 - x0)) * x_scale, 2),
+                                    anchor="n", fill=AppConfig.COLOR_TEXT_SECONDARY)
+            self.canvas.create_text(left - 6, ty, text=fmt((y0 + fraction * (y1 - y0)) * y_scale, 2),
+                                    anchor="e", fill=AppConfig.COLOR_TEXT_SECONDARY)
+        self.canvas.create_text(left + plot_width / 2, height - 4, text=f"{self.axis.name} [{x_unit}]", anchor="s")
+        self.canvas.create_text(4, top - 4, text=f"{key} [{y_unit}]" if y_unit else key, anchor="nw")
+
+
+class DiagnosticsView(tk.Toplevel):
+    """Finestra con tempi e numero di chiamate delle sezioni strumentate."""
+
+    COLUMNS = (("name", "Sezione", 220), ("calls", "Chiamate", 90), ("total", "Totale [ms]", 110),
+               ("mean", "Medio [us]", 110), ("max", "Max [us]", 110))
+    REFRESH_MS = 1000
+
+    def __init__(self, master, cache=None):
+        super().__init__(master)
+        self.cache = cache
+        self.title("Diagnostica")
+        self.geometry("700x420")
+        self.configure(background=AppConfig.COLOR_BACKGROUND)
+
+        controls = ttk.Frame(self, padding=10)
+        controls.pack(fill="x")
+        self.enabled_var = tk.BooleanVar(value=profiler.enabled)
+        ttk.Checkbutton(controls, text="Profilazione attiva", variable=self.enabled_var,
+                        command=self._toggle).pack(side="left")
+        ttk.Button(controls, text="Esporta JSON", style="Secondary.TButton",
+                   command=self._export).pack(side="right")
+        ttk.Button(controls, text="Azzera", style="Secondary.TButton",
+                   command=self._reset).pack(side="right", padx=5)
+        self.cache_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.cache_var, padding=(10, 0)).pack(anchor="w")
+
+        frame = ttk.Frame(self)
+        frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="w" if key == "name" else "e")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        self._refresh()
+
+    def _refresh(self):
+        if not self.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        if self.cache is not None:
+            stats = self.cache.stats()
+            self.cache_var.set(f"Cache risultati: {stats['hits']} hit, {stats['misses']} miss "
+                               f"({stats['hit_rate']:.1%}), {stats['size']}/{stats['maxsize']} voci")
+        for row in profiler.snapshot():
+            self.tree.insert("", "end", values=(row["name"], row["calls"], f"{row['total_s'] * 1e3:.3f}",
+                                                f"{row['mean_s'] * 1e6:.1f}", f"{row['max_s'] * 1e6:.1f}"))
+        self.after(self.REFRESH_MS, self._refresh)
+
+    def _toggle(self):
+        if self.enabled_var.get():
+            profiler.enable()
+        else:
+            profiler.disable()
+
+    def _reset(self):
+        profiler.reset()
+        self.tree.delete(*self.tree.get_children())
+
+    def _export(self):
+        filepath = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                                filetypes=[("JSON", "*.json"), ("All Files", "*.*")])
+        if not filepath:
+            return
+        try:
+            profiler.dump(filepath)
+        except OSError as e:
+            messagebox.showerror("Errore di Salvataggio", f"Impossibile salvare il file.\nErrore: {e}", parent=self)
+
+
 class MainView(ttk.Frame):
     """Manages all GUI widgets and layout."""
 
@@ -276,7 +791,10 @@ class MainView(ttk.Frame):
         self.output_labels = {}
         self.probe_combo = None
         self.xtal_combo = None
+        self.xtal_search_var = None
         self.delete_xtal_button = None
+        self.mcu_combo = None
+        self.live_var = None
 
         self._configure_styles()
         self._create_widgets()
@@ -357,11 +875,16 @@ class MainView(ttk.Frame):
 
         ttk.Label(frame, text="Libreria Quarzi:", font=AppConfig.FONT_BOLD).pack(side="left", padx=(0, 10))
 
-        self.xtal_combo = ttk.Combobox(frame, state='readonly', width=30)
+        self.xtal_combo = ttk.Combobox(frame, state='readonly', width=30,
+                                       postcommand=self.controller.refresh_xtal_library_list)
         self.xtal_combo.set(AppConfig.DEFAULT_XTAL_NAME)
         self.xtal_combo.bind("<<ComboboxSelected>>", self.controller.load_from_library)
         self.xtal_combo.pack(side="left")
 
+        ttk.Label(frame, text="Cerca:").pack(side="left", padx=(10, 5))
+        self.xtal_search_var = tk.StringVar()
+        ttk.Entry(frame, textvariable=self.xtal_search_var, width=15).pack(side="left")
+
         save_button = ttk.Button(frame, text="Salva Quarzo", style="Secondary.TButton",
                                  command=self.controller.save_to_library)
         save_button.pack(side="left", padx=(10, 0))
@@ -370,9 +893,22 @@ class MainView(ttk.Frame):
                                              command=self.controller.delete_from_library, state="disabled")
         self.delete_xtal_button.pack(side="left", padx=(5, 0))
 
+        find_button = ttk.Button(frame, text="Trova Compatibili", style="Secondary.TButton",
+                                 command=self.controller.find_compatible_crystals)
+        find_button.pack(side="left", padx=(10, 0))
+
+        ttk.Label(frame, text="MCU:", font=AppConfig.FONT_BOLD).pack(side="left", padx=(20, 10))
+        self.mcu_combo = ttk.Combobox(frame, state='readonly', width=30,
+                                      postcommand=self.controller.refresh_mcu_library_list)
+        self.mcu_combo.bind("<<ComboboxSelected>>", self.controller.load_mcu_variant)
+        self.mcu_combo.pack(side="left")
+
     def update_xtal_library_list(self, library_keys):
         self.xtal_combo['values'] = library_keys
 
+    def update_mcu_library_list(self, labels):
+        self.mcu_combo['values'] = labels
+
     def _create_input_frame(self, parent):
         frame = ttk.Frame(parent, padding=(10, 0))
         frame.grid(row=2, column=0, sticky="ew")
@@ -463,6 +999,11 @@ class MainView(ttk.Frame):
                                   style="Secondary.TButton")
         reset_button.pack(side='left', padx=(5, 0))
 
+        self.live_var = tk.BooleanVar(value=False)
+        live_check = ttk.Checkbutton(button_container, text="Calcolo automatico", variable=self.live_var,
+                                     command=self.controller.toggle_live_mode)
+        live_check.pack(side='left', padx=(15, 0))
+
     def _create_output_frame(self, parent):
         frame = ttk.Frame(parent, padding=(10, 0))
         frame.grid(row=4, column=0, sticky="nsew")
@@ -542,16 +1083,58 @@ class MainView(ttk.Frame):
 class AppController:
     """Orchestrates the Model and the View."""
 
+    # Display scale of each numeric output label
+    OUTPUT_SCALES = {'cl_eff': 1e12, 'gm_crit': 1e3, 'gain_margin': 1, 'x_cl': 1, 'drive_level': 1e6,
+                     'c_tot_dl': 1e12}
+    # Params varied by the GUI tolerance analysis
+    TOLERANCE_PARAMS = (Param.C0, Param.ESR_MAX, Param.GM_MCU, Param.CL_SEL, Param.CS_PIN, Param.CS_PCB)
+    # Results reported by each status label
+    STATUS_DEPENDENCIES = {
+        "gm_crit_status": ('gm_crit', 'gain_margin'),
+        "gain_margin_status": ('gain_margin',),
+        "dl_status": ('drive_level', 'dl_ratio'),
+    }
+    # RuleEngine check rendered by each status label, and its text per PASS/WARN/FAIL code
+    STATUS_CHECKS = {"gm_crit_status": 'startup', "gain_margin_status": 'margin', "dl_status": 'drive_level'}
+    STATUS_TEXTS = {
+        "gm_crit_status": ("Gm ({gm} mA/V) > Gm_crit ({gm_crit} mA/V). OK.",
+                           "Gm ({gm} mA/V) > Gm_crit ({gm_crit} mA/V). OK.",
+                           "Gm ({gm} mA/V) < Gm_crit ({gm_crit} mA/V). Avvio non garantito. CRITICO."),
+        "gain_margin_status": ("Gain Margin ({margin}) >= {threshold}. ECCELLENTE.",
+                               "Gain Margin ({margin}) accettabile, ma < {threshold}. OTTIMIZZARE.",
+                               "Gain Margin ({margin}) troppo basso. Rischio instabilità. CRITICO."),
+        "dl_status": ("DL ({dl} uW) entro i limiti di sicurezza (DL/DL_max = {dl_ratio}). OK.",
+                      "DL ({dl} uW) vicino al limite (DL/DL_max = {dl_ratio}). ATTENZIONE.",
+                      "DL ({dl} uW) ECCEDE DL Max ({dl_max} uW). Rext obbligatoria. CRITICO."),
+    }
+    STATUS_COLORS = (AppConfig.COLOR_OK, AppConfig.COLOR_WARN, AppConfig.COLOR_ERROR)
+
     def __init__(self, master):
         self.master = master
-        self.model = CrystalCircuitModel()
-        self.xtal_library = {}
+        self.model = CrystalCircuitModel(cache=ResultCache())
+        self._rules = None
+        self._rules_thresholds = None
+        self.xtal_library = None
+        self.xtal_finder = None
+        self.mcu_library = None
+        # MCU variant label -> (GM_MCU, CS_PIN) in base units, filled when the combobox opens
+        self._mcu_variants = {}
         self._formulas_window = None
+        self._diagnostics_window = None
+        self.jobs = JobRunner()
+        self._job_poll = None
+        self._job_done = None
+        # Live mode: Params edited since the last update, pending after() job, and whether
+        # the model holds a complete calculation that partial updates can build on
+        self._live_pending = set()
+        self._live_job = None
+        self._live_valid = False
 
         self.master.rowconfigure(0, weight=1)
         self.master.columnconfigure(0, weight=1)
 
         self._create_menu()
+        self.master.protocol("WM_DELETE_WINDOW", self.exit_application)
 
         main_frame = ttk.Frame(master)
         main_frame.grid(row=0, column=0, sticky="nsew")
@@ -583,15 +1166,27 @@ class AppController:
         file_menu = tk.Menu(menubar, tearoff=0)
         file_menu.add_command(label="Salva Lavoro", command=self.save_work)
         file_menu.add_command(label="Carica Lavoro", command=self.load_work)
+        file_menu.add_command(label="Apri Risultati Sweep...", command=self.open_sweep_results)
+        file_menu.add_command(label="Importa Acquisizione Oscilloscopio...", command=self.import_waveform)
         file_menu.add_separator()
         file_menu.add_command(label="Esci", command=self.exit_application)
         menubar.add_cascade(label="File", menu=file_menu)
 
+        analysis_menu = tk.Menu(menubar, tearoff=0)
+        analysis_menu.add_command(label="Analisi Tolleranze (Monte Carlo)...", command=self.run_tolerance_analysis)
+        analysis_menu.add_command(label="Sweep CL_sel × Rext...", command=self.run_load_sweep)
+        analysis_menu.add_command(label="Sensibilità Parametri...", command=self.show_sensitivity_window)
+        analysis_menu.add_command(label="Grafico Risultati vs CL_sel / Rext...", command=self.show_curve_plot)
+        analysis_menu.add_command(label="Matrice di Compatibilità Quarzi × MCU...",
+                                  command=self.run_compatibility_matrix)
+        menubar.add_cascade(label="Analisi", menu=analysis_menu)
+
         formulas_menu = tk.Menu(menubar, tearoff=0)
         formulas_menu.add_command(label="Mostra Formule di Calcolo", command=self.show_formulas_window)
         menubar.add_cascade(label="Formule", menu=formulas_menu)
 
         help_menu = tk.Menu(menubar, tearoff=0)
+        help_menu.add_command(label="Diagnostica", command=self.show_diagnostics_window)
         help_menu.add_command(label="About", command=self.show_about_dialog)
         menubar.add_cascade(label="Help", menu=help_menu)
 
@@ -602,15 +1197,70 @@ class AppController:
         self._formulas_window.lift()
         self._formulas_window.focus()
 
+    def show_diagnostics_window(self):
+        if self._diagnostics_window is None or not self._diagnostics_window.winfo_exists():
+            self._diagnostics_window = DiagnosticsView(self.master, self.model.cache)
+        self._diagnostics_window.lift()
+        self._diagnostics_window.focus()
+
     def _create_status_bar(self):
         self.status_var = tk.StringVar()
         status_bar_frame = ttk.Frame(self.master, relief="sunken", style="TFrame")
         status_bar_frame.grid(row=1, column=0, sticky="ew")
+        # Progress bar and cancel button are packed only while a background job runs
+        self.cancel_job_button = ttk.Button(status_bar_frame, text="Annulla", style="Secondary.TButton",
+                                            command=self.cancel_job)
+        self.job_progress = ttk.Progressbar(status_bar_frame, orient="horizontal", length=200, maximum=1.0)
         status_bar = ttk.Label(status_bar_frame, textvariable=self.status_var, anchor=tk.W, padding=5)
-        status_bar.pack(fill=tk.X)
+        status_bar.pack(side="left", fill=tk.X, expand=True)
+
+    # --- BACKGROUND JOBS ---
+
+    def _start_job(self, description, func, on_done, *args, **kwargs):
+        """Runs func in the background; on_done(result) is called on the Tk thread if the job completes."""
+        self._job_done = on_done
+        self.jobs.submit(func, *args, **kwargs)
+        self.job_progress['value'] = 0.0
+        self.cancel_job_button.pack(side="right", padx=5, pady=2)
+        self.job_progress.pack(side="right", padx=5)
+        self.status_var.set(description)
+        if self._job_poll is None:
+            self._job_poll = self.master.after(AppConfig.JOB_POLL_MS, self._poll_jobs)
+
+    def _poll_jobs(self):
+        self._job_poll = None
+        for kind, payload in self.jobs.poll():
+            if kind == JobRunner.PROGRESS:
+                done, total = payload
+                self.job_progress['value'] = done / total if total else 0.0
+                continue
+            self.job_progress.pack_forget()
+            self.cancel_job_button.pack_forget()
+            if kind == JobRunner.DONE:
+                self._job_done(payload)
+            elif kind == JobRunner.CANCELLED:
+                self.status_var.set("Operazione annullata.")
+            else:
+                messagebox.showerror("Errore di Calcolo", f"Impossibile completare l'analisi.\n{payload}")
+                self.status_var.set("Errore durante l'analisi.")
+        if self.jobs.busy:
+            self._job_poll = self.master.after(AppConfig.JOB_POLL_MS, self._poll_jobs)
+
+    def cancel_job(self):
+        if self.jobs.busy:
+            self.jobs.cancel()
+            self.status_var.set("Annullamento in corso...")
 
     def on_input_change(self, param_key=None):
         """Called when any input StringVar changes."""
+        # A running analysis refers to the old inputs: stop it, its results are discarded
+        self.jobs.cancel()
+        if self.view.live_var.get():
+            self._live_pending.update(Param if param_key is None else (param_key,))
+            if self._live_job is None:
+                self._live_job = self.master.after(AppConfig.LIVE_RECALC_DELAY_MS, self._run_live_update)
+            return
+
         self.status_var.set("I parametri sono stati modificati. Eseguire nuovamente il calcolo.")
         for key in self.view.output_labels:
             if '_status' not in key:
@@ -624,28 +1274,86 @@ class AppController:
                                                     foreground=AppConfig.COLOR_TEXT_SECONDARY,
                                                     font=AppConfig.FONT_STATUS)
 
+    def toggle_live_mode(self):
+        if self.view.live_var.get():
+            self.on_input_change()
+            return
+        if self._live_job is not None:
+            self.master.after_cancel(self._live_job)
+            self._live_job = None
+        self._live_pending.clear()
+        self.status_var.set("Calcolo automatico disattivato.")
+
+    def _run_live_update(self):
+        """Re-parses the fields edited since the last update and repaints only the outputs depending on them."""
+        self._live_job = None
+        changed, self._live_pending = self._live_pending, set()
+        if not self._live_valid:
+            changed = set(Param)
+
+        for key in changed:
+            try:
+                self._read_param(key)
+            except (ValueError, TypeError) as e:
+                # Keep the edits pending until every field parses again
+                self._live_pending = changed
+                if self.view.vars[key].get().strip():
+                    self.view.entries[key].configure(style="Invalid.TEntry")
+                    self.status_var.set(f"Calcolo automatico sospeso: {e}")
+                else:
+                    self.status_var.set("Calcolo automatico sospeso: completare tutti i campi.")
+                self._mark_outputs_stale(self.model.affected_results(changed))
+                return
+            if self.view.entries[key].cget('state') != 'readonly':
+                self.view.entries[key].configure(style="TEntry")
+
+        keys = self.model.affected_results(changed) if self._live_valid else None
+        success, error = self.model.calculate(keys)
+        if not success:
+            self._live_valid = False
+            self.status_var.set(f"Errore durante il calcolo. {error}")
+            return
+        self._live_valid = True
+        self._update_output_view(keys)
+        self.status_var.set("Calcolo automatico attivo.")
+
+    def _mark_outputs_stale(self, keys):
+        for key in keys:
+            if key in self.OUTPUT_SCALES:
+                self.view.output_labels[key].config(text="...", foreground=AppConfig.COLOR_TEXT_SECONDARY,
+                                                    font=AppConfig.FONT_VALUE_STALE)
+        for key, dependencies in self.STATUS_DEPENDENCIES.items():
+            if any(dep in keys for dep in dependencies):
+                self.view.output_labels[key].config(text="Dati incompleti o non validi.",
+                                                    foreground=AppConfig.COLOR_TEXT_SECONDARY)
+        self.view.output_labels["final_status"].config(text="---", foreground=AppConfig.COLOR_TEXT_SECONDARY)
+
     def _load_xtal_library(self):
         try:
-            if os.path.exists(AppConfig.LIBRARY_FILENAME):
-                with open(AppConfig.LIBRARY_FILENAME, 'r') as f:
-                    self.xtal_library = json.load(f)
-            else:
-                self.xtal_library = {AppConfig.DEFAULT_XTAL_NAME: {}}
-        except (json.JSONDecodeError, IOError) as e:
+            self.xtal_library = XtalLibrary(AppConfig.LIBRARY_DB_FILENAME)
+            imported = self.xtal_library.import_json(AppConfig.LIBRARY_FILENAME)
+            if imported:
+                self.status_var.set(f"Importati {imported} quarzi da {AppConfig.LIBRARY_FILENAME}.")
+        except (sqlite3.Error, json.JSONDecodeError, IOError) as e:
             messagebox.showerror("Errore Libreria", f"Impossibile caricare la libreria dei quarzi.\n{e}")
-            self.xtal_library = {AppConfig.DEFAULT_XTAL_NAME: {}}
-
-        if AppConfig.DEFAULT_XTAL_NAME not in self.xtal_library:
-            self.xtal_library[AppConfig.DEFAULT_XTAL_NAME] = {}
-
-        self.view.update_xtal_library_list(list(self.xtal_library.keys()))
-
-    def _save_xtal_library(self):
+            self.xtal_library = XtalLibrary(":memory:")
+        self.xtal_finder = CrystalFinder(self.xtal_library)
         try:
-            with open(AppConfig.LIBRARY_FILENAME, 'w') as f:
-                json.dump(self.xtal_library, f, indent=4)
-        except IOError as e:
-            messagebox.showerror("Errore Libreria", f"Impossibile salvare la libreria dei quarzi.\n{e}")
+            self.mcu_library = McuLibrary(AppConfig.LIBRARY_DB_FILENAME)
+            self.mcu_library.import_json(AppConfig.MCU_LIBRARY_FILENAME)
+        except (sqlite3.Error, json.JSONDecodeError, ValueError, IOError) as e:
+            messagebox.showerror("Errore Libreria", f"Impossibile caricare la libreria degli MCU.\n{e}")
+            self.mcu_library = McuLibrary(":memory:")
+
+    def refresh_xtal_library_list(self):
+        """Pages in the names matching the search prefix when the combobox opens."""
+        try:
+            names = self.xtal_library.names(prefix=self.view.xtal_search_var.get().strip(),
+                                            limit=AppConfig.LIBRARY_PAGE_SIZE)
+        except sqlite3.Error as e:
+            messagebox.showerror("Errore Libreria", f"Impossibile leggere la libreria dei quarzi.\n{e}")
+            names = []
+        self.view.update_xtal_library_list([AppConfig.DEFAULT_XTAL_NAME] + names)
 
     def save_to_library(self):
         try:
@@ -671,9 +1379,11 @@ class AppController:
         for key in preset_params:
             preset_data[key.name] = (self.view.vars[key].get(), self.view.unit_combos[key].get())
 
-        self.xtal_library[new_name] = preset_data
-        self._save_xtal_library()
-        self.view.update_xtal_library_list(list(self.xtal_library.keys()))
+        try:
+            self.xtal_library.save(new_name, preset_data)
+        except sqlite3.Error as e:
+            messagebox.showerror("Errore Libreria", f"Impossibile salvare la libreria dei quarzi.\n{e}")
+            return
         self.view.xtal_combo.set(new_name)
         self.load_from_library()
         messagebox.showinfo("Libreria Aggiornata", f"Il preset '{new_name}' è stato salvato con successo.")
@@ -685,15 +1395,17 @@ class AppController:
 
         if messagebox.askyesno("Conferma Eliminazione",
                                f"Sei sicuro di voler eliminare il preset '{selected_name}' dalla libreria?"):
-            del self.xtal_library[selected_name]
-            self._save_xtal_library()
-            self._load_xtal_library()
+            try:
+                self.xtal_library.delete(selected_name)
+            except sqlite3.Error as e:
+                messagebox.showerror("Errore Libreria", f"Impossibile salvare la libreria dei quarzi.\n{e}")
+                return
             self.reset_application()
             self.status_var.set(f"Preset '{selected_name}' eliminato.")
 
     def load_from_library(self, event=None):
         selected_xtal = self.view.xtal_combo.get()
-        preset = self.xtal_library.get(selected_xtal, {})
+        preset = self.xtal_library.get(selected_xtal) or {}
 
         preset_params_keys = [Param.FREQ, Param.C0, Param.ESR_MAX, Param.DL_MAX]
         for key in preset_params_keys:
@@ -716,6 +1428,271 @@ class AppController:
 
         self.on_input_change()
 
+    def select_library_preset(self, name):
+        self.view.xtal_combo.set(name)
+        self.load_from_library()
+
+    def refresh_mcu_library_list(self):
+        try:
+            variants = self.mcu_library.variants()
+        except sqlite3.Error as e:
+            messagebox.showerror("Errore Libreria", f"Impossibile leggere la libreria degli MCU.\n{e}")
+            variants = []
+        self._mcu_variants = {f"{mcu} [{drive}, {package}]": (gm, cs_pin)
+                              for mcu, drive, package, gm, cs_pin in variants}
+        self.view.update_mcu_library_list(list(self._mcu_variants))
+
+    def load_mcu_variant(self, event=None):
+        """Copies the selected variant's gm (mA/V) and pin capacitance (pF) into the input fields."""
+        values = self._mcu_variants.get(self.view.mcu_combo.get())
+        if values is None:
+            return
+        for key, value, unit in zip((Param.GM_MCU, Param.CS_PIN), values, ("mA/V", "pF")):
+            self.view.unit_combos[key].set(unit)
+            self.view.vars[key].set(f"{value / AppConfig.UNIT_MULTIPLIERS[unit]:g}")
+
+    def select_mcu_variant(self, label):
+        if label not in self._mcu_variants:
+            self.refresh_mcu_library_list()
+        self.view.mcu_combo.set(label)
+        self.load_mcu_variant()
+
+    def run_compatibility_matrix(self):
+        """Every library crystal against every MCU variant, with the board fields currently entered."""
+        from crystal_validator.compat import BOARD_PARAMS, CompatibilityMatrix
+        from crystal_validator.optimize import series_values
+
+        try:
+            board = self._read_optional_params(BOARD_PARAMS)
+        except (ValueError, TypeError) as e:
+            messagebox.showerror("Errore di Input", f"Valore non valido: {e}")
+            return
+
+        try:
+            crystals, crystal_columns = self.xtal_library.columns()
+            mcus, mcu_columns = self.mcu_library.columns()
+        except sqlite3.Error as e:
+            messagebox.showerror("Errore Libreria", f"Impossibile leggere le librerie.\n{e}")
+            return
+        if not len(crystals) or not len(mcus):
+            messagebox.showwarning("Libreria Vuota", "Servono almeno un quarzo e un MCU in libreria "
+                                                     "(gli MCU si aggiungono con il comando 'mcu add').")
+            return
+
+        cl_low, cl_high = AppConfig.COMPAT_GUI_CL_RANGE_PF
+        pf = AppConfig.UNIT_MULTIPLIERS['pF']
+        matrix = CompatibilityMatrix(series_values(AppConfig.COMPAT_GUI_SERIES, cl_low * pf, cl_high * pf), board)
+        self._start_job(f"Matrice di compatibilità in corso ({len(crystals)} × {len(mcus)})...", matrix.compute,
+                        self._show_compatibility_matrix, crystals, crystal_columns, mcus, mcu_columns)
+
+    def _show_compatibility_matrix(self, result):
+        CompatibilityMatrixView(self.master, self, result)
+        self.status_var.set(f"Matrice di compatibilità: {int((result.passing > 0).sum())} coppie compatibili "
+                            f"({result.computed_pairs} ricalcolate).")
+
+    def find_compatible_crystals(self):
+        """Screens the whole library against the MCU/board fields currently entered."""
+        try:
+            board = self._read_optional_params(CrystalFinder.BOARD_PARAMS)
+            freq = self._read_optional_params((Param.FREQ,), default=None)[Param.FREQ]
+        except (ValueError, TypeError) as e:
+            messagebox.showerror("Errore di Input", f"Valore non valido: {e}")
+            return
+
+        if board[Param.GM_MCU] <= 0:
+            messagebox.showwarning("Dati Mancanti", "Inserire almeno Gm MCU prima di cercare quarzi compatibili.")
+            return
+
+        freq_range = None
+        if freq:
+            tol = AppConfig.FINDER_FREQ_TOLERANCE
+            freq_range = (freq * (1 - tol), freq * (1 + tol))
+        try:
+            result = self.xtal_finder.find(board, freq_range)
+        except sqlite3.Error as e:
+            messagebox.showerror("Errore Libreria", f"Impossibile leggere la libreria dei quarzi.\n{e}")
+            return
+
+        CompatibleCrystalsView(self.master, self, result)
+        self.status_var.set(f"Trovati {len(result)} quarzi compatibili.")
+
+    def run_tolerance_analysis(self):
+        """Monte Carlo yield of the current design with a uniform tolerance on TOLERANCE_PARAMS."""
+        try:
+            for key in Param:
+                self._read_param(key)
+        except (ValueError, TypeError) as e:
+            messagebox.showerror("Errore di Input", f"Valore non valido: {e}")
+            return
+
+        tolerance = simpledialog.askfloat("Analisi Tolleranze", "Tolleranza relativa dei componenti [%]:",
+                                          initialvalue=5.0, minvalue=0.0, maxvalue=100.0, parent=self.master)
+        if tolerance is None:
+            return
+        samples = simpledialog.askinteger("Analisi Tolleranze", "Numero di campioni:",
+                                          initialvalue=AppConfig.MONTECARLO_GUI_SAMPLES, minvalue=1000,
+                                          parent=self.master)
+        if samples is None:
+            return
+
+        from crystal_validator.montecarlo import MonteCarloAnalysis, ParamDistribution
+
+        nominal = dict(self.model.params)
+        distributions = {key: ParamDistribution.tolerance(nominal[key], tolerance / 100.0)
+                         for key in self.TOLERANCE_PARAMS if nominal[key] > 0}
+        analysis = MonteCarloAnalysis(nominal, distributions, samples)
+        self._start_job(f"Analisi Monte Carlo in corso ({samples} campioni)...", analysis.run,
+                        self._show_tolerance_result)
+
+    def _show_tolerance_result(self, result):
+        summary = result.summary()
+        counts = result.verdict_counts
+        fmt = self._format_value
+        lines = [f"Campioni: {result.n_samples}",
+                 f"PASS: {counts['PASS']}   WARN: {counts['WARN']}   FAIL: {counts['FAIL']}",
+                 f"Resa FAIL: {result.fail_yield:.4%}", "",
+                 f"Gain Margin  p1 = {fmt(summary['gain_margin']['p1'], 2)}   "
+                 f"p50 = {fmt(summary['gain_margin']['p50'], 2)}",
+                 f"DL/DL_max  p50 = {fmt(summary['dl_ratio']['p50'], 3)}   "
+                 f"p99 = {fmt(summary['dl_ratio']['p99'], 3)}"]
+        self.status_var.set(f"Analisi Monte Carlo completata: resa FAIL {result.fail_yield:.4%}.")
+        messagebox.showinfo("Analisi Tolleranze", "\n".join(lines))
+
+    def run_load_sweep(self):
+        """Sweeps CL_sel and Rext around the current design and opens the grid in the results browser."""
+        try:
+            for key in Param:
+                self._read_param(key)
+        except (ValueError, TypeError) as e:
+            messagebox.showerror("Errore di Input", f"Valore non valido: {e}")
+            return
+
+        points = simpledialog.askinteger("Sweep CL_sel × Rext", "Punti per asse:",
+                                         initialvalue=AppConfig.SWEEP_GUI_POINTS, minvalue=2, maxvalue=5000,
+                                         parent=self.master)
+        if points is None:
+            return
+
+        import numpy as np
+        from crystal_validator.sweep import DesignSweep
+
+        cl_low, cl_high = AppConfig.SWEEP_GUI_CL_RANGE_PF
+        rext_low, rext_high = AppConfig.SWEEP_GUI_REXT_RANGE_OHM
+        axes = {Param.CL_SEL: np.linspace(cl_low, cl_high, points) * AppConfig.UNIT_MULTIPLIERS['pF'],
+                Param.REXT_SEL: np.linspace(rext_low, rext_high, points)}
+        sweep = DesignSweep(dict(self.model.params), axes)
+        self._start_job(f"Sweep in corso ({points * points} punti)...", sweep.run,
+                        lambda result: self._show_results_table(ResultTable.from_sweep(result), "Sweep CL_sel × Rext"),
+                        keep=('gm_crit', 'gain_margin', 'drive_level', 'dl_ratio'))
+
+    def show_sensitivity_window(self):
+        """Analytic sensitivity of the current design (instant, no background job needed)."""
+        try:
+            for key in Param:
+                self._read_param(key)
+        except (ValueError, TypeError) as e:
+            messagebox.showerror("Errore di Input", f"Valore non valido: {e}")
+            return
+
+        from crystal_validator.sensitivity import sensitivity_batch
+
+        SensitivityView(self.master, self, sensitivity_batch(dict(self.model.params)))
+
+    def show_curve_plot(self):
+        """Results against CL_sel or Rext around the current design; curves are recomputed in the Tk thread."""
+        try:
+            for key in Param:
+                self._read_param(key)
+        except (ValueError, TypeError) as e:
+            messagebox.showerror("Errore di Input", f"Valore non valido: {e}")
+            return
+        CurvePlotView(self.master, self, dict(self.model.params))
+
+    def open_sweep_results(self):
+        filepath = filedialog.askopenfilename(filetypes=[("Mappa Sweep", "*.npz"),
+                                                         ("Archivio Risultati", "manifest.json"),
+                                                         ("All Files", "*.*")])
+        if not filepath:
+            return
+        try:
+            if os.path.basename(filepath) == "manifest.json":
+                table = ResultTable.from_store(os.path.dirname(filepath))
+            else:
+                table = ResultTable.from_npz(filepath)
+        except (OSError, KeyError, ValueError) as e:
+            messagebox.showerror("Errore di Caricamento", f"Impossibile caricare il file.\nErrore: {e}")
+            return
+        self._show_results_table(table, filepath)
+
+    def import_waveform(self):
+        """Measures Vpp (and the real oscillation frequency) from a scope capture and fills VPP_MEASURED."""
+        filepath = filedialog.askopenfilename(filetypes=[("Acquisizione DSO", "*.csv *.txt *.npy *.bin"),
+                                                         ("All Files", "*.*")])
+        if not filepath:
+            return
+
+        from crystal_validator.waveform import WaveformAnalysis, WaveformCapture
+
+        options = {}
+        if not filepath.lower().endswith(WaveformCapture.TEXT_EXTENSIONS):
+            rate = simpledialog.askfloat("Importa Acquisizione", "Frequenza di campionamento [MS/s]:",
+                                         minvalue=1e-6, parent=self.master)
+            if rate is None:
+                return
+            options['sample_rate'] = rate * 1e6
+            if not filepath.lower().endswith('.npy'):
+                scale = simpledialog.askfloat("Importa Acquisizione", "Fattore di scala (campioni int16) [mV/LSB]:",
+                                              initialvalue=1.0, parent=self.master)
+                if scale is None:
+                    return
+                options['scale'] = scale * AppConfig.UNIT_MULTIPLIERS['mV']
+
+        try:
+            capture = WaveformCapture(filepath, **options)
+            self._read_param(Param.FREQ)
+            nominal = self.model.params[Param.FREQ]
+        except OSError as e:
+            messagebox.showerror("Errore di Caricamento", f"Impossibile aprire il file.\nErrore: {e}")
+            return
+        except (ValueError, TypeError):
+            nominal = None
+        analysis = WaveformAnalysis(capture, nominal)
+        self._start_job("Analisi dell'acquisizione in corso...", analysis.run, self._show_waveform_result)
+
+    def _show_waveform_result(self, result):
+        self.view.vars[Param.VPP_MEASURED].set(self._format_value(result.vpp / AppConfig.UNIT_MULTIPLIERS['mV'], 1))
+        self.view.unit_combos[Param.VPP_MEASURED].set('mV')
+        fmt = self._format_value
+        lines = [f"Campioni: {result.n_samples}",
+                 f"Vpp: {fmt(result.vpp / AppConfig.UNIT_MULTIPLIERS['mV'], 1)} mV (inserita in Vpp Misurata)"]
+        if result.frequency is None:
+            lines.append("Frequenza: non misurabile (meno di due fronti o tempi assenti).")
+        else:
+            lines.append(f"Frequenza misurata: {fmt(result.frequency / 1e6, 6)} MHz su {result.cycles} periodi")
+            if result.ppm_error is not None:
+                lines.append(f"Scostamento da F nominale: {result.ppm_error:+.1f} ppm")
+        self.status_var.set("Acquisizione importata: Vpp Misurata aggiornata.")
+        messagebox.showinfo("Importa Acquisizione", "\n".join(lines))
+
+    def compute_pareto_front(self, columns, objectives, on_done):
+        """Pareto front of result columns as a background job, read chunk by chunk (memory-mapped stores too)."""
+        from crystal_validator.pareto import ParetoFront
+
+        self._start_job(f"Fronte di Pareto in corso ({len(columns['verdict'])} design)...",
+                        ParetoFront(objectives).scan, on_done, columns)
+
+    def apply_design_values(self, values):
+        """Writes base-unit Param values (e.g. a Pareto point) into the input fields, in their current units."""
+        for name, value in values.items():
+            key = Param[name]
+            unit = self.view.unit_combos[key].get()
+            self.view.vars[key].set(f"{value / AppConfig.UNIT_MULTIPLIERS[unit]:g}")
+        self.status_var.set("Valori del punto caricati: " + ", ".join(values) + ".")
+
+    def _show_results_table(self, table, title):
+        ResultsTableView(self.master, self, table, title)
+        self.status_var.set(f"Risultati: {table.total} righe.")
+
     def update_probe_capacitance(self, event=None):
         selected_name = self.view.probe_combo.get()
 
@@ -730,7 +1707,7 @@ class AppController:
         self.on_input_change()
 
     def _format_value(self, value, precision=3):
-        if value is None or not np.isfinite(value):
+        if value is None or not math.isfinite(value):
             return "N/A"
         if value == 0:
             return f"0.{'0' * precision}"
@@ -747,15 +1724,8 @@ class AppController:
                 entry.configure(style="TEntry")
 
         try:
-            for key, var in self.view.vars.items():
-                val_str = var.get().strip()
-                unit_str = self.view.unit_combos[key].get()
-
-                if not val_str:
-                    raise ValueError(f"Il campo {key.name} non può essere vuoto.")
-
-                base_value = float(val_str) * AppConfig.UNIT_MULTIPLIERS[unit_str]
-                self.model.set_param(key, base_value)
+            for key in self.view.vars:
+                self._read_param(key)
 
         except (ValueError, TypeError) as e:
             err_msg = str(e)
@@ -777,92 +1747,95 @@ class AppController:
             return
 
         success, error = self.model.calculate()
+        self._live_valid = success
         if success:
+            self._live_pending.clear()
             self._update_output_view()
             self.status_var.set("Calcoli eseguiti con successo.")
         else:
             messagebox.showerror("Errore di Calcolo", f"Impossibile completare il calcolo.\n{error}")
             self.status_var.set("Errore durante il calcolo.")
 
-    def _update_output_view(self):
+    @instrumented("gui.read_param")
+    def _read_param(self, key):
+        """Parses one input field into the model; errors name the Param."""
+        val_str = self.view.vars[key].get().strip()
+        unit_str = self.view.unit_combos[key].get()
+
+        if not val_str:
+            raise ValueError(f"Il campo {key.name} non può essere vuoto.")
+
+        base_value = float(val_str) * AppConfig.UNIT_MULTIPLIERS[unit_str]
+        self.model.set_param(key, base_value)
+
+    @property
+    def rules(self):
+        """RuleEngine for the current CrystalCircuitModel thresholds, rebuilt when they change."""
+        thresholds = CrystalCircuitModel.thresholds()
+        if thresholds != self._rules_thresholds:
+            self._rules = RuleEngine()
+            self._rules_thresholds = thresholds
+        return self._rules
+
+    def _read_optional_params(self, keys, default=0.0):
+        """{Param: base value} of `keys`, read like _read_param(); empty fields give `default`."""
+        values = {}
+        for key in keys:
+            if self.view.vars[key].get().strip():
+                self._read_param(key)
+                values[key] = self.model.params[key]
+            else:
+                values[key] = default
+        return values
+
+    @instrumented("gui.update_output_view")
+    def _update_output_view(self, keys=None):
+        """Repaints the output labels of `keys` (default: all results) and the status rows reporting them."""
         results = self.model.results
 
-        self.view.output_labels["cl_eff"].config(text=self._format_value(results['cl_eff'] * 1e12))
-        self.view.output_labels["gm_crit"].config(text=self._format_value(results['gm_crit'] * 1e3))
-        self.view.output_labels["gain_margin"].config(text=self._format_value(results['gain_margin']))
-        self.view.output_labels["x_cl"].config(text=self._format_value(results['x_cl']))
-        self.view.output_labels["drive_level"].config(text=self._format_value(results['drive_level'] * 1e6))
-        self.view.output_labels["c_tot_dl"].config(text=self._format_value(results['c_tot_dl'] * 1e12))
+        for key in (self.OUTPUT_SCALES if keys is None else keys):
+            if key in self.OUTPUT_SCALES:
+                self.view.output_labels[key].config(text=self._format_value(results[key] * self.OUTPUT_SCALES[key]),
+                                                    font=AppConfig.FONT_VALUE,
+                                                    foreground=AppConfig.COLOR_TEXT_PRIMARY)
 
-        keys_to_style = ["cl_eff", "gm_crit", "gain_margin", "x_cl", "drive_level", "c_tot_dl"]
-        for key in keys_to_style:
-            self.view.output_labels[key].config(font=AppConfig.FONT_VALUE, foreground=AppConfig.COLOR_TEXT_PRIMARY)
+        self._update_status_labels(keys)
 
-        self._update_status_labels()
+    @instrumented("gui.update_status_labels")
+    def _update_status_labels(self, keys=None):
+        """Renders the RuleEngine codes of the current results; no validation logic lives here."""
+        def repaint(status_key):
+            return keys is None or any(dep in keys for dep in self.STATUS_DEPENDENCIES[status_key])
 
-    def _update_status_labels(self):
         results = self.model.results
         gm_mcu = self.model.params[Param.GM_MCU]
-        dl_max = self.model.params[Param.DL_MAX]
-        gain_margin = results['gain_margin']
-        gm_crit = results['gm_crit']
-        drive_level = results['drive_level']
-        dl_ratio = results['dl_ratio']
-
-        is_fail = False
-
-        gm_label = self.view.output_labels["gm_crit_status"]
-        gm_f = self._format_value(gm_mcu * 1e3, 1)
-        gmc_f = self._format_value(gm_crit * 1e3, 1)
-        if gm_crit > gm_mcu:
-            gm_text = f"Gm ({gm_f} mA/V) < Gm_crit ({gmc_f} mA/V). Avvio non garantito. CRITICO."
-            gm_color = AppConfig.COLOR_ERROR
-            is_fail = True
-        else:
-            gm_text = f"Gm ({gm_f} mA/V) > Gm_crit ({gmc_f} mA/V). OK."
-            gm_color = AppConfig.COLOR_OK
-        gm_label.config(text=gm_text, foreground=gm_color)
-
-        margin_label = self.view.output_labels["gain_margin_status"]
-        threshold = self.model.GM_MARGIN_THRESHOLD
-        gm_margin_f = self._format_value(gain_margin, 2)
-        if gain_margin < 3.0:
-            margin_text = f"Gain Margin ({gm_margin_f}) troppo basso. Rischio instabilità. CRITICO."
-            margin_color = AppConfig.COLOR_ERROR
-            is_fail = True
-        elif gain_margin < threshold:
-            margin_text = f"Gain Margin ({gm_margin_f}) accettabile, ma < {threshold:.1f}. OTTIMIZZARE."
-            margin_color = AppConfig.COLOR_WARN
-        else:
-            margin_text = f"Gain Margin ({gm_margin_f}) >= {threshold:.1f}. ECCELLENTE."
-            margin_color = AppConfig.COLOR_OK
-        margin_label.config(text=margin_text, foreground=margin_color)
-
-        dl_label = self.view.output_labels["dl_status"]
-        dl_f = self._format_value(drive_level * 1e6, 1)
-        dl_max_f = self._format_value(dl_max * 1e6, 1)
-        dl_ratio_f = self._format_value(dl_ratio, 2)
-        if dl_ratio > 1.0:
-            dl_text = f"DL ({dl_f} uW) ECCEDE DL Max ({dl_max_f} uW). Rext obbligatoria. CRITICO."
-            dl_color = AppConfig.COLOR_ERROR
-            is_fail = True
-        elif dl_ratio > 0.8:
-            dl_text = f"DL ({dl_f} uW) vicino al limite (DL/DL_max = {dl_ratio_f}). ATTENZIONE."
-            dl_color = AppConfig.COLOR_WARN
-        else:
-            dl_text = f"DL ({dl_f} uW) entro i limiti di sicurezza (DL/DL_max = {dl_ratio_f}). OK."
-            dl_color = AppConfig.COLOR_OK
-        dl_label.config(text=dl_text, foreground=dl_color)
+        codes = self.rules.classify(gm_mcu, results)
+        thresholds = self.rules.thresholds
+        fmt = self._format_value
+        values = {
+            "gm": fmt(gm_mcu * 1e3, 1), "gm_crit": fmt(results['gm_crit'] * 1e3, 1),
+            "margin": fmt(results['gain_margin'], 2), "threshold": f"{thresholds.margin_warn:.1f}",
+            "dl": fmt(results['drive_level'] * 1e6, 1), "dl_max": fmt(self.model.params[Param.DL_MAX] * 1e6, 1),
+            "dl_ratio": fmt(results['dl_ratio'], 2),
+        }
 
+        for status_key, check in self.STATUS_CHECKS.items():
+            if repaint(status_key):
+                code = int(codes[check])
+                self.view.output_labels[status_key].config(text=self.STATUS_TEXTS[status_key][code].format(**values),
+                                                           foreground=self.STATUS_COLORS[code])
+
+        is_fail = int(codes['verdict']) == CrystalCircuitModel.VERDICT_FAIL
         final_status_label = self.view.output_labels["final_status"]
-        if is_fail:
-            final_status_label.config(text="VALIDATION: FAIL", foreground=AppConfig.COLOR_ERROR, font=AppConfig.FONT_FINAL_STATUS)
-        else:
-            final_status_label.config(text="VALIDATION: PASS", foreground=AppConfig.COLOR_OK, font=AppConfig.FONT_FINAL_STATUS)
+        final_text = "VALIDATION: FAIL" if is_fail else "VALIDATION: PASS"
+        if keys is None or final_status_label.cget('text') != final_text:
+            final_status_label.config(text=final_text, foreground=AppConfig.COLOR_ERROR if is_fail else AppConfig.COLOR_OK,
+                                      font=AppConfig.FONT_FINAL_STATUS)
 
     def reset_application(self):
         """Resets all input fields to be empty."""
         self.model.reset()
+        self._live_valid = False
 
         for key, var in self.view.vars.items():
             var.set("")
@@ -905,7 +1878,7 @@ class AppController:
                 "probe": self.view.probe_combo.get()
             }
 
-            with open(filepath, 'w') as f:
+            with profiler.section("session.save"), open(filepath, 'w') as f:
                 json.dump(data_to_save, f, indent=4)
 
             self.status_var.set(f"Lavoro salvato in: {filepath}")
@@ -921,7 +1894,7 @@ class AppController:
             return
 
         try:
-            with open(filepath, 'r') as f:
+            with profiler.section("session.load"), open(filepath, 'r') as f:
                 data = json.load(f)
 
             for key in Param:
@@ -952,10 +1925,16 @@ class AppController:
         )
 
     def exit_application(self):
+        self.jobs.shutdown()
         self.master.quit()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        from crystal_validator.cli import headless_main
+        sys.exit(headless_main(sys.argv[1:]))
+
     root = tk.Tk()
     root.title("Crystal Oscillator Validator")
     root.geometry("1200x950")
@@ -964,4 +1943,4 @@ if __name__ == "__main__":
 
     app = AppController(root)
 
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
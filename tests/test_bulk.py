@@ -0,0 +1,49 @@
+import io
+import json
+import os
+
+from crystal_validator.bulk import ValidationIndex, iter_work_file_stats
+from crystal_validator.cli import IncrementalValidator
+from crystal_validator.library import XtalLibrary
+
+DESIGN = {"FREQ": "25", "C0": "3", "ESR_MAX": "60", "DL_MAX": "100", "GM_MCU": "25", "CL_SEL": "10",
+          "REXT_SEL": "0", "CS_PIN": "3", "CS_PCB": "2", "VPP_MEASURED": "1000", "C_PROBE": "0"}
+
+
+def write_design(path, **overrides):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({name: {"value": overrides.get(name, value), "unit": None} for name, value in DESIGN.items()}, f)
+
+
+def revalidate(root, index_path):
+    library, index = XtalLibrary(":memory:"), ValidationIndex(index_path)
+    try:
+        validator = IncrementalValidator(io.StringIO(), index)
+        validator.revalidate(root, library, workers=1)
+        return validator
+    finally:
+        library.close()
+        index.close()
+
+
+def test_index_keys_ignore_trailing_slash(tmp_path):
+    root = tmp_path / "designs"
+    write_design(str(root / "sub" / "a.xtal"))
+    keys = [key for _, key, _ in iter_work_file_stats(str(root) + os.sep)]
+    assert keys == [str(root / "sub" / "a.xtal")]
+    assert keys == [key for _, key, _ in iter_work_file_stats(str(root))]
+
+
+def test_incremental_run_reuses_index_with_trailing_slash(tmp_path):
+    root = str(tmp_path / "designs") + os.sep
+    index_path = str(tmp_path / "index.db")
+    write_design(os.path.join(root, "a.xtal"))
+    write_design(os.path.join(root, "sub", "b.xtal"), GM_MCU="1")
+
+    first = revalidate(root, index_path)
+    assert (first.total, first.reresolved, first.removed) == (2, 2, 0)
+
+    second = revalidate(root, index_path)
+    assert (second.total, second.reresolved, second.recomputed, second.removed) == (2, 0, 0, 0)
+    assert second.failed == first.failed
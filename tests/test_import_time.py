@@ -0,0 +1,14 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from check_import_time import DEFAULT_BUDGET_MS, loaded_forbidden_modules, measure_import_ms  # noqa: E402
+
+
+def test_import_skips_tkinter_and_numpy():
+    assert loaded_forbidden_modules("crystal_validator") == []
+
+
+def test_import_time_within_budget():
+    assert measure_import_ms("crystal_validator") <= DEFAULT_BUDGET_MS
@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+import pytest
+
+from crystal_validator.model import CrystalCircuitModel, Param
+
+NOMINAL = {Param.FREQ: 25e6, Param.C0: 3e-12, Param.ESR_MAX: 60.0, Param.DL_MAX: 100e-6, Param.GM_MCU: 25e-3,
+           Param.CL_SEL: 10e-12, Param.REXT_SEL: 0.0, Param.CS_PIN: 3e-12, Param.CS_PCB: 2e-12,
+           Param.VPP_MEASURED: 1.0, Param.C_PROBE: 0.0}
+EDGE_CASES = {
+    # gm_crit == 0: no resistance in the loop
+    'gm_crit_zero': {Param.ESR_MAX: 0.0, Param.REXT_SEL: 0.0},
+    'cl_sel_zero': {Param.CL_SEL: 0.0},
+    'dl_max_zero': {Param.DL_MAX: 0.0},
+}
+
+
+def scalar_results(params):
+    model = CrystalCircuitModel()
+    # Assigned directly: set_param() rejects some of the edge values on purpose
+    model.params.update(params)
+    success, error = model.calculate()
+    assert success, error
+    return model.results
+
+
+@pytest.mark.parametrize("case", sorted(EDGE_CASES))
+def test_batch_matches_scalar_on_edge_cases(case):
+    params = {**NOMINAL, **EDGE_CASES[case]}
+    expected = scalar_results(params)
+    # The edge design sits between two regular ones, so the masked divisions are exercised
+    columns = {key: np.array([NOMINAL[key], value, NOMINAL[key]]) for key, value in params.items()}
+    batch = CrystalCircuitModel.calculate_batch(columns)
+    for key in CrystalCircuitModel.RESULT_KEYS:
+        assert batch[key][1] == pytest.approx(expected[key], rel=1e-12, abs=0.0), key
+        assert batch[key][0] == pytest.approx(scalar_results(NOMINAL)[key], rel=1e-12, abs=0.0), key
+
+
+def test_edge_case_values():
+    assert scalar_results({**NOMINAL, **EDGE_CASES['gm_crit_zero']})['gain_margin'] == math.inf
+    assert scalar_results({**NOMINAL, **EDGE_CASES['cl_sel_zero']})['x_cl'] == 0.0
+    assert scalar_results({**NOMINAL, **EDGE_CASES['dl_max_zero']})['dl_ratio'] == math.inf
+
+
+def test_partial_calculate_matches_full():
+    model = CrystalCircuitModel()
+    model.params.update(NOMINAL)
+    model.calculate()
+    model.params[Param.CL_SEL] = 18e-12
+    model.calculate(model.affected_results([Param.CL_SEL]))
+    partial = dict(model.results)
+    model.calculate()
+    assert partial == model.results
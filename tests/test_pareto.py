@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from crystal_validator.pareto import ParetoFront, skyline
+
+
+def brute_force(points):
+    """Indices of the rows no other row dominates, by comparing every pair."""
+    keep = []
+    for i, row in enumerate(points):
+        if np.isnan(row).any():
+            continue
+        others = points[~np.isnan(points).any(axis=1)]
+        dominated = ((others <= row).all(axis=1) & (others < row).any(axis=1)).any()
+        if not dominated:
+            keep.append(i)
+    return np.array(keep, dtype=np.intp)
+
+
+def sample(rng, n, d, kind):
+    if kind == 'ties':
+        return rng.integers(0, 5, size=(n, d)).astype(np.float64)
+    if kind == 'anticorrelated':
+        points = rng.random((n, d))
+        return points / points.sum(axis=1, keepdims=True) + 0.01 * rng.random((n, d))
+    points = rng.random((n, d))
+    points[rng.random(n) < 0.05, rng.integers(0, d)] = np.nan
+    return points
+
+
+@pytest.mark.parametrize("d", [1, 2, 3, 4, 5])
+@pytest.mark.parametrize("kind", ['ties', 'anticorrelated', 'nan'])
+@pytest.mark.parametrize("block_size", [8, 1024])
+def test_skyline_matches_brute_force(d, kind, block_size):
+    rng = np.random.default_rng(d * 100 + len(kind) + block_size)
+    for n in (0, 1, 40, 600):
+        points = sample(rng, n, d, kind)
+        np.testing.assert_array_equal(skyline(points, block_size), brute_force(points))
+
+
+def test_constant_objective_is_ignored():
+    points = np.column_stack((np.arange(5.0), np.full(5, 2.0)))
+    np.testing.assert_array_equal(skyline(points), [0])
+
+
+def test_chunked_scan_matches_single_pass():
+    rng = np.random.default_rng(7)
+    columns = {'a': rng.random(3000), 'b': rng.integers(0, 20, 3000).astype(np.float64), 'c': rng.random(3000)}
+    objectives = (('a', 'min'), ('b', 'max'), ('c', 'min'), ('missing', 'min'))
+    front = ParetoFront(objectives).scan(columns, chunk_size=257)
+    expected = brute_force(np.column_stack((columns['a'], -columns['b'], columns['c'])))
+    assert front.active == objectives[:3]
+    np.testing.assert_array_equal(np.sort(front.columns['row']), expected)
+    np.testing.assert_array_equal(front.columns['a'], columns['a'][front.columns['row']])
+
+
+def test_invalid_objective_sense():
+    with pytest.raises(ValueError):
+        ParetoFront((('a', 'up'),))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from crystal_validator.rules import RuleEngine, ValidationThresholds
+
+PASS, WARN, FAIL = 0, 1, 2
+
+
+def classify(engine, gm_mcu, gm_crit, gain_margin, dl_ratio):
+    scalar = engine.classify(gm_mcu, {'gm_crit': gm_crit, 'gain_margin': gain_margin, 'dl_ratio': dl_ratio})
+    vector = engine.classify(np.array([gm_mcu]), {'gm_crit': np.array([gm_crit]),
+                                                  'gain_margin': np.array([gain_margin]),
+                                                  'dl_ratio': np.array([dl_ratio])})
+    assert {key: int(codes[0]) for key, codes in vector.items()} == scalar
+    return scalar
+
+
+@pytest.mark.parametrize("gain_margin, code", [
+    (2.999, FAIL), (3.0, WARN), (4.999, WARN), (5.0, PASS), (float('inf'), PASS),
+])
+def test_margin_thresholds(gain_margin, code):
+    codes = classify(RuleEngine(), 1.0, 0.0, gain_margin, 0.0)
+    assert codes['margin'] == code
+    assert codes['verdict'] == code
+
+
+@pytest.mark.parametrize("dl_ratio, code", [
+    (0.8, PASS), (0.801, WARN), (1.0, WARN), (1.001, FAIL), (float('inf'), FAIL),
+])
+def test_drive_level_thresholds(dl_ratio, code):
+    assert classify(RuleEngine(), 1.0, 0.0, 10.0, dl_ratio)['drive_level'] == code
+
+
+@pytest.mark.parametrize("gm_crit, code", [(0.5, PASS), (1.0, PASS), (1.5, FAIL)])
+def test_startup_check(gm_crit, code):
+    assert classify(RuleEngine(), 1.0, gm_crit, 10.0, 0.0)['startup'] == code
+
+
+def test_verdict_is_the_worst_check():
+    codes = classify(RuleEngine(), 1.0, 0.5, 4.0, 1.5)
+    assert (codes['startup'], codes['margin'], codes['drive_level'], codes['verdict']) == (PASS, WARN, FAIL, FAIL)
+
+
+def test_custom_thresholds():
+    engine = RuleEngine(ValidationThresholds(margin_warn=10.0, margin_critical=8.0, dl_ratio_warn=0.5))
+    assert classify(engine, 1.0, 0.0, 9.0, 0.6) == {'startup': PASS, 'margin': WARN, 'drive_level': WARN,
+                                                    'verdict': WARN}
+    assert classify(engine, 1.0, 0.0, 7.0, 0.4)['margin'] == FAIL
+
+
+def test_thresholds_must_be_ordered():
+    with pytest.raises(ValueError):
+        ValidationThresholds(margin_warn=2.0, margin_critical=3.0)
+    with pytest.raises(ValueError):
+        ValidationThresholds(dl_ratio_warn=1.5)
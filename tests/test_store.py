@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from crystal_validator.store import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore.create(str(tmp_path / "store"), {'gain_margin': np.float64, 'verdict': np.uint8})
+    store.append({'gain_margin': np.array([8.0, 4.0, 1.0]), 'verdict': np.array([0, 1, 2], dtype=np.uint8)})
+    return store
+
+
+@pytest.mark.parametrize("condition, rows", [
+    ("verdict == 2", [2]),
+    ("-verdict == -2", [2]),
+    ("-verdict < -0.5", [1, 2]),
+    ("gain_margin < 5 and verdict > 0", [1, 2]),
+    ("not (gain_margin < 5) or verdict == 2", [0, 2]),
+    ("1 < gain_margin <= 8", [0, 1]),
+])
+def test_query(store, condition, rows):
+    np.testing.assert_array_equal(store.query(condition), rows)
+
+
+@pytest.mark.parametrize("condition", ["gain_margin", "1", "-verdict", "not verdict",
+                                       "gain_margin < 5 and verdict", "(verdict == 1) == 1", "unknown > 1"])
+def test_query_rejects_non_comparisons(store, condition):
+    with pytest.raises(ValueError):
+        store.query(condition)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from crystal_validator.model import CrystalCircuitModel, Param
+from crystal_validator.sweep import DesignSweep
+
+BASE = {Param.FREQ: 25e6, Param.C0: 3e-12, Param.ESR_MAX: 60.0, Param.DL_MAX: 100e-6, Param.GM_MCU: 2e-3,
+        Param.CS_PIN: 3e-12, Param.CS_PCB: 2e-12, Param.VPP_MEASURED: 1.0}
+AXES = {Param.CL_SEL: np.linspace(1e-12, 40e-12, 7), Param.REXT_SEL: np.linspace(0.0, 500.0, 5),
+        Param.C_PROBE: np.array([0.0, 1e-12, 10e-12])}
+KEEP = ('gain_margin', 'dl_ratio')
+
+
+def reference():
+    """The whole grid evaluated in a single calculate_batch() call."""
+    mesh = np.meshgrid(*AXES.values(), indexing='ij')
+    columns = dict(BASE)
+    columns.update(zip(AXES, mesh))
+    results = CrystalCircuitModel.calculate_batch(columns)
+    return CrystalCircuitModel.verdict_batch(BASE[Param.GM_MCU], results), results
+
+
+# Below, at and across the sizes of the trailing axes (3, 15) and of the whole grid (105)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 14, 15, 16, 44, 45, 104, 105, 1000])
+def test_chunked_sweep_matches_full_grid(chunk_size, tmp_path):
+    verdict, results = reference()
+    sweep = DesignSweep(BASE, AXES, chunk_size)
+    progress = []
+    store = sweep.create_store(str(tmp_path / "store"), KEEP)
+    result = sweep.run(KEEP, progress=lambda done, total: progress.append((done, total)), store=store)
+
+    np.testing.assert_array_equal(result.verdict, verdict)
+    for key in KEEP:
+        np.testing.assert_array_equal(result.results[key], results[key])
+    assert progress[-1] == (verdict.size, verdict.size)
+    # No block exceeds chunk_size points
+    assert max(np.diff([0] + [done for done, _ in progress])) <= chunk_size
+
+    # The store holds every point exactly once, in C order of the grid
+    np.testing.assert_array_equal(np.asarray(store.columns(['verdict'])['verdict']), verdict.ravel())
+    np.testing.assert_array_equal(np.asarray(store.columns(['REXT_SEL'])['REXT_SEL']),
+                                  np.broadcast_to(AXES[Param.REXT_SEL][None, :, None], verdict.shape).ravel())